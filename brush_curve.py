@@ -0,0 +1,71 @@
+# The module contains sampling of the brush falloff curve into the lookup table of the brush preview texture
+# and detection of the curve changes. Curve mapping is accessed only through its Python API, so the module
+# does not depend on bpy
+import numpy as np
+
+
+def f_clamp(value: float, min_value: float, max_value: float):
+    return max(min(value, max_value), min_value)
+
+
+def f_lerp(value0: float, value1: float, factor: float):
+    return (value0 * (1.0 - factor)) + (value1 * factor)
+
+
+def iter_curve_values(curve_mapping, steps: int):
+    curve_mapping.initialize()
+    curve = list(curve_mapping.curves)[0]
+
+    clip_min_x = curve_mapping.clip_min_x
+    clip_min_y = curve_mapping.clip_min_y
+    clip_max_x = curve_mapping.clip_max_x
+    clip_max_y = curve_mapping.clip_max_y
+
+    for i in range(steps):
+        fac = i / steps
+        pos = f_lerp(clip_min_x, clip_max_x, fac)
+
+        value = curve_mapping.evaluate(curve, pos)
+
+        yield f_clamp(value, clip_min_y, clip_max_y)
+
+
+# Brush falloff texture has fixed resolution, shader samples it by normalized distance from the brush center
+BRUSH_LUT_WIDTH = 256
+# Number of curve evaluations, values in between are interpolated
+BRUSH_CURVE_SAMPLES = 32
+
+
+def get_brush_curve_lut(curve_mapping):
+    """
+    Brush falloff lookup table of BRUSH_LUT_WIDTH values in range 0-255
+    @return: numpy.ndarray of int32
+    """
+    samples = np.fromiter(iter_curve_values(curve_mapping, BRUSH_CURVE_SAMPLES), dtype=np.float64,
+                          count=BRUSH_CURVE_SAMPLES)
+    sample_pos = np.arange(BRUSH_CURVE_SAMPLES, dtype=np.float64) / BRUSH_CURVE_SAMPLES
+    lut_pos = np.arange(BRUSH_LUT_WIDTH, dtype=np.float64) / BRUSH_LUT_WIDTH
+    lut = np.interp(lut_pos, sample_pos, samples)
+    return (np.clip(lut, 0.0, 1.0) * 255).astype(np.int32)
+
+
+def get_brush_curve_hash(curve_mapping):
+    """
+    Hash of the curve control points and clipping, changes together with the curve shape.
+    Curve is not evaluated, so it's cheap enough to be checked on every modal operator tick
+    @return: int
+    """
+    points = curve_mapping.curves[0].points
+    count = len(points)
+    locations = np.empty(count * 2, dtype=np.float32)
+    points.foreach_get("location", locations)
+    # Enum properties are not available for 'foreach_get', but there are just a few points
+    handle_types = tuple(point.handle_type for point in points)
+    return hash((
+        locations.tobytes(),
+        handle_types,
+        curve_mapping.clip_min_x,
+        curve_mapping.clip_min_y,
+        curve_mapping.clip_max_x,
+        curve_mapping.clip_max_y,
+    ))
@@ -0,0 +1,397 @@
+# The module contains parsing of the camera calibration files exported by third-party photogrammetry applications.
+# The whole file is parsed into typed NumPy columns, large files are read in chunks of rows
+import itertools
+import operator
+
+import numpy as np
+
+# Number of rows parsed at once
+CHUNK_ROWS = 16384
+# Number of the first lines where the header line is searched
+MAX_HEADER_LINES = 64
+SUPPORTED_EXTENSIONS = (".csv", ".txt")
+
+INTRINSIC_FIELDS = ("f", "px", "py", "k1", "k2", "k3", "k4", "t1", "t2")
+
+
+class Schema:
+    """
+    Column layout of the calibration file of a particular application. Columns are mapped to the canonical
+    field names by normalized header names, the first found alias is used
+    """
+    __slots__ = ("name", "columns", "required", "rejected", "delimiter", "has_other_rows")
+
+    def __init__(self, name: str, columns: dict, required: tuple, rejected=(), delimiter=None,
+                 has_other_rows=False):
+        self.name = name
+        self.columns = columns  # field: tuple of normalized header names
+        self.required = required
+        # Header names of the exports which can't be used, such as geographic coordinates
+        self.rejected = rejected
+        # Data delimiter, if differs from the header one. Empty string means any whitespace
+        self.delimiter = delimiter
+        # Rows with different number of columns are expected and not counted as skipped
+        self.has_other_rows = has_other_rows
+
+    def match(self, header: list):
+        """
+        Column indices of the fields found in the header line
+        @return: dict {field: column index} or None if some of the required fields are missing
+            or the header contains rejected names
+        """
+        if self.get_rejected(header):
+            return None
+        ret = {}
+        for field, aliases in self.columns.items():
+            for alias in aliases:
+                if alias in header:
+                    ret[field] = header.index(alias)
+                    break
+        if all(field in ret for field in self.required):
+            return ret
+
+    def get_rejected(self, header: list):
+        """
+        Rejected names found in the header line
+        @return: list of str
+        """
+        return [name for name in self.rejected if name in header]
+
+
+SCHEMAS = (
+    # RealityCapture "Internal/External camera parameters" export
+    Schema(
+        'REALITY_CAPTURE',
+        columns={
+            "name": ("#name",),
+            "x": ("x",), "y": ("y",), "alt": ("alt",),
+            "heading": ("heading",), "pitch": ("pitch",), "roll": ("roll",),
+            "f": ("f",), "px": ("px",), "py": ("py",),
+            "k1": ("k1",), "k2": ("k2",), "k3": ("k3",), "k4": ("k4",), "t1": ("t1",), "t2": ("t2",),
+        },
+        required=("name",) + INTRINSIC_FIELDS,
+    ),
+    # Metashape reference pane export, estimated values are preferred. Exports in geographic coordinate systems
+    # have longitude and latitude in degrees, these can't be used as locations
+    Schema(
+        'METASHAPE',
+        columns={
+            "name": ("#label", "label", "#photoid", "photoid"),
+            "x": ("x_est", "x/easting", "x"),
+            "y": ("y_est", "y/northing", "y"),
+            "alt": ("z_est", "z/altitude", "z"),
+            "heading": ("yaw_est", "yaw"), "pitch": ("pitch_est", "pitch"), "roll": ("roll_est", "roll"),
+        },
+        required=("name", "x", "y", "alt", "heading", "pitch", "roll"),
+        rejected=("x/longitude", "y/latitude"),
+    ),
+    # COLMAP "images.txt", commented header and pose lines interleaved with 2D points lines
+    Schema(
+        'COLMAP',
+        columns={
+            "name": ("name",),
+            "qw": ("qw",), "qx": ("qx",), "qy": ("qy",), "qz": ("qz",),
+            "tx": ("tx",), "ty": ("ty",), "tz": ("tz",),
+        },
+        required=("name", "qw", "qx", "qy", "qz", "tx", "ty", "tz"),
+        delimiter="",
+        has_other_rows=True,
+    ),
+)
+
+
+class CalibrationTable:
+    """
+    Parsed calibration file, one item of each column per camera
+    """
+    __slots__ = ("schema", "names", "columns", "skipped_rows")
+
+    def __init__(self, schema: Schema, names: list, columns: dict, skipped_rows: int = 0):
+        self.schema = schema
+        self.names = names
+        self.columns = columns  # field: numpy.ndarray of float64
+        self.skipped_rows = skipped_rows
+
+    def __len__(self):
+        return len(self.names)
+
+    def has(self, *fields):
+        return all(field in self.columns for field in fields)
+
+    @classmethod
+    def concatenate(cls, tables: list):
+        first = tables[0]
+        names = list(itertools.chain.from_iterable(table.names for table in tables))
+        columns = {field: np.concatenate([table.columns[field] for table in tables]) for field in first.columns}
+        return cls(first.schema, names, columns, sum(table.skipped_rows for table in tables))
+
+
+def _split(line: str, delimiter: str):
+    # Whitespaces around the numbers are accepted by float(), so items are not stripped
+    if delimiter:
+        return line.split(delimiter)
+    return line.split()
+
+
+def _get_delimiter(line: str):
+    for delimiter in (",", "\t", ";"):
+        if delimiter in line:
+            return delimiter
+    return ""
+
+
+def _normalize_header(line: str, delimiter: str):
+    # Comment sign may be separated from the first column name with whitespaces
+    return ["".join(item.lower().split()) for item in _split(line, delimiter)]
+
+
+def _parse_float(value: str):
+    try:
+        return float(value)
+    except ValueError:
+        return np.nan
+
+
+def detect_schema(lines):
+    """
+    Find the header line among the given lines
+    @return: tuple (Schema, dict {field: column index}, int number of columns, str data delimiter,
+        int index of the header line) or None if schema is not recognized
+    """
+    for i, line in enumerate(lines):
+        line = line.strip()
+        if not line:
+            continue
+        delimiter = _get_delimiter(line)
+        header = _normalize_header(line, delimiter)
+        for schema in SCHEMAS:
+            column_indices = schema.match(header)
+            if column_indices is not None:
+                if schema.delimiter is not None:
+                    delimiter = schema.delimiter
+                return schema, column_indices, len(header), delimiter, i
+
+
+def find_rejected_header(filepath: str):
+    """
+    Rejected names of the header line of the calibration file, used to explain why the file is not recognized
+    @return: list of str, empty if there are no rejected names
+    """
+    with open(filepath, "r", encoding="utf-8", errors="replace") as file:
+        for line in itertools.islice(file, MAX_HEADER_LINES):
+            line = line.strip()
+            if not line:
+                continue
+            header = _normalize_header(line, _get_delimiter(line))
+            for schema in SCHEMAS:
+                rejected = schema.get_rejected(header)
+                if rejected:
+                    return rejected
+    return []
+
+
+def get_values_matrix(rows: list, indices: list):
+    """
+    Convert the given columns of the rows into a matrix. All loops run in C, the conversion is done
+    value by value only if the chunk contains invalid numbers, these become NaN
+    @return: numpy.ndarray (len(rows), len(indices)) of float64
+    """
+    shape = (len(rows), len(indices))
+    getter = operator.itemgetter(*indices)
+    if len(indices) == 1:
+        values = map(getter, rows)
+    else:
+        values = itertools.chain.from_iterable(map(getter, rows))
+    try:
+        return np.fromiter(map(float, values), dtype=np.float64, count=shape[0] * shape[1]).reshape(shape)
+    except ValueError:
+        ret = np.empty(shape, dtype=np.float64)
+        for i, row in enumerate(rows):
+            try:
+                ret[i] = [float(row[index]) for index in indices]
+            except ValueError:
+                ret[i] = [_parse_float(row[index]) for index in indices]
+        return ret
+
+
+def parse_rows(lines: list, schema: Schema, column_indices: dict, columns_count: int, delimiter: str):
+    """
+    Parse data lines into columns. Comments, lines with different number of columns and rows with
+    invalid required values are skipped
+    @return: CalibrationTable
+    """
+    rows = []
+    skipped_rows = 0
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        row = _split(line, delimiter)
+        if len(row) != columns_count:
+            if not schema.has_other_rows:
+                skipped_rows += 1
+            continue
+        rows.append(row)
+
+    name_index = column_indices["name"]
+    names = [row[name_index].strip() for row in rows]
+
+    fields = [field for field in column_indices.keys() if field != "name"]
+    matrix = get_values_matrix(rows, [column_indices[field] for field in fields])
+    columns = {field: np.ascontiguousarray(matrix[:, i]) for i, field in enumerate(fields)}
+
+    valid = np.ones(len(rows), dtype=bool)
+    for field in schema.required:
+        if field != "name":
+            valid &= np.isfinite(columns[field])
+    if not np.all(valid):
+        skipped_rows += int(np.count_nonzero(~valid))
+        names = list(itertools.compress(names, valid))
+        columns = {field: column[valid] for field, column in columns.items()}
+
+    return CalibrationTable(schema, names, columns, skipped_rows)
+
+
+def iter_calibration_chunks(filepath: str, chunk_rows: int = CHUNK_ROWS):
+    """
+    Parse calibration file by chunks of rows, so huge files are never held in memory as Python strings
+    @return: generator of CalibrationTable, nothing if schema is not recognized
+    """
+    with open(filepath, "r", encoding="utf-8", errors="replace") as file:
+        head = list(itertools.islice(file, MAX_HEADER_LINES))
+        detected = detect_schema(head)
+        if detected is None:
+            return
+        schema, column_indices, columns_count, delimiter, header_index = detected
+
+        lines = head[header_index + 1:]
+        is_first_chunk = True
+        while True:
+            lines.extend(itertools.islice(file, max(0, chunk_rows - len(lines))))
+            # File with no data rows is still recognized
+            if not (lines or is_first_chunk):
+                break
+            yield parse_rows(lines, schema, column_indices, columns_count, delimiter)
+            lines = []
+            is_first_chunk = False
+
+
+def read_calibration_file(filepath: str, chunk_rows: int = CHUNK_ROWS):
+    """
+    Parse the whole calibration file
+    @return: CalibrationTable or None if schema is not recognized
+    """
+    tables = list(iter_calibration_chunks(filepath, chunk_rows))
+    if not tables:
+        return None
+    if len(tables) == 1:
+        return tables[0]
+    return CalibrationTable.concatenate(tables)
+
+
+POSE_FIELDS = ("x", "y", "alt", "heading", "pitch", "roll")
+COLMAP_POSE_FIELDS = ("qw", "qx", "qy", "qz", "tx", "ty", "tz")
+
+# Coordinates larger than this are considered as georeferenced, these are offset to keep float32 precision
+GEOREFERENCE_THRESHOLD = 10000.0
+
+
+def get_rotation_matrices(axis: int, angles: np.ndarray):
+    """
+    Rotation matrices around the given axis (0, 1 or 2), counter-clockwise for positive angles
+    @return: numpy.ndarray (N, 3, 3)
+    """
+    cos = np.cos(angles)
+    sin = np.sin(angles)
+    i, j = (axis + 1) % 3, (axis + 2) % 3
+    ret = np.zeros((len(angles), 3, 3), dtype=np.float64)
+    ret[:, axis, axis] = 1.0
+    ret[:, i, i] = cos
+    ret[:, j, j] = cos
+    ret[:, i, j] = -sin
+    ret[:, j, i] = sin
+    return ret
+
+
+def get_quaternion_matrices(w: np.ndarray, x: np.ndarray, y: np.ndarray, z: np.ndarray):
+    """
+    Rotation matrices of the quaternions, quaternions are normalized
+    @return: numpy.ndarray (N, 3, 3)
+    """
+    norm = np.sqrt(w * w + x * x + y * y + z * z)
+    norm[norm == 0.0] = 1.0
+    w, x, y, z = w / norm, x / norm, y / norm, z / norm
+
+    ret = np.empty((len(w), 3, 3), dtype=np.float64)
+    ret[:, 0, 0] = 1.0 - 2.0 * (y * y + z * z)
+    ret[:, 0, 1] = 2.0 * (x * y - z * w)
+    ret[:, 0, 2] = 2.0 * (x * z + y * w)
+    ret[:, 1, 0] = 2.0 * (x * y + z * w)
+    ret[:, 1, 1] = 1.0 - 2.0 * (x * x + z * z)
+    ret[:, 1, 2] = 2.0 * (y * z - x * w)
+    ret[:, 2, 0] = 2.0 * (x * z - y * w)
+    ret[:, 2, 1] = 2.0 * (y * z + x * w)
+    ret[:, 2, 2] = 1.0 - 2.0 * (x * x + y * y)
+    return ret
+
+
+def get_euler_xyz(matrices: np.ndarray):
+    """
+    Euler angles of the rotation matrices in Blender 'XYZ' rotation mode (R = Rz @ Ry @ Rx)
+    @return: numpy.ndarray (N, 3)
+    """
+    cy = np.hypot(matrices[:, 0, 0], matrices[:, 1, 0])
+    is_singular = cy < 1e-6
+
+    ret = np.empty((len(matrices), 3), dtype=np.float64)
+    ret[:, 0] = np.where(
+        is_singular,
+        np.arctan2(-matrices[:, 1, 2], matrices[:, 1, 1]),
+        np.arctan2(matrices[:, 2, 1], matrices[:, 2, 2])
+    )
+    ret[:, 1] = np.arctan2(-matrices[:, 2, 0], cy)
+    ret[:, 2] = np.where(is_singular, 0.0, np.arctan2(matrices[:, 1, 0], matrices[:, 0, 0]))
+    return ret
+
+
+def get_poses(table: CalibrationTable, orientation: str = 'NADIR'):
+    """
+    World space camera locations and rotations of Blender camera objects (view along -Z, up is +Y).
+    Heading, pitch and roll (degrees) are applied as R = Rz(-heading) @ Rx(pitch) @ Ry(roll) to the camera looking
+    straight down with the top of the image to the north (+Y) for 'NADIR' orientation, or to the camera looking
+    to the north for 'HORIZON' orientation. COLMAP poses are world to camera transforms with +Z forward, +Y down
+    @return: tuple (numpy.ndarray (N, 3) locations, numpy.ndarray (N, 3, 3) rotations) or None if table has no poses
+    """
+    columns = table.columns
+
+    if table.has(*COLMAP_POSE_FIELDS):
+        rotations = get_quaternion_matrices(columns["qw"], columns["qx"], columns["qy"], columns["qz"])
+        translations = np.stack((columns["tx"], columns["ty"], columns["tz"]), axis=1)
+        # Camera center C = -R^T @ t, camera to world rotation is R^T
+        rotations = rotations.transpose(0, 2, 1)
+        locations = -np.einsum("nij,nj->ni", rotations, translations)
+        rotations = rotations * np.array((1.0, -1.0, -1.0))
+        return locations, rotations
+
+    if table.has(*POSE_FIELDS):
+        locations = np.stack((columns["x"], columns["y"], columns["alt"]), axis=1)
+        rotations = (
+                get_rotation_matrices(2, -np.radians(columns["heading"]))
+                @ get_rotation_matrices(0, np.radians(columns["pitch"]))
+                @ get_rotation_matrices(1, np.radians(columns["roll"]))
+        )
+        if orientation == 'HORIZON':
+            rotations = rotations @ get_rotation_matrices(0, np.full(len(table), np.pi / 2))
+        return locations, rotations
+
+
+def get_georeference_offset(locations: np.ndarray):
+    """
+    Rounded horizontal center of the georeferenced locations, zero offset for local coordinates.
+    Altitude is kept as is
+    @return: numpy.ndarray (3,)
+    """
+    ret = np.zeros(3, dtype=np.float64)
+    if len(locations) and np.max(np.abs(locations[:, 0:2])) >= GEOREFERENCE_THRESHOLD:
+        ret[0:2] = np.round((np.min(locations[:, 0:2], axis=0) + np.max(locations[:, 0:2], axis=0)) / 2.0)
+    return ret
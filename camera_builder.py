@@ -0,0 +1,307 @@
+# The module contains bulk creation and setup of camera objects from the parsed calibration table
+# (see calibration_csv). Cameras are created in batches, so large rigs can be built by modal operators
+# without blocking the interface
+import os
+import time
+
+import numpy as np
+
+from . import calibration_csv
+
+if "bpy" in locals():
+    import importlib
+    importlib.reload(calibration_csv)
+
+import bpy
+from mathutils import Matrix
+
+# Name of the collection of the created cameras
+CAMERAS_COLLECTION_NAME = "Cameras"
+# Number of cameras created per step
+BATCH_SIZE = 256
+# Poses are written to all objects at once if the cameras are at least this part of all objects
+FOREACH_MIN_FRACTION = 0.25
+
+
+def iter_name_variations(name: str):
+    splext = os.path.splitext(name)
+    if len(splext) > 1:
+        yield splext[0] + splext[-1].lower()
+    yield splext[0]
+
+
+def get_camera_name_index(camera_objects):
+    """
+    Name variations of the camera objects, if several cameras have the same variation, the last one is used
+    @return: dict {name variation: (index of camera object, camera object)}
+    """
+    ret = {}
+    for i, ob in enumerate(camera_objects):
+        for name in iter_name_variations(ob.name):
+            ret[name] = (i, ob)
+    return ret
+
+
+def find_camera_object(name_index: dict, item_name: str):
+    """
+    Camera object which name matches item name, the same as comparison of all name variations
+    @return: bpy.types.Object or None
+    """
+    found = None
+    for iname in iter_name_variations(item_name):
+        item = name_index.get(iname, None)
+        if item is not None and (found is None or item[0] > found[0]):
+            found = item
+    if found is not None:
+        return found[1]
+
+
+def get_lens_models(table):
+    """
+    Lens model of each row of calibration table, None where the model should not be changed
+    @return: list
+    """
+    columns = table.columns
+    has_radial = (columns["k2"] != 0.0) | (columns["k3"] != 0.0)
+    has_k4 = columns["k4"] != 0.0
+    has_tangential = (columns["t1"] != 0.0) | (columns["t2"] != 0.0)
+
+    models = np.full(len(table), None, dtype=object)
+    models[has_radial] = 'brown3'
+    models[has_radial & has_k4] = 'brown4'
+    models[has_radial & has_tangential] = 'brown3t2'
+    models[has_radial & has_tangential & has_k4] = 'brown4t2'
+    return models.tolist()
+
+
+def get_camera_collection(scene):
+    """
+    Collection of the created cameras, linked to the scene collection
+    @return: bpy.types.Collection
+    """
+    collection = scene.collection.children.get(CAMERAS_COLLECTION_NAME, None)
+    if collection is None:
+        collection = bpy.data.collections.new(CAMERAS_COLLECTION_NAME)
+        scene.collection.children.link(collection)
+    return collection
+
+
+def create_camera_objects(collection, names: list):
+    """
+    New camera objects linked to the collection
+    @return: list of bpy.types.Object
+    """
+    cameras = [bpy.data.cameras.new(name) for name in names]
+    camera_objects = [bpy.data.objects.new(name, camera) for name, camera in zip(names, cameras)]
+    link = collection.objects.link
+    for camera_object in camera_objects:
+        link(camera_object)
+    return camera_objects
+
+
+def set_camera_intrinsics(camera_objects: list, table, rows: list):
+    """
+    Set lens, principal point, distortion coefficients and lens model of the cameras from the given table rows
+    """
+    # Columns are converted to Python lists once, so rows are applied without NumPy scalar overhead
+    columns = {field: table.columns[field].tolist() for field in calibration_csv.INTRINSIC_FIELDS}
+    lens_models = get_lens_models(table)
+
+    for camera_object, i in zip(camera_objects, rows):
+        camera = camera_object.data
+
+        camera.lens = columns["f"][i]
+        camera.cpp.principal_point_x = columns["px"][i]
+        camera.cpp.principal_point_y = columns["py"][i]
+
+        camera.cpp.k1 = columns["k1"][i]
+        camera.cpp.k2 = columns["k2"][i]
+        camera.cpp.k3 = columns["k3"][i]
+        camera.cpp.k4 = columns["k4"][i]
+        camera.cpp.t1 = columns["t1"][i]
+        camera.cpp.t2 = columns["t2"][i]
+
+        if lens_models[i] is not None:
+            camera.cpp.camera_lens_model = lens_models[i]
+
+
+def set_camera_poses(camera_objects: list, locations: np.ndarray, rotations: np.ndarray):
+    """
+    Set world space transforms of the camera objects, scale is not changed. Linked cameras are not editable
+    and are skipped. Location and rotation of the objects without parent are written at once with foreach_set
+    if these are a large part of all objects and there are no linked objects, otherwise one by one.
+    Parented objects are set by matrix_world
+    """
+    eulers = calibration_csv.get_euler_xyz(rotations)
+
+    objects = bpy.data.objects
+    unparented = []
+    parented = []
+    for i, camera_object in enumerate(camera_objects):
+        if camera_object.library is not None:
+            continue
+        if camera_object.rotation_mode != 'XYZ':
+            camera_object.rotation_mode = 'XYZ'
+        if camera_object.parent is None:
+            unparented.append(i)
+        else:
+            parented.append(i)
+        camera_object.update_tag(refresh={'OBJECT'})
+
+    # foreach_set writes every object, so it's used only if all objects are local
+    use_foreach = len(unparented) >= len(objects) * FOREACH_MIN_FRACTION
+    if use_foreach:
+        object_indices = {}
+        for i, ob in enumerate(objects):
+            if ob.library is not None:
+                use_foreach = False
+                break
+            object_indices[ob.as_pointer()] = i
+
+    if unparented and use_foreach:
+        object_index = np.array(
+            [object_indices[camera_objects[i].as_pointer()] for i in unparented], dtype=np.int64
+        )
+        row_index = np.array(unparented, dtype=np.int64)
+        count = len(objects)
+
+        all_locations = np.empty((count, 3), dtype=np.float32)
+        objects.foreach_get("location", all_locations.ravel())
+        all_locations[object_index] = locations[row_index]
+        objects.foreach_set("location", all_locations.ravel())
+
+        all_rotations = np.empty((count, 3), dtype=np.float32)
+        objects.foreach_get("rotation_euler", all_rotations.ravel())
+        all_rotations[object_index] = eulers[row_index]
+        objects.foreach_set("rotation_euler", all_rotations.ravel())
+    else:
+        for i in unparented:
+            camera_object = camera_objects[i]
+            camera_object.location = locations[i].tolist()
+            camera_object.rotation_euler = eulers[i].tolist()
+
+    for i in parented:
+        camera_object = camera_objects[i]
+        matrix = np.identity(4, dtype=np.float64)
+        matrix[0:3, 0:3] = rotations[i] * np.array(camera_object.matrix_world.to_scale())
+        matrix[0:3, 3] = locations[i]
+        camera_object.matrix_world = Matrix(matrix.tolist())
+
+
+class CameraBuilder:
+    """
+    Applies calibration table to the scene cameras matched by name. Missing cameras are created in batches
+    by step(), table is applied to all cameras at once by finish()
+    """
+    __slots__ = (
+        "scene",
+        "table",
+        "poses",
+        "use_georeference_offset",
+        "camera_objects",
+        "missing",
+        "collection",
+        "created",
+        "create_time",
+        "offset",
+    )
+
+    def __init__(self, scene, table, poses=None, create_cameras=False, use_georeference_offset=True):
+        self.scene = scene
+        self.table = table
+        self.poses = poses  # see calibration_csv.get_poses
+        self.use_georeference_offset = use_georeference_offset
+
+        name_index = get_camera_name_index(scene.cpp.camera_objects)
+        self.camera_objects = [find_camera_object(name_index, item_name) for item_name in table.names]
+
+        # Cameras are created only if they can be placed
+        self.missing = []
+        if poses is not None and create_cameras:
+            self.missing = [i for i, camera_object in enumerate(self.camera_objects) if camera_object is None]
+        self.collection = None
+        self.created = 0
+        self.create_time = 0.0
+        self.offset = np.zeros(3, dtype=np.float64)
+
+    @property
+    def progress(self):
+        """
+        Part of the created cameras
+        @return: float
+        """
+        total = self.created + len(self.missing)
+        if not total:
+            return 1.0
+        return self.created / total
+
+    @property
+    def throughput(self):
+        """
+        Number of the created cameras per second
+        @return: float
+        """
+        return self.created / max(self.create_time, 1e-6)
+
+    def get_georeference_offset(self, locations: np.ndarray):
+        """
+        Offset of the georeferenced locations, offset of the previous import stored in the scene is reused,
+        so cameras of different calibration files stay aligned. Zero offset for local coordinates
+        @return: numpy.ndarray (3,)
+        """
+        offset = calibration_csv.get_georeference_offset(locations)
+        if not np.any(offset):
+            return offset
+        scene_offset = self.scene.cpp.georeference_offset
+        if any(scene_offset):
+            return np.array(scene_offset, dtype=np.float64)
+        self.scene.cpp.georeference_offset = offset.tolist()
+        return offset
+
+    def step(self, batch_size: int = BATCH_SIZE):
+        """
+        Create the next batch of missing cameras
+        @return: bool, True if all cameras have been created
+        """
+        if not self.missing:
+            return True
+        dt = time.time()
+        if self.collection is None:
+            self.collection = get_camera_collection(self.scene)
+
+        batch = self.missing[0:batch_size]
+        del self.missing[0:batch_size]
+
+        names = [self.table.names[i] for i in batch]
+        for i, camera_object in zip(batch, create_camera_objects(self.collection, names)):
+            self.camera_objects[i] = camera_object
+        self.created += len(batch)
+        self.create_time += time.time() - dt
+        return not self.missing
+
+    def finish(self):
+        """
+        Create remaining cameras and apply intrinsics and poses
+        @return: tuple (int matched or created cameras, int skipped rows)
+        """
+        while not self.step():
+            pass
+
+        rows = [i for i, camera_object in enumerate(self.camera_objects) if camera_object is not None]
+        camera_objects = [self.camera_objects[i] for i in rows]
+        table = self.table
+
+        if table.has(*calibration_csv.INTRINSIC_FIELDS):
+            set_camera_intrinsics(camera_objects, table, rows)
+
+        if self.poses is not None and rows:
+            locations, rotations = self.poses
+            if self.use_georeference_offset:
+                self.offset = self.get_georeference_offset(locations)
+            set_camera_poses(camera_objects, locations[rows] - self.offset, rotations[rows])
+
+        if self.created:
+            print(f"Camera Projection Painter: Created {self.created} cameras in {self.create_time:.6f} sec "
+                  f"({self.throughput:.0f} cameras per sec)")
+
+        return len(rows), table.skipped_rows + len(table) - len(rows)
@@ -1,3 +1,18 @@
-from . _engine import *
+# The backend is selected at import time. Compiled "_engine" module is used by default on Windows,
+# pure Python/NumPy "_pyengine" package is used on other platforms. Environment variable
+# CPP_ENGINE_BACKEND ('NATIVE' or 'NUMPY') can be used to override the default.
+import os
+import sys
+
+SUPPORTED_BACKENDS = ('NATIVE', 'NUMPY')
+
+BACKEND = os.environ.get("CPP_ENGINE_BACKEND", 'NATIVE' if sys.platform == "win32" else 'NUMPY').upper()
+if BACKEND not in SUPPORTED_BACKENDS:
+    BACKEND = 'NUMPY'
+
+if BACKEND == 'NATIVE':
+    from . _engine import *
+else:
+    from . _pyengine import *
 
 shaders = ShaderCache()
@@ -0,0 +1,38 @@
+# Pure Python/NumPy implementation of the engine module.
+# Mirrors the interface of the compiled "_engine" extension so it can be used on platforms
+# where the extension is not available.
+
+from . import environment
+from . import shader_cache
+from . import image_seq
+from . import bind
+
+if "bpy" in locals():
+    import importlib
+    importlib.reload(environment)
+    importlib.reload(shader_cache)
+    importlib.reload(image_seq)
+    importlib.reload(bind)
+
+import bpy
+
+__all__ = (
+    "TEMP_DATA_NAME",
+    "SUPPORTED_IMAGE_EXTENSIONS",
+    "Environment",
+    "ShaderCache",
+    "updateImageSeqStaticSize",
+    "updateImageSeqPreviews",
+    "bindCameraImages",
+    "getBindStatistics",
+)
+
+TEMP_DATA_NAME = environment.TEMP_DATA_NAME
+SUPPORTED_IMAGE_EXTENSIONS = image_seq.SUPPORTED_IMAGE_EXTENSIONS
+
+Environment = environment.Environment
+ShaderCache = shader_cache.ShaderCache
+updateImageSeqStaticSize = image_seq.updateImageSeqStaticSize
+updateImageSeqPreviews = image_seq.updateImageSeqPreviews
+bindCameraImages = bind.bindCameraImages
+getBindStatistics = bind.getBindStatistics
@@ -0,0 +1,194 @@
+import os
+import time
+from collections import Counter
+
+from . import directory_index
+
+if "bpy" in locals():
+    import importlib
+    importlib.reload(directory_index)
+
+import bpy
+
+
+def _get_stem(name: str):
+    return os.path.splitext(os.path.basename(name))[0]
+
+
+class BindStatistics:
+    """
+    Counters of the last bindCameraImages call
+    """
+    __slots__ = ()
+
+    found_by_name = 0
+    found_by_filepath = 0
+    found_in_source_dir = 0
+    not_found = 0
+    ambiguous = 0
+    indexed_images = 0
+    indexed_files = 0
+    time = 0.0
+
+    @classmethod
+    def as_dict(cls):
+        return {
+            "found_by_name": cls.found_by_name,
+            "found_by_filepath": cls.found_by_filepath,
+            "found_in_source_dir": cls.found_in_source_dir,
+            "not_found": cls.not_found,
+            "ambiguous": cls.ambiguous,
+            "indexed_images": cls.indexed_images,
+            "indexed_files": cls.indexed_files,
+            "time": cls.time,
+        }
+
+
+def getBindStatistics():
+    """
+    Match statistics of the last bindCameraImages call
+    @return: dict
+    """
+    return BindStatistics.as_dict()
+
+
+def get_images_index():
+    """
+    Images of the current file by name stem and by file path stem. If several images have the same stem,
+    the first one in bpy.data.images order is used, the same as linear search does
+    @return: tuple (dict {stem: image}, dict {stem: image})
+    """
+    by_name = {}
+    by_filepath = {}
+    for image in bpy.data.images:
+        by_name.setdefault(_get_stem(image.name), image)
+        if image.filepath:
+            by_filepath.setdefault(_get_stem(bpy.path.abspath(image.filepath)), image)
+    return by_name, by_filepath
+
+
+def get_source_files_index(source_dir: str, recursive=True):
+    """
+    Image files of the source directory tree by stem. Files of the source directory itself go first,
+    then files of subdirectories depth-first in sorted order
+    @return: dict {stem: list of filepaths}
+    """
+    ret = {}
+    for fp in directory_index.iter_source_dir_files(source_dir, recursive):
+        ret.setdefault(_get_stem(fp), []).append(fp)
+    return ret
+
+
+def select_source_files(source_files: dict, stems):
+    """
+    Source file of each stem. If several files of the source directory tree have the same stem, the file
+    of the directory which contains most of the unambiguous matches of the other stems is selected.
+    If it's a tie, the first file in source files order is selected and the stem is reported as ambiguous
+    @return: tuple (dict {stem: filepath}, set of ambiguous stems)
+    """
+    stems = set(stems)
+    votes = Counter()
+    for stem in stems:
+        fps = source_files.get(stem, None)
+        if fps is not None and len(fps) == 1:
+            votes[os.path.dirname(fps[0])] += 1
+
+    ret = {}
+    ambiguous = set()
+    for stem in stems:
+        fps = source_files.get(stem, None)
+        if fps is None:
+            continue
+        if len(fps) == 1:
+            ret[stem] = fps[0]
+            continue
+        scores = [votes[os.path.dirname(fp)] for fp in fps]
+        best_score = max(scores)
+        ret[stem] = fps[scores.index(best_score)]
+        if scores.count(best_score) > 1:
+            ambiguous.add(stem)
+    return ret, ambiguous
+
+
+def bindCameraImages(camera_seq, source_dir: str, search_blend: bool, rename: bool, recursive=True):
+    """
+    Bind images by matching filename or Blender datablock name (or datablock filepath if exists).
+    Images and source directory files are indexed by stem once, so each camera is matched in constant time.
+    Unlike the compiled backend, which searches the source directory only, subdirectories are searched too
+    unless recursive is disabled
+    @return: int, number of binded cameras
+    """
+    dt = time.time()
+
+    found_by_name = 0
+    found_by_filepath = 0
+    found_in_source_dir = 0
+
+    images_by_name = {}
+    images_by_filepath = {}
+    if search_blend:
+        images_by_name, images_by_filepath = get_images_index()
+
+    camera_stems = [_get_stem(camera_object.name) for camera_object in camera_seq]
+    images = []
+    for camera_stem in camera_stems:
+        image = images_by_name.get(camera_stem, None)
+        if image is not None:
+            found_by_name += 1
+        else:
+            image = images_by_filepath.get(camera_stem, None)
+            if image is not None:
+                found_by_filepath += 1
+        images.append(image)
+
+    # Source directory is listed only if some camera is not found among the images. Files are selected
+    # for all the remaining cameras at once, so files with the same stem are resolved by the other matches
+    source_files = None
+    ambiguous = set()
+    unresolved = [i for i, image in enumerate(images) if image is None]
+    if unresolved:
+        source_files = get_source_files_index(source_dir, recursive)
+        selected, ambiguous = select_source_files(source_files, (camera_stems[i] for i in unresolved))
+        for i in unresolved:
+            fp = selected.get(camera_stems[i], None)
+            if fp is not None:
+                images[i] = bpy.data.images.load(filepath=fp, check_existing=True)
+                found_in_source_dir += 1
+
+    binded = 0
+    for camera_object, image in zip(camera_seq, images):
+        if image is None:
+            continue
+
+        if rename and image.filepath:
+            filename = os.path.basename(bpy.path.abspath(image.filepath))
+            image.name = filename
+            camera_object.name = filename
+
+        camera = camera_object.data
+        if camera.cpp.image != image:
+            camera.cpp.image = image
+        binded += 1
+
+    BindStatistics.found_by_name = found_by_name
+    BindStatistics.found_by_filepath = found_by_filepath
+    BindStatistics.found_in_source_dir = found_in_source_dir
+    BindStatistics.not_found = len(camera_seq) - binded
+    BindStatistics.ambiguous = sum(1 for i in unresolved if camera_stems[i] in ambiguous)
+    BindStatistics.indexed_images = len(images_by_name)
+    BindStatistics.indexed_files = sum(len(fps) for fps in source_files.values()) if source_files is not None else 0
+    BindStatistics.time = time.time() - dt
+
+    if binded:
+        search_info = "" if search_blend else "(with no search option)"
+        print(f"Camera Projection Painter: Binded {binded} images in {time.time() - dt:.6f} sec:\n"
+              f"\tFound among the images in the current file by name: {found_by_name} {search_info}\n"
+              f"\tFound among images in the current file by file path {found_by_filepath} {search_info}\n"
+              f"\tFound among files in source directory:              {found_in_source_dir}")
+        if ambiguous:
+            print(f"\tSeveral source files have the same name, the first one is used for: "
+                  f"{', '.join(sorted(ambiguous))}")
+    else:
+        print("Camera Projection Painter: No match found for any camera")
+
+    return binded
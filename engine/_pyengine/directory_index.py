@@ -0,0 +1,217 @@
+import json
+import os
+
+import bpy
+
+from .image_seq import SUPPORTED_IMAGE_EXTENSIONS
+
+INDEX_VERSION = 1
+# Index file is stored next to the *.blend file as "<blend file name>.cpp_index.json"
+INDEX_FILE_SUFFIX = ".cpp_index.json"
+
+
+def get_index_filepath():
+    """
+    Path of the directory index file of the current *.blend file
+    @return: str or None if the file has not been saved yet
+    """
+    blend_filepath = bpy.data.filepath
+    if not blend_filepath:
+        return None
+    return os.path.splitext(blend_filepath)[0] + INDEX_FILE_SUFFIX
+
+
+class DirectoryIndex:
+    """
+    Recursive listing of the image files of a directory tree. Directories are listed again only
+    if their modification time has changed (files have been added, removed or renamed), unchanged
+    directories cost a single os.stat call
+    """
+    __slots__ = (
+        "root",
+        "directories",
+        "scanned",
+        "reused",
+    )
+
+    def __init__(self, root: str, directories=None):
+        self.root = root
+        # Relative path: {"mtime": int, "files": [[name, size, mtime], ...], "subdirs": [name, ...]}
+        self.directories = directories or {}
+        self.scanned = 0
+        self.reused = 0
+
+    @staticmethod
+    def _scan_directory(path: str, mtime: int):
+        files = []
+        subdirs = []
+        with os.scandir(path) as it:
+            for entry in it:
+                # Hidden directories contain cached data, not source images
+                if entry.name.startswith("."):
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.name)
+                    elif entry.is_file() and os.path.splitext(entry.name)[1].lower() in SUPPORTED_IMAGE_EXTENSIONS:
+                        stat = entry.stat()
+                        files.append([entry.name, stat.st_size, stat.st_mtime_ns])
+                except OSError:
+                    continue
+        files.sort()
+        subdirs.sort()
+        return {"mtime": mtime, "files": files, "subdirs": subdirs}
+
+    def update(self):
+        """
+        Rescan changed directories, removed directories are dropped from the index
+        @return: bool, True if the index has been changed
+        """
+        self.scanned = 0
+        self.reused = 0
+        directories = {}
+
+        stack = ["."]
+        while stack:
+            rel_path = stack.pop()
+            path = os.path.normpath(os.path.join(self.root, rel_path))
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+
+            item = self.directories.get(rel_path, None)
+            if item is not None and item["mtime"] == mtime:
+                self.reused += 1
+            else:
+                try:
+                    item = self._scan_directory(path, mtime)
+                except OSError:
+                    continue
+                self.scanned += 1
+            directories[rel_path] = item
+
+            # Depth-first, in sorted order
+            stack.extend(os.path.join(rel_path, name) for name in reversed(item["subdirs"]))
+
+        is_changed = bool(self.scanned) or len(directories) != len(self.directories)
+        self.directories = directories
+        return is_changed
+
+    def iter_files(self):
+        """
+        Absolute paths of the indexed files, files of the root directory first, then subdirectories depth-first
+        @return: generator of tuple (str path, int size, int mtime)
+        """
+        stack = ["."]
+        while stack:
+            rel_path = stack.pop()
+            item = self.directories.get(rel_path, None)
+            if item is None:
+                continue
+            path = os.path.normpath(os.path.join(self.root, rel_path))
+            for name, size, mtime in item["files"]:
+                yield os.path.join(path, name), size, mtime
+            stack.extend(os.path.join(rel_path, name) for name in reversed(item["subdirs"]))
+
+    @property
+    def files_count(self):
+        return sum(len(item["files"]) for item in self.directories.values())
+
+
+class DirectoryIndexCache:
+    """
+    Directory indices of the current session, loaded from and saved to the index file of the *.blend file
+    """
+    __slots__ = ()
+
+    indices = {}  # root: DirectoryIndex
+    index_filepath = None
+
+    @classmethod
+    def _load(cls, index_filepath):
+        cls.indices.clear()
+        cls.index_filepath = index_filepath
+        if not index_filepath:
+            return
+        try:
+            with open(index_filepath, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get("version", None) != INDEX_VERSION:
+            return
+        for root, directories in data.get("roots", {}).items():
+            cls.indices[root] = DirectoryIndex(root, directories)
+
+    @classmethod
+    def _save(cls):
+        if not cls.index_filepath:
+            return
+        data = {
+            "version": INDEX_VERSION,
+            "roots": {root: index.directories for root, index in cls.indices.items()},
+        }
+        tmp_filepath = cls.index_filepath + ".tmp"
+        try:
+            with open(tmp_filepath, "w", encoding="utf-8") as file:
+                json.dump(data, file, separators=(",", ":"))
+            os.replace(tmp_filepath, cls.index_filepath)
+        except OSError:
+            try:
+                os.remove(tmp_filepath)
+            except OSError:
+                pass
+
+    @classmethod
+    def get(cls, directory: str):
+        """
+        Up to date index of the directory tree
+        @return: DirectoryIndex or None if the directory does not exist
+        """
+        directory = os.path.normpath(bpy.path.abspath(directory))
+        if not os.path.isdir(directory):
+            return None
+
+        is_moved = False
+        index_filepath = get_index_filepath()
+        if index_filepath != cls.index_filepath:
+            # Indices of the unsaved file are moved to the index file of the first save, merged with indices
+            # already stored there
+            indices = dict(cls.indices) if cls.index_filepath is None else {}
+            cls._load(index_filepath)
+            for root, index in indices.items():
+                if root not in cls.indices:
+                    cls.indices[root] = index
+                    is_moved = True
+
+        index = cls.indices.get(directory, None)
+        if index is None:
+            index = cls.indices[directory] = DirectoryIndex(directory)
+        if index.update() or is_moved:
+            cls._save()
+        return index
+
+
+def iter_source_dir_files(source_dir: str, recursive=True):
+    """
+    Image files of the source directory and all its subdirectories, or of the source directory only.
+    Single directory is listed directly, without index
+    @return: generator of str
+    """
+    if not source_dir:
+        return
+    if not recursive:
+        directory = os.path.normpath(bpy.path.abspath(source_dir))
+        try:
+            item = DirectoryIndex._scan_directory(directory, 0)
+        except OSError:
+            return
+        for name, _size, _mtime in item["files"]:
+            yield os.path.join(directory, name)
+        return
+    index = DirectoryIndexCache.get(source_dir)
+    if index is None:
+        return
+    for fp, _size, _mtime in index.iter_files():
+        yield fp
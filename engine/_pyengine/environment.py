@@ -0,0 +1,202 @@
+import time
+
+import numpy as np
+
+TEMP_DATA_NAME = "cpp_data"
+
+# Order matters, index of the model is passed to shaders as "UND_lens_distortion_model"
+LENS_MODELS = ("perspective", "division", "brown3", "brown4", "brown3t2", "brown4t2")
+
+# Film width used by photogrammetry software to express focal length (35mm film format)
+FILM_WIDTH = 36.0
+
+
+def get_projection_matrix(lens: float, width: int, height: int, clip_start: float, clip_end: float):
+    """
+    Projection matrix which maps the camera frustum to the [-0.5, 0.5] image rectangle,
+    as expected by "undistorted_uv" shader library
+    @return: numpy.ndarray (4, 4)
+    """
+    scale_to_pixel = max(width, height)
+    focal_length = lens * scale_to_pixel / FILM_WIDTH
+
+    near = clip_start
+    far = clip_end
+
+    mat = np.zeros((4, 4), dtype=np.float64)
+    mat[0][0] = focal_length / width
+    mat[1][1] = focal_length / height
+    mat[2][2] = -(far + near) / (far - near)
+    mat[2][3] = -2.0 * far * near / (far - near)
+    mat[3][2] = -1.0
+    return mat
+
+
+def get_projector_mvp(matrix_world, lens: float, width: int, height: int, clip_start: float, clip_end: float):
+    """
+    Projector ModelViewProjection matrix. The model matrix of the painted object is not included
+    @return: numpy.ndarray (4, 4)
+    """
+    view = np.linalg.inv(np.array(matrix_world, dtype=np.float64))
+    return get_projection_matrix(lens, width, height, clip_start, clip_end) @ view
+
+
+def project_points(mvp: np.ndarray, points: np.ndarray):
+    """
+    Project world space points with projector matrix.
+    Returned coordinates are centered, visible area is [-0.5, 0.5]
+    @return: numpy.ndarray (N, 2)
+    """
+    hp = points @ mvp[0:3, 0:3].T + mvp[0:3, 3]
+    w = points @ mvp[3, 0:3] + mvp[3, 3]
+    w[np.abs(w) < 1e-8] = 1e-8
+    return hp[:, 0:2] / w[:, None]
+
+
+def undistorted_uv(uv: np.ndarray, width: int, height: int, lens: float, model: int,
+                   principal_point_x=0.0, principal_point_y=0.0, skew=0.0, aspect_ratio=1.0,
+                   k1=0.0, k2=0.0, k3=0.0, k4=0.0, t1=0.0, t2=0.0):
+    """
+    Vectorized version of the "undistorted_uv" shader library function
+    @return: numpy.ndarray (N, 2)
+    """
+    if model == 0:
+        k1 = 0.0
+    if model < 2:
+        k2 = k3 = 0.0
+    if model not in (3, 5):
+        k4 = 0.0
+    if model not in (4, 5):
+        t1 = t2 = 0.0
+
+    scale_to_pixel = max(width, height)
+    focal_length = lens * scale_to_pixel / FILM_WIDTH
+    principal_point_u = principal_point_x * scale_to_pixel + width / 2
+    principal_point_v = principal_point_y * scale_to_pixel + height / 2
+    camera_skew = skew * scale_to_pixel
+
+    cx = uv[:, 0] * width / focal_length
+    cy = -uv[:, 1] * height / focal_length
+
+    if model == 0:
+        dcx = cx
+        dcy = cy
+    elif model == 1:
+        kr2 = 1.0 + k1 * (cx * cx + cy * cy)
+        dcx = cx / kr2
+        dcy = cy / kr2
+    else:
+        x2 = cx * cx
+        y2 = cy * cy
+        xy2 = 2.0 * cx * cy
+        r2 = x2 + y2
+        ln = 1.0 + (((k4 * r2 + k3) * r2 + k2) * r2 + k1) * r2
+        tx = t1 * (r2 + 2.0 * x2) + t2 * xy2
+        ty = t2 * (r2 + 2.0 * y2) + t1 * xy2
+        dcx = cx * ln + tx
+        dcy = cy * ln + ty
+
+    res = np.empty(uv.shape, dtype=uv.dtype)
+    res[:, 0] = (focal_length * dcx + camera_skew * dcy + principal_point_u) / width
+    res[:, 1] = 1.0 - ((focal_length * aspect_ratio * dcy + principal_point_v) / height)
+    return res
+
+
+def project_uv(world_co: np.ndarray, matrix_world, clip_start: float, clip_end: float, calibration: dict):
+    """
+    Undistorted image UV coordinates of the world space points projected from the camera
+    @return: tuple (numpy.ndarray (4, 4) projector matrix, numpy.ndarray (N, 2) UV coordinates)
+    """
+    mvp = get_projector_mvp(
+        matrix_world, calibration["lens"], calibration["width"], calibration["height"], clip_start, clip_end)
+    return mvp, undistorted_uv(project_points(mvp, world_co), **calibration)
+
+
+def get_camera_calibration(camera_object):
+    """
+    Image size, lens and distortion parameters of the camera as keyword arguments for "undistorted_uv"
+    @return: dict
+    """
+    camera = camera_object.data
+    width, height = 1, 1
+    image = camera.cpp.image
+    if image and image.cpp.valid:
+        width, height = image.cpp.static_size
+
+    calibration = {
+        "width": width,
+        "height": height,
+        "lens": camera.lens,
+        "model": LENS_MODELS.index(camera.cpp.camera_lens_model),
+    }
+    for attr in ("principal_point_x", "principal_point_y", "skew", "aspect_ratio",
+                 "k1", "k2", "k3", "k4", "t1", "t2"):
+        calibration[attr] = getattr(camera.cpp, attr)
+    return calibration
+
+
+class Environment:
+    """
+    Projection of the painted object mesh from the camera (projector) into the temporary UV layer,
+    used by clone brush to sample the camera image
+    """
+    __slots__ = (
+        "ob",
+        "uv_layer",
+        "loop_vertex_index",
+        "projector_MVP",
+        "thread_count",
+    )
+
+    def __init__(self, ob, uv_layer):
+        if ob is None or ob.type != 'MESH':
+            raise TypeError(f"Object type must be mesh, not {getattr(ob, 'type', None)}")
+        if ob.mode != 'TEXTURE_PAINT':
+            raise RuntimeError(f"Object must be in texture paint mode, not {ob.mode}")
+
+        self.ob = ob
+        self.uv_layer = uv_layer
+        self.projector_MVP = np.identity(4, dtype=np.float64)
+        self.thread_count = 1
+
+        mesh = ob.data
+        self.loop_vertex_index = np.empty(len(mesh.loops), dtype=np.int32)
+        mesh.loops.foreach_get("vertex_index", self.loop_vertex_index)
+
+    def setProjector(self, camera, debug_info=False):
+        """
+        Projection warp UV layer data.
+        @return: int, 0 mean success
+        """
+        dt = time.time()
+
+        ob = self.ob
+        mesh = ob.data
+
+        calibration = get_camera_calibration(camera)
+        camera_data = camera.data
+
+        vertices_count = len(mesh.vertices)
+        co = np.empty(vertices_count * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", co)
+        co = co.reshape(vertices_count, 3).astype(np.float64)
+
+        model_matrix = np.array(ob.matrix_world, dtype=np.float64)
+        world_co = co @ model_matrix[0:3, 0:3].T + model_matrix[0:3, 3]
+
+        self.projector_MVP, vertex_uv = project_uv(
+            world_co, camera.matrix_world, camera_data.clip_start, camera_data.clip_end, calibration)
+        loop_uv = vertex_uv[self.loop_vertex_index].astype(np.float32)
+
+        calc_time = time.time() - dt
+
+        dt_set = time.time()
+        self.uv_layer.data.foreach_set("uv", loop_uv.ravel())
+        mesh.update_tag()
+        set_time = time.time() - dt_set
+
+        if debug_info:
+            print(f"Camera Projection Painter: Set Projector in {calc_time + set_time:.6f} sec:\n"
+                  f"\tCalculation stage:               {calc_time:.6f}\n"
+                  f"\t'foreach_set' 'update_tag' call: {set_time:.6f}")
+        return 0
@@ -0,0 +1,200 @@
+import os
+import struct
+
+# Bytes read at once, enough for PNG, BMP, TGA and most of TIFF and EXR headers
+HEADER_CHUNK_SIZE = 64 * 1024
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+EXR_MAGIC = b"\x76\x2f\x31\x01"
+
+# JPEG markers without segment length
+JPEG_STANDALONE_MARKERS = {0x01} | set(range(0xD0, 0xDA))
+# Start Of Frame markers, excluding DHT (0xC4), JPG (0xC8) and DAC (0xCC)
+JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+TIFF_IMAGE_WIDTH = 256
+TIFF_IMAGE_LENGTH = 257
+TIFF_SHORT = 3
+TIFF_LONG = 4
+
+
+def _read_jpeg_size(file):
+    file.seek(2)
+    while True:
+        byte = file.read(1)
+        if not byte:
+            return None
+        if byte != b"\xff":
+            continue
+        marker = file.read(1)
+        # Fill bytes
+        while marker == b"\xff":
+            marker = file.read(1)
+        if not marker:
+            return None
+        marker = marker[0]
+        if marker in JPEG_STANDALONE_MARKERS or marker == 0x00:
+            continue
+        length_data = file.read(2)
+        if len(length_data) != 2:
+            return None
+        length = struct.unpack(">H", length_data)[0]
+        if length < 2:
+            return None
+        if marker in JPEG_SOF_MARKERS:
+            data = file.read(5)
+            if len(data) != 5:
+                return None
+            height, width = struct.unpack(">xHH", data)
+            return width, height
+        file.seek(length - 2, os.SEEK_CUR)
+
+
+def _read_png_size(header: bytes):
+    if len(header) < 24 or header[12:16] != b"IHDR":
+        return None
+    return struct.unpack(">II", header[16:24])
+
+
+def _read_tiff_size(file, header: bytes):
+    endian = "<" if header[0:2] == b"II" else ">"
+    if struct.unpack(endian + "H", header[2:4])[0] != 42:
+        # BigTIFF and unknown variants
+        return None
+    ifd_offset = struct.unpack(endian + "I", header[4:8])[0]
+    file.seek(ifd_offset)
+    count_data = file.read(2)
+    if len(count_data) != 2:
+        return None
+    count = struct.unpack(endian + "H", count_data)[0]
+    entries = file.read(count * 12)
+
+    width = height = 0
+    for i in range(len(entries) // 12):
+        tag, field_type = struct.unpack(endian + "HH", entries[i * 12:i * 12 + 4])
+        if tag not in (TIFF_IMAGE_WIDTH, TIFF_IMAGE_LENGTH):
+            continue
+        value_data = entries[i * 12 + 8:i * 12 + 12]
+        if field_type == TIFF_SHORT:
+            value = struct.unpack(endian + "H", value_data[0:2])[0]
+        elif field_type == TIFF_LONG:
+            value = struct.unpack(endian + "I", value_data)[0]
+        else:
+            return None
+        if tag == TIFF_IMAGE_WIDTH:
+            width = value
+        else:
+            height = value
+    if width and height:
+        return width, height
+    return None
+
+
+def _read_exr_size(file):
+    # Attributes follow the magic number and version field: name\0, type\0, int32 size, value
+    file.seek(8)
+    while True:
+        name = _read_null_terminated(file)
+        if not name:
+            return None
+        attribute_type = _read_null_terminated(file)
+        size_data = file.read(4)
+        if attribute_type is None or len(size_data) != 4:
+            return None
+        size = struct.unpack("<i", size_data)[0]
+        if name == b"dataWindow" and attribute_type == b"box2i" and size == 16:
+            x_min, y_min, x_max, y_max = struct.unpack("<iiii", file.read(16))
+            return x_max - x_min + 1, y_max - y_min + 1
+        file.seek(size, os.SEEK_CUR)
+
+
+def _read_null_terminated(file):
+    ret = bytearray()
+    while True:
+        char = file.read(1)
+        if not char:
+            return None
+        if char == b"\x00":
+            return bytes(ret)
+        ret += char
+        if len(ret) > 255:
+            return None
+
+
+def _read_bmp_size(header: bytes):
+    if len(header) < 26:
+        return None
+    width, height = struct.unpack("<ii", header[18:26])
+    return width, abs(height)
+
+
+def _read_tga_size(header: bytes):
+    if len(header) < 18:
+        return None
+    return struct.unpack("<HH", header[12:16])
+
+
+def read_image_size(filepath: str):
+    """
+    Image width and height read from the file header only, pixel data is never read.
+    Supported are JPEG, PNG, TIFF, OpenEXR, BMP and TGA files
+    @return: tuple (width, height) or None if format is not recognized
+    """
+    try:
+        with open(filepath, "rb") as file:
+            header = file.read(HEADER_CHUNK_SIZE)
+            if header[0:3] == b"\xff\xd8\xff":
+                size = _read_jpeg_size(file)
+            elif header[0:8] == PNG_SIGNATURE:
+                size = _read_png_size(header)
+            elif header[0:2] in (b"II", b"MM"):
+                size = _read_tiff_size(file, header)
+            elif header[0:4] == EXR_MAGIC:
+                size = _read_exr_size(file)
+            elif header[0:2] == b"BM":
+                size = _read_bmp_size(header)
+            elif os.path.splitext(filepath)[1].lower() == ".tga":
+                size = _read_tga_size(header)
+            else:
+                size = None
+    except (OSError, struct.error):
+        return None
+
+    if size is None or not (size[0] > 0 and size[1] > 0):
+        return None
+    return int(size[0]), int(size[1])
+
+
+class ImageSizeCache:
+    """
+    Results of the header reading, keyed by file path and modification time
+    """
+    __slots__ = ()
+
+    sizes = {}  # (filepath, st_mtime_ns): (width, height) or None
+    hits = 0
+    misses = 0
+
+    @classmethod
+    def get(cls, filepath: str):
+        """
+        Cached image size of the file
+        @return: tuple (width, height) or None if the size can't be read from header
+        """
+        try:
+            key = (filepath, os.stat(filepath).st_mtime_ns)
+        except OSError:
+            return None
+        if key in cls.sizes:
+            cls.hits += 1
+            return cls.sizes[key]
+        cls.misses += 1
+        size = read_image_size(filepath)
+        cls.sizes[key] = size
+        return size
+
+    @classmethod
+    def clear(cls):
+        cls.sizes.clear()
+        cls.hits = 0
+        cls.misses = 0
@@ -0,0 +1,140 @@
+import time
+
+import numpy as np
+
+from . import image_header
+
+if "bpy" in locals():
+    import importlib
+    importlib.reload(image_header)
+
+import bpy
+
+SUPPORTED_IMAGE_EXTENSIONS = (".bmp", ".jpg", ".jpeg", ".png", ".tga", ".tif", ".tiff")
+
+
+def _get_image_size(image):
+    """
+    Image width and height, (0, 0) if image can't be read. Size of the unmodified image file
+    is read from the file header, so pixels are not loaded
+    @return: tuple
+    """
+    if image.source == 'GENERATED':
+        return image.generated_width, image.generated_height
+    if image.source != 'FILE':
+        return 0, 0
+    if not (image.has_data or image.packed_file or image.is_dirty):
+        size = image_header.ImageSizeCache.get(bpy.path.abspath(image.filepath))
+        if size is not None:
+            return size
+    width, height = image.size
+    return width, height
+
+
+def updateImageSeqStaticSize(image_seq, skip_already_set=True):
+    """
+    Read image header for every image in given sequence and update image.cpp.static_size to current value.
+    @return: int, zero means success
+    """
+    for image in image_seq:
+        if skip_already_set and image.cpp.static_size[0]:
+            continue
+        size = _get_image_size(image)
+        if tuple(image.cpp.static_size) != size:
+            image.cpp.static_size = size
+    return 0
+
+
+def get_thumbnail(pixels: np.ndarray, width: int, height: int, size: int):
+    """
+    Nearest neighbour downscale of the float pixels to fit given size, aspect ratio is preserved
+    @return: tuple (numpy.ndarray RGBA, width, height)
+    """
+    scale = min(1.0, size / max(width, height))
+    th_width = max(1, int(round(width * scale)))
+    th_height = max(1, int(round(height * scale)))
+
+    rows = (np.arange(th_height) * height // th_height)
+    cols = (np.arange(th_width) * width // th_width)
+
+    pixels = pixels.reshape(height, width, -1)
+    channels = pixels.shape[2]
+    thumbnail = np.ones((th_height, th_width, 4), dtype=np.float32)
+    thumbnail[:, :, 0:channels] = pixels[rows[:, None], cols[None, :], 0:4]
+    if channels < 3:
+        thumbnail[:, :, 0:3] = thumbnail[:, :, 0:1]
+    return thumbnail, th_width, th_height
+
+
+def pack_pixels(pixels: np.ndarray):
+    """
+    Pack float RGBA pixels into int32 array, one element per pixel
+    @return: numpy.ndarray
+    """
+    pixels_u8 = (np.clip(pixels, 0.0, 1.0) * 255.0 + 0.5).astype(np.uint8)
+    return np.ascontiguousarray(pixels_u8).view(np.int32).ravel()
+
+
+def updateImageSeqPreviews(image_seq, skip_already_set=True, get_pixel_arrays=False):
+    """
+    Update icon and preview for each image in sequence.
+    @return: list of numpy int32 pixel arrays when get_pixel_arrays is True, otherwise empty list
+    """
+    dt = time.time()
+
+    ret = []
+    used_disk = 0
+    used_packed = 0
+    skipped = 0
+
+    preview_size = bpy.app.render_preview_size
+    icon_size = bpy.app.render_icon_size
+
+    for image in image_seq:
+        if not image.cpp.valid:
+            skipped += 1
+            continue
+
+        preview = image.preview
+        if skip_already_set and len(preview.image_pixels):
+            check_arr = np.empty(len(preview.image_pixels), dtype=np.int32)
+            preview.image_pixels.foreach_get(check_arr)
+            if np.any(check_arr):
+                skipped += 1
+                continue
+
+        has_data = image.has_data
+        pixels = np.empty(len(image.pixels), dtype=np.float32)
+        try:
+            image.pixels.foreach_get(pixels)
+            width, height = image.size
+        except (RuntimeError, ValueError):
+            skipped += 1
+            continue
+
+        if image.packed_file:
+            used_packed += 1
+        else:
+            used_disk += 1
+
+        prev_pixels, prev_width, prev_height = get_thumbnail(pixels, width, height, preview_size)
+        preview.image_size = prev_width, prev_height
+        preview.image_pixels_float.foreach_set(prev_pixels.ravel())
+
+        icon_pixels, icon_width, icon_height = get_thumbnail(pixels, width, height, icon_size)
+        preview.icon_size = icon_width, icon_height
+        preview.icon_pixels_float.foreach_set(icon_pixels.ravel())
+
+        if get_pixel_arrays:
+            ret.append(pack_pixels(prev_pixels))
+
+        if not has_data:
+            image.buffers_free()
+
+    print(f"Camera Projection Painter: Icons and previews of images updated in {time.time() - dt:.6f} sec:\n"
+          f"\tUsed files from disk: {used_disk}\n"
+          f"\tUsed packed files:    {used_packed}\n"
+          f"\tFiles skipped:        {skipped}\n"
+          f"Options: skip_already_set: {skip_already_set}, get_pixel_arrays: {get_pixel_arrays}")
+
+    return ret
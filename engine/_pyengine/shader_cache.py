@@ -0,0 +1,79 @@
+import os
+
+import gpu
+
+SHADERS_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(__file__)), "shaders")
+
+# Library files are prepended to every shader in the order of this list
+LIBRARY_NAMES = ("common_lib", "pattern_lib", "undistort_lib")
+
+# Distortion of the uniform calibration, the math is shared with the instanced shaders by "undistort_lib"
+UNDISTORTED_UV_LIBRARY = """
+// uniforms
+uniform int UND_lens_distortion_model;
+uniform float UND_image_width, UND_image_height, UND_lens, UND_principal_point_x, UND_principal_point_y,
+UND_skew, UND_aspect_ratio, UND_k1, UND_k2, UND_k3, UND_k4, UND_t1, UND_t2;
+
+vec2 undistorted_uv(vec2 UND_uv) {
+    return undistort(
+        UND_uv,
+        vec4(UND_image_width, UND_image_height, UND_lens, float(UND_lens_distortion_model)),
+        vec4(UND_principal_point_x, UND_principal_point_y, UND_skew, UND_aspect_ratio),
+        vec4(UND_k1, UND_k2, UND_k3, UND_k4),
+        vec2(UND_t1, UND_t2)
+    );
+}
+"""
+
+
+def _read_shader_file(name: str):
+    fp = os.path.join(SHADERS_DIRECTORY, f"{name}.glsl")
+    if os.path.isfile(fp):
+        with open(fp, "r") as file:
+            return file.read()
+
+
+class ShaderCache:
+    """
+    Shaders are compiled at first request and stored until the cache is cleared
+    """
+    __slots__ = ("_cache", "_libcode")
+
+    def __init__(self):
+        if not os.path.isdir(SHADERS_DIRECTORY):
+            raise FileNotFoundError("Missing shaders directory")
+        self._cache = {}
+        self._libcode = None
+
+    @property
+    def libcode(self):
+        if self._libcode is None:
+            libcode = ""
+            for name in LIBRARY_NAMES:
+                code = _read_shader_file(name)
+                if code:
+                    libcode += code + "\n"
+            self._libcode = libcode + UNDISTORTED_UV_LIBRARY
+        return self._libcode
+
+    def getShader(self, name: str):
+        """
+        Returns the generated shader by name. In addition to library files,
+        the 'undistorted_uv' library is also connected
+        @return: gpu.types.GPUShader
+        """
+        shader = self._cache.get(name, None)
+        if shader is None:
+            vertexcode = _read_shader_file(f"{name}_vert")
+            fragcode = _read_shader_file(f"{name}_frag")
+            if not (vertexcode and fragcode):
+                return None
+            geocode = _read_shader_file(f"{name}_geom")
+
+            shader = gpu.types.GPUShader(
+                vertexcode=vertexcode, fragcode=fragcode, geocode=geocode, libcode=self.libcode)
+            self._cache[name] = shader
+        return shader
+
+    def clear(self):
+        self._cache.clear()
@@ -0,0 +1,7 @@
+in vec4 col_interp;
+out vec4 fragColor;
+
+void main()
+{
+    fragColor = col_interp;
+}
\ No newline at end of file
@@ -0,0 +1,19 @@
+uniform mat4 ModelViewProjectionMatrix;
+uniform float camera_axes_size;
+
+in vec3 pos;
+in vec4 color;
+in vec4 model_matrix_0;
+in vec4 model_matrix_1;
+in vec4 model_matrix_2;
+in vec4 model_matrix_3;
+
+out vec4 col_interp;
+
+void main()
+{
+    mat4 model_matrix = mat4(model_matrix_0, model_matrix_1, model_matrix_2, model_matrix_3);
+
+    col_interp = color;
+    gl_Position = ModelViewProjectionMatrix * model_matrix * vec4(pos * camera_axes_size, 1.0);
+}
@@ -0,0 +1,29 @@
+uniform sampler2D image;
+uniform vec4 image_space_color;
+uniform float atlas_size;
+
+in vec2 uvInterp;
+flat in vec4 atlasRect;
+flat in vec4 undImage;
+flat in vec4 undPrincipalPoint;
+flat in vec4 undK;
+flat in vec2 undT;
+
+out vec4 fragColor;
+
+void main()
+{
+    vec2 uv = undistort(uvInterp, undImage, undPrincipalPoint, undK, undT);
+    if (!inside_rect(uv, vec2(0.0f), vec2(1.0f))) {
+        fragColor = image_space_color;
+        return;
+    }
+    // Keep samples inside own cell of the atlas
+    vec2 half_texel = vec2(0.5f) / (atlasRect.zw * atlas_size);
+    uv = clamp(uv, half_texel, vec2(1.0f) - half_texel);
+
+    fragColor = blender_srgb_to_framebuffer_space(texture(image, atlasRect.xy + uv * atlasRect.zw));
+    if (fragColor.a < 0.95f){
+        fragColor = image_space_color;
+    }
+}
@@ -0,0 +1,37 @@
+uniform mat4 ModelViewProjectionMatrix;
+uniform float cameras_viewport_size;
+
+in vec3 pos;
+in vec2 uv;
+in vec4 model_matrix_0;
+in vec4 model_matrix_1;
+in vec4 model_matrix_2;
+in vec4 model_matrix_3;
+in vec3 frustum_scale;  // aspect scale x, aspect scale y, sensor size
+in vec2 uv_aspect_scale;
+in vec4 atlas_rect;  // offset and size of the preview in the atlas page
+in vec4 und_image;  // image width, image height, lens, lens distortion model
+in vec4 und_principal_point;  // principal point x, principal point y, skew, aspect ratio
+in vec4 und_k;
+in vec2 und_t;
+
+out vec2 uvInterp;
+flat out vec4 atlasRect;
+flat out vec4 undImage;
+flat out vec4 undPrincipalPoint;
+flat out vec4 undK;
+flat out vec2 undT;
+
+void main()
+{
+    mat4 model_matrix = mat4(model_matrix_0, model_matrix_1, model_matrix_2, model_matrix_3);
+
+    uvInterp = uv * uv_aspect_scale;
+    atlasRect = atlas_rect;
+    undImage = und_image;
+    undPrincipalPoint = und_principal_point;
+    undK = und_k;
+    undT = und_t;
+
+    gl_Position = ModelViewProjectionMatrix * model_matrix * vec4(pos * frustum_scale * cameras_viewport_size, 1.0);
+}
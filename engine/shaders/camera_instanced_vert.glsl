@@ -0,0 +1,20 @@
+uniform mat4 ModelViewProjectionMatrix;
+uniform float cameras_viewport_size;
+
+in vec3 pos;
+in vec4 model_matrix_0;
+in vec4 model_matrix_1;
+in vec4 model_matrix_2;
+in vec4 model_matrix_3;
+in vec3 frustum_scale;  // aspect scale x, aspect scale y, sensor size
+in vec4 wire_color;
+
+out vec4 col_interp;
+
+void main()
+{
+    mat4 model_matrix = mat4(model_matrix_0, model_matrix_1, model_matrix_2, model_matrix_3);
+
+    col_interp = wire_color;
+    gl_Position = ModelViewProjectionMatrix * model_matrix * vec4(pos * frustum_scale * cameras_viewport_size, 1.0);
+}
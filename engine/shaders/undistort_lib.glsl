@@ -0,0 +1,56 @@
+// Lens distortion of the camera image coordinates. Calibration is packed the same way as attributes
+// of the instanced camera previews:
+// image - image width, image height, lens, lens distortion model
+// principal_point - principal point x, principal point y, skew, aspect ratio
+// k - radial distortion k1, k2, k3, k4
+// t - tangential distortion t1, t2
+vec2 undistort(vec2 uv, vec4 image, vec4 principal_point, vec4 k, vec2 t) {
+    float image_width = image.x, image_height = image.y, lens = image.z;
+    int model = int(image.w + 0.5f);
+    float k1 = 0.0f, k2 = 0.0f, k3 = 0.0f, k4 = 0.0f, t1 = 0.0f, t2 = 0.0f;
+    if (model != 0) {
+        k1 = k.x;
+    }
+    if (model > 1) {
+        k2 = k.y;
+        k3 = k.z;
+        if (model == 3 || model == 5) {
+            k4 = k.w;
+        }
+        if (model == 4 || model == 5) {
+            t1 = t.x;
+            t2 = t.y;
+        }
+    }
+    float scaleToPixel = max(image_width, image_height);
+    float focalLength = lens * scaleToPixel / 36.0f;
+    float principalPointU = principal_point.x * scaleToPixel + image_width / 2;
+    float principalPointV = principal_point.y * scaleToPixel + image_height / 2;
+    float camera_skew = principal_point.z * scaleToPixel;
+    float cx, cy, x2, y2, xy2, r2, l, dcx = 0.0f, dcy = 0.0f, tx, ty, kr2;
+    cx = uv.x * image_width / focalLength;
+    cy = -uv.y * image_height / focalLength;
+    if (model == 0) {
+        dcx = cx;
+        dcy = cy;
+    }
+    else if (model == 1) {
+        kr2 = 1.0f + k1 * (cx * cx + cy * cy);
+        dcx = cx / kr2;
+        dcy = cy / kr2;
+    }
+    else {
+        x2 = cx * cx;
+        y2 = cy * cy;
+        xy2 = 2 * cx * cy;
+        r2 = x2 + y2;
+        l = 1.0f + (((k4 * r2 + k3) * r2 + k2) * r2 + k1) * r2;
+        tx = (t1 * (r2 + 2.0f * x2) + t2 * xy2);
+        ty = (t2 * (r2 + 2.0f * y2) + t1 * xy2);
+        dcx = (cx * l + tx);
+        dcy = (cy * l + ty);
+    }
+    float u_ptr = (focalLength * dcx + camera_skew * dcy + principalPointU) / image_width;
+    float v_ptr = 1.0f - ((focalLength * principal_point.w * dcy + principalPointV) / image_height);
+    return vec2(u_ptr, v_ptr);
+}
@@ -1,5 +1,16 @@
+from collections import OrderedDict
+import os
+
 import numpy as np
 
+from .. import image_loader
+from .. import engine
+from .. import __package__ as addon_pkg
+
+if "bpy" in locals():
+    import importlib
+    importlib.reload(image_loader)
+
 import bpy
 from bpy.props import IntVectorProperty
 import bgl
@@ -18,19 +29,217 @@ class EvalItemData:
         self.preview_bindcode = 0
 
 
+# Image buffers and textures always have four channels
+IMAGE_CHANNELS = 4
+# Images of these formats are loaded into float buffers and half float textures
+FLOAT_IMAGE_EXTENSIONS = (".exr", ".hdr")
+# Blender uses bytes of the images in these color spaces for textures as is, images in other color spaces
+# are converted, so they are not decoded in background
+BYTE_TEXTURE_COLORSPACES = ('sRGB', 'Non-Color')
+
+
+def get_image_memory_size(image):
+    """
+    Estimated size of the loaded image data in bytes, both image buffer and OpenGL texture.
+    Size is estimated from image.cpp.static_size, so the image is not required to be loaded
+    @return: int
+    """
+    width, height = image.cpp.static_size
+    if not width:
+        width, height = image.size
+    if os.path.splitext(image.filepath)[1].lower() in FLOAT_IMAGE_EXTENSIONS:
+        bytes_per_channel = 4 + 2
+    else:
+        bytes_per_channel = 1 + 1
+    return width * height * IMAGE_CHANNELS * bytes_per_channel
+
+
+def get_source_filepath(image):
+    """
+    Absolute path of the image file if the image is not packed or modified
+    @return: str or None
+    """
+    if image.source != 'FILE' or image.packed_file or image.is_dirty:
+        return None
+    return bpy.path.abspath(image.filepath)
+
+
+def is_byte_texture(image):
+    """
+    True if Blender uses bytes of the image file for the texture as is, so the file decoded outside
+    of Blender looks the same
+    @return: bool
+    """
+    colorspace_settings = image.colorspace_settings
+    return colorspace_settings.is_data or colorspace_settings.name in BYTE_TEXTURE_COLORSPACES
+
+
+def get_async_filepath(image):
+    """
+    Path of the image file which can be decoded in background, None if the image should be loaded by Blender
+    @return: str or None
+    """
+    if image.has_data:
+        return None
+    if not is_byte_texture(image):
+        return None
+    filepath = get_source_filepath(image)
+    if filepath and image_loader.loader.is_supported(filepath):
+        return filepath
+
+
+def request_async_decode(image, filepath: str):
+    """
+    Start background decoding of the image file given by get_async_filepath, with the image alpha settings
+    """
+    image_loader.loader.request(filepath, ignore_alpha=image.alpha_mode == 'NONE')
+
+
 class ImageCache:
     __slots__ = ()
 
     cache = {}
-    gl_load_order = []
+    # Loaded images in order of usage, least recently used first, values are estimated sizes in bytes
+    gl_load_order = OrderedDict()
+    loaded_size = 0
+
+    hits = 0
+    misses = 0
+    evictions = 0
 
     icon_flat_arr = np.zeros(0, dtype=np.int32)
     prev_flat_arr = np.zeros(0, dtype=np.int32)
 
+    @classmethod
+    def add(cls, image, size: int):
+        cls.gl_load_order[image] = size
+        cls.loaded_size += size
+
+    @classmethod
+    def remove(cls, image):
+        size = cls.gl_load_order.pop(image, None)
+        if size is not None:
+            cls.loaded_size -= size
+
+    @classmethod
+    def trim_staged(cls, max_size: int, keep_filepath=None):
+        """
+        Drop images decoded in background which have not been drawn yet, so together with the loaded images
+        they fit the memory limit
+        """
+        image_loader.loader.trim_staged(max_size - cls.loaded_size, keep_filepath)
+
+    @classmethod
+    def evict(cls, max_count: int, max_size: int, keep_filepath=None):
+        """
+        Free least recently used images until both limits are satisfied. Staged images are dropped first
+        """
+        cls.trim_staged(max_size, keep_filepath)
+        while cls.gl_load_order and (len(cls.gl_load_order) > max_count or cls.loaded_size > max_size):
+            last_image, size = cls.gl_load_order.popitem(last=False)
+            cls.loaded_size -= size
+            cls.evictions += 1
+            try:
+                last_image.gl_free()
+                last_image.buffers_free()
+                image_loader.loader.release(bpy.path.abspath(last_image.filepath))
+            except ReferenceError:
+                pass
+
+    @classmethod
+    def reserve(cls, size: int, max_count: int, max_size: int, keep_filepath=None):
+        """
+        Free least recently used images to make room for a new image of the given estimated size
+        before it is loaded, so memory usage doesn't exceed the limits at any time. Staged image of the
+        kept file is the data of the new image, so it's not dropped
+        """
+        cls.evict(max_count=max_count - 1, max_size=max_size - size, keep_filepath=keep_filepath)
+
     @classmethod
     def clear(cls):
         cls.cache.clear()
         cls.gl_load_order.clear()
+        cls.loaded_size = 0
+        cls.hits = 0
+        cls.misses = 0
+        cls.evictions = 0
+
+
+class ImageSizeTracker:
+    """
+    Images which static size should be updated. Filled by depsgraph updates and message bus
+    subscriptions, so bpy.data.images is not scanned while nothing changes
+    """
+    __slots__ = ()
+
+    dirty = set()  # pointers of the updated images
+    check_new = True  # images have been added, only images without static size are updated
+    check_all = False  # file path or source of any image has been changed
+    images_count = -1
+
+    msgbus_owner = object()
+
+    @classmethod
+    def tag_update(cls, updated_pointers: set):
+        """
+        Called from depsgraph update handler with pointers of the updated images
+        """
+        cls.dirty |= updated_pointers
+        images_count = len(bpy.data.images)
+        if cls.images_count != images_count:
+            cls.images_count = images_count
+            cls.check_new = True
+
+    @classmethod
+    def tag_new(cls):
+        cls.check_new = True
+
+    @classmethod
+    def tag_all(cls):
+        cls.check_all = True
+
+    @classmethod
+    def process(cls):
+        """
+        Update static size of the new and changed images
+        @return: bool, True if any image has been checked
+        """
+        if not (cls.check_all or cls.check_new or cls.dirty):
+            return False
+
+        if cls.check_all:
+            engine.updateImageSeqStaticSize(bpy.data.images, skip_already_set=False)
+        else:
+            if cls.dirty:
+                images = [image for image in bpy.data.images if image.as_pointer() in cls.dirty]
+                engine.updateImageSeqStaticSize(images, skip_already_set=False)
+            if cls.check_new:
+                engine.updateImageSeqStaticSize(bpy.data.images, skip_already_set=True)
+
+        cls.dirty.clear()
+        cls.check_new = False
+        cls.check_all = False
+        cls.images_count = len(bpy.data.images)
+        return True
+
+    @classmethod
+    def subscribe(cls):
+        """
+        Subscriptions are removed by Blender when a file is loaded, so should be added again after each load
+        """
+        cls.unsubscribe()
+        for key, notify in (
+                ((bpy.types.Image, "filepath"), cls.tag_all),
+                ((bpy.types.Image, "source"), cls.tag_all),
+                ((bpy.types.BlendData, "images"), cls.tag_new),
+        ):
+            bpy.msgbus.subscribe_rna(key=key, owner=cls.msgbus_owner, args=(), notify=notify)
+        cls.check_all = True
+
+    @classmethod
+    def unsubscribe(cls):
+        bpy.msgbus.clear_by_owner(cls.msgbus_owner)
+        cls.dirty.clear()
 
 
 class ImageProperties(bpy.types.PropertyGroup):
@@ -51,7 +260,8 @@ class ImageProperties(bpy.types.PropertyGroup):
 
     def gl_load(self, context):
         """
-        Images cached with max_loaded_images limit
+        Images cached with max_loaded_images and loaded images memory limits. Image files are decoded
+        in background if possible, until then image preview is used (see gl_bindcode)
         @return: int
         """
         image = self.id_data
@@ -61,22 +271,65 @@ class ImageProperties(bpy.types.PropertyGroup):
             del ImageCache.cache[image]
             return 0
 
-        gll = image.gl_load()
+        async_filepath = None
+        if not image.bindcode:
+            async_filepath = get_async_filepath(image)
+
+        is_loaded = image in ImageCache.gl_load_order and (
+                image.bindcode or (async_filepath and async_filepath in image_loader.loader.textures))
+        if not is_loaded:
+            ImageCache.remove(image)
+            size = get_image_memory_size(image)
+            preferences = context.preferences.addons[addon_pkg].preferences
+            ImageCache.reserve(
+                size,
+                max_count=context.scene.cpp.max_loaded_images,
+                max_size=preferences.loaded_images_memory_limit * 1024 * 1024,
+                keep_filepath=async_filepath
+            )
+
+        if async_filepath:
+            if image_loader.loader.get_bindcode(async_filepath):
+                gll = 0
+            else:
+                request_async_decode(image, async_filepath)
+                # Nothing to draw until preview is available
+                return 0 if self.preview_bindcode else 1
+        else:
+            gll = image.gl_load()
+            if not gll:
+                # Image has been loaded by Blender, texture of the decoded file is not required anymore
+                image_loader.loader.release(bpy.path.abspath(image.filepath))
 
         if not gll:
-            if image in ImageCache.gl_load_order:
-                ImageCache.gl_load_order.remove(image)
-            ImageCache.gl_load_order.insert(0, image)
-            if len(ImageCache.gl_load_order) > context.scene.cpp.max_loaded_images:
-                last_image = ImageCache.gl_load_order[-1]
-                last_image.gl_free()
-                last_image.buffers_free()
-                ImageCache.gl_load_order.remove(last_image)
+            if is_loaded:
+                ImageCache.hits += 1
+                ImageCache.gl_load_order.move_to_end(image)
+            else:
+                ImageCache.misses += 1
+                ImageCache.add(image, size)
             return 0
-        elif image in ImageCache.gl_load_order:
-            ImageCache.gl_load_order.remove(image)
+        ImageCache.remove(image)
         return gll
 
+    @property
+    def gl_bindcode(self):
+        """
+        Bindcode of the image texture to be drawn after gl_load. It's the bindcode of the texture
+        loaded by Blender, of the texture decoded in background or of the image preview
+        while the image is being decoded
+        @return: int
+        """
+        image = self.id_data
+        if image.bindcode:
+            return image.bindcode
+        async_filepath = get_async_filepath(image)
+        if async_filepath:
+            bindcode = image_loader.loader.get_bindcode(async_filepath)
+            if bindcode:
+                return bindcode
+        return self.preview_bindcode
+
     @property
     def preview_bindcode(self):
         image = self.id_data
@@ -8,6 +8,7 @@ import bpy
 from bpy.types import PropertyGroup
 from bpy.props import (
     BoolProperty,
+    EnumProperty,
     IntProperty,
     FloatProperty,
     FloatVectorProperty,
@@ -115,7 +116,10 @@ class SceneProperties(PropertyGroup):
             ob.initial_visible = value
 
     def _calibration_source_file_update(self, context):
-        bpy.ops.cpp.import_cameras_csv()
+        # Called directly instead of the operator, undo step must not be pushed from the property update
+        result = operators.import_cameras_csv.import_calibration_file(self.id_data)
+        if result is not None:
+            print(f"Camera Projection Painter: {result[1]}")
 
     active_camera_index: IntProperty(name="Active Camera", get=_get_camera_index, set=_set_camera_index)
 
@@ -137,6 +141,31 @@ class SceneProperties(PropertyGroup):
         update=_calibration_source_file_update
     )
 
+    calibration_orientation: EnumProperty(
+        items=[
+            ('NADIR', "Aerial", "Zero pitch means the camera is looking straight down"),
+            ('HORIZON', "Terrestrial", "Zero pitch means the camera is looking at the horizon")
+        ],
+        name="Orientation",
+        default='NADIR',
+        description="Meaning of heading, pitch and roll angles of the calibration file"
+    )
+
+    use_georeference_offset: BoolProperty(
+        name="Georeference Offset",
+        default=True,
+        description="Move georeferenced cameras close to the world origin to keep precision"
+    )
+
+    georeference_offset: FloatVectorProperty(
+        name="Offset", size=3,
+        subtype='XYZ', precision=1,
+        default=(0.0, 0.0, 0.0),
+        description="Offset subtracted from georeferenced camera locations of the calibration file. "
+                    "Set by the first import of georeferenced cameras and reused by the next imports, "
+                    "so all imported cameras stay aligned. Set to zero to compute it again"
+    )
+
     cameras_viewport_size: FloatProperty(
         name="Viewport Display Size",
         default=1.0, soft_min=0.5, soft_max=5.0, min=0.1, step=0.1,
@@ -52,7 +52,7 @@ class WindowManagerProperties(PropertyGroup):
     # Progress
     def _get_progress(self):
         if self.p_stages_count:
-            return int(100.0 * self.p_stage / self.p_stages_count)
+            return int(100.0 * (self.p_stage + self.p_stage_progress) / self.p_stages_count)
         return 100
 
     def _progress_stage_update(self, context):
@@ -61,6 +61,7 @@ class WindowManagerProperties(PropertyGroup):
 
     def _progress_set_defaults(self):
         self.p_stage = 0
+        self.p_stage_progress = 0.0
         self.p_stages_count = 0
         self.p_wait_duration = 0.0
 
@@ -91,8 +92,15 @@ class WindowManagerProperties(PropertyGroup):
         return self.p_stage
 
     def progress_stage_complete(self):
+        self.p_stage_progress = 0.0
         self.p_stage += 1
 
+    def progress_stage_update(self, factor: float):
+        """
+        Completed part of the current stage, for stages which run over many timer events
+        """
+        self.p_stage_progress = factor
+
     def progress_wait_before_next_stage(self, duration: float):
         self.p_wait_duration = duration
 
@@ -108,6 +116,7 @@ class WindowManagerProperties(PropertyGroup):
     p_wait_duration: FloatProperty(default=0.0, min=0.0)
     p_stages_count: IntProperty(default=0, min=0)
     p_stage: IntProperty(default=0, min=0, update=_progress_stage_update)
+    p_stage_progress: FloatProperty(default=0.0, min=0.0, max=1.0)
 
     p_text: StringProperty(default="Progress")
     p_icon: StringProperty(default='NONE')
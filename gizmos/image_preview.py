@@ -141,7 +141,7 @@ class CPP_GT_current_image_preview(bpy.types.Gizmo):
                         bgl.glDisable(bgl.GL_POLYGON_SMOOTH)
 
                         bgl.glActiveTexture(bgl.GL_TEXTURE0)
-                        bgl.glBindTexture(bgl.GL_TEXTURE_2D, image.bindcode)
+                        bgl.glBindTexture(bgl.GL_TEXTURE_2D, image.cpp.gl_bindcode)
                         bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_WRAP_S, bgl.GL_CLAMP_TO_BORDER)
                         bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_WRAP_T, bgl.GL_CLAMP_TO_BORDER)
 
@@ -1,8 +1,13 @@
 from . import operators
+from . import warnings
+from . import extend_bpy_types
+from . import image_loader
+from . import image_pyramid
 
 if "bpy" in locals():
     import importlib
     importlib.reload(operators)
+    importlib.reload(warnings)
 
 import bpy
 from bpy.app.handlers import persistent
@@ -24,9 +29,12 @@ def render_post_handler(dummy=None):
 
 @persistent
 def load_pre_handler(dummy=None):
+    extend_bpy_types.image.ImageSizeTracker.unsubscribe()
     for op in operators.basis.modal_ops:
         if hasattr(op, "cancel"):
             op.cancel(bpy.context)
+    image_loader.loader.shutdown()
+    image_pyramid.pyramids.shutdown()
 
 
 @persistent
@@ -35,6 +43,7 @@ def load_post_handler(dummy=None):
 
     wm.cpp.running = False
     wm.cpp.suspended = False
+    extend_bpy_types.image.ImageSizeTracker.subscribe()
     bpy.ops.cpp.listener('INVOKE_DEFAULT')
 
 
@@ -64,6 +73,50 @@ def depsgraph_update_pre_handler(scene=None):
                 camera.cpp_bind_history.remove(item_index)
 
 
+@persistent
+def depsgraph_update_post_handler(scene=None, depsgraph=None):
+    warnings.WarningStatusCache.clear()
+
+    if depsgraph is None:
+        return
+
+    updated_pointers = set()
+    updated_image_pointers = set()
+    updated_geometry_pointers = set()
+    updated_transform_pointers = set()
+    for update in depsgraph.updates:
+        pointer = update.id.original.as_pointer()
+        updated_pointers.add(pointer)
+        if isinstance(update.id, bpy.types.Image):
+            updated_image_pointers.add(pointer)
+        elif isinstance(update.id, bpy.types.Object):
+            if update.is_updated_geometry:
+                updated_geometry_pointers.add(pointer)
+            if update.is_updated_transform:
+                updated_transform_pointers.add(pointer)
+
+    # Static size of the new and changed images is updated by the modal operators
+    extend_bpy_types.image.ImageSizeTracker.tag_update(updated_image_pointers)
+
+    # Camera instance buffers are rebuilt at next redraw
+    for op in operators.basis.modal_ops:
+        camera_instances = getattr(op, "camera_instances", None)
+        if camera_instances is not None:
+            camera_instances.tag_update(updated_pointers)
+
+    if not (updated_geometry_pointers or updated_transform_pointers):
+        return
+
+    # Cached BVH tree is checked against the evaluated mesh before next use
+    warnings.MeshBVHCache.tag_update(updated_geometry_pointers)
+
+    # Mesh preview batches are updated by the modal operator
+    for op in operators.basis.modal_ops:
+        mesh_batch = getattr(op, "mesh_batch", None)
+        if mesh_batch is not None:
+            mesh_batch.tag_update(updated_geometry_pointers, updated_transform_pointers)
+
+
 _handlers = (
     (bpy.app.handlers.render_pre, render_pre_handler),
     (bpy.app.handlers.render_post, render_post_handler),
@@ -71,7 +124,8 @@ _handlers = (
     (bpy.app.handlers.load_post, load_post_handler),
     (bpy.app.handlers.save_pre, save_pre_handler),
     (bpy.app.handlers.save_post, save_post_handler),
-    (bpy.app.handlers.depsgraph_update_pre, depsgraph_update_pre_handler)
+    (bpy.app.handlers.depsgraph_update_pre, depsgraph_update_pre_handler),
+    (bpy.app.handlers.depsgraph_update_post, depsgraph_update_post_handler)
 )
 
 
@@ -81,6 +135,9 @@ def register():
 
 
 def unregister():
+    extend_bpy_types.image.ImageSizeTracker.unsubscribe()
+    image_loader.loader.shutdown()
+    image_pyramid.pyramids.shutdown()
     for handle, func in _handlers:
         if func in handle:
             handle.remove(func)
@@ -0,0 +1,189 @@
+# The module contains decoding of the image files in background threads. Decoded images are uploaded
+# to OpenGL textures on the main thread when they are drawn for the first time
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Pillow is not bundled with Blender. Without it images are loaded synchronously by Blender itself
+try:
+    from PIL import Image as PILImage
+except ImportError:
+    PILImage = None
+
+import bgl
+
+MAX_WORKERS = 2
+# Number of decoded images waiting to be drawn, their size is also counted against loaded images memory limit
+# (see ImageCache.trim_staged)
+MAX_STAGED_IMAGES = 8
+# Files of other formats are loaded by Blender
+DECODED_EXTENSIONS = (".bmp", ".jpg", ".jpeg", ".png", ".tga", ".tif", ".tiff")
+
+
+def decode_image_file(filepath: str, ignore_alpha=False):
+    """
+    Decode image file into RGBA bytes with rows from bottom to top, as OpenGL expects. Bytes are not color managed,
+    alpha is straight as stored in file or opaque if ignored
+    @return: tuple (numpy.ndarray (height, width, 4) of uint8, width, height)
+    """
+    with PILImage.open(filepath) as pil_image:
+        pixels = np.asarray(pil_image.convert("RGBA"), dtype=np.uint8)
+    pixels = np.ascontiguousarray(pixels[::-1])
+    if ignore_alpha:
+        pixels[:, :, 3] = 255
+    height, width = pixels.shape[0:2]
+    return pixels, width, height
+
+
+class AsyncImageLoader:
+    """
+    Image files are decoded by a thread pool into staged numpy buffers. Staged buffers are uploaded
+    on the main thread at first request of the texture bindcode
+    """
+    __slots__ = (
+        "_executor",
+        "_lock",
+        "_futures",
+        "_finished",
+        "staged",
+        "staged_size",
+        "textures",
+        "failed",
+    )
+
+    def __init__(self):
+        self._executor = None
+        self._lock = threading.Lock()
+        self._futures = {}
+        self._finished = []
+        self.staged = OrderedDict()  # filepath: (pixels, width, height)
+        self.staged_size = 0  # bytes
+        self.textures = {}  # filepath: bindcode
+        self.failed = set()
+
+    @staticmethod
+    def is_supported(filepath: str):
+        return (PILImage is not None) and (os.path.splitext(filepath)[1].lower() in DECODED_EXTENSIONS)
+
+    def request(self, filepath: str, ignore_alpha=False):
+        """
+        Start decoding of the file if it's not decoded yet
+        """
+        if (filepath in self.textures or filepath in self.staged or filepath in self._futures
+                or filepath in self.failed):
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="cpp_image_loader")
+        self._futures[filepath] = self._executor.submit(self._decode, filepath, ignore_alpha)
+
+    def _decode(self, filepath: str, ignore_alpha: bool):
+        try:
+            result = decode_image_file(filepath, ignore_alpha)
+        except Exception:
+            result = None
+        with self._lock:
+            self._finished.append((filepath, result))
+
+    def process(self):
+        """
+        Move decoded images from worker threads to staged buffers. Called from the main thread
+        @return: bool, True if any image has been decoded, so viewports should be redrawn
+        """
+        with self._lock:
+            finished = self._finished
+            self._finished = []
+
+        for filepath, result in finished:
+            if self._futures.pop(filepath, None) is None:
+                continue
+            if result is None:
+                self.failed.add(filepath)
+                continue
+            self.staged[filepath] = result
+            self.staged_size += result[0].nbytes
+            while len(self.staged) > MAX_STAGED_IMAGES:
+                self._unstage(next(iter(self.staged)))
+        return len(finished) != 0
+
+    def _unstage(self, filepath: str):
+        staged = self.staged.pop(filepath, None)
+        if staged is not None:
+            self.staged_size -= staged[0].nbytes
+        return staged
+
+    def trim_staged(self, max_size: int, keep_filepath=None):
+        """
+        Drop staged images, oldest first, until their size fits the limit. Staged image of the kept file
+        is neither dropped nor counted
+        """
+        staged_size = self.staged_size
+        if keep_filepath in self.staged:
+            staged_size -= self.staged[keep_filepath][0].nbytes
+        for filepath in list(self.staged.keys()):
+            if staged_size <= max_size:
+                break
+            if filepath == keep_filepath:
+                continue
+            staged_size -= self._unstage(filepath)[0].nbytes
+
+    def get_bindcode(self, filepath: str):
+        """
+        Texture of the decoded image, staged image is uploaded at first call
+        @return: int, zero if image is not decoded yet
+        """
+        bindcode = self.textures.get(filepath, 0)
+        if bindcode:
+            return bindcode
+
+        staged = self._unstage(filepath)
+        if staged is None:
+            return 0
+        pixels, width, height = staged
+
+        id_buff = bgl.Buffer(bgl.GL_INT, 1)
+        bgl.glGenTextures(1, id_buff)
+        bindcode = id_buff.to_list()[0]
+
+        bgl.glBindTexture(bgl.GL_TEXTURE_2D, bindcode)
+        bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_MIN_FILTER, bgl.GL_LINEAR)
+        bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_MAG_FILTER, bgl.GL_LINEAR)
+        image_buffer = bgl.Buffer(bgl.GL_INT, width * height, pixels.view(np.int32).ravel())
+        bgl.glTexImage2D(
+            bgl.GL_TEXTURE_2D, 0, bgl.GL_RGBA, width, height, 0, bgl.GL_RGBA, bgl.GL_UNSIGNED_BYTE, image_buffer
+        )
+
+        self.textures[filepath] = bindcode
+        return bindcode
+
+    def release(self, filepath: str):
+        bindcode = self.textures.pop(filepath, 0)
+        if bindcode:
+            bgl.glDeleteTextures(1, bgl.Buffer(bgl.GL_INT, 1, [bindcode]))
+        self._unstage(filepath)
+
+    def clear(self):
+        for future in self._futures.values():
+            future.cancel()
+        self._futures.clear()
+        with self._lock:
+            self._finished.clear()
+        for filepath in list(self.textures.keys()):
+            self.release(filepath)
+        self.staged.clear()
+        self.staged_size = 0
+        self.failed.clear()
+
+    def shutdown(self):
+        """
+        Clear the loader and stop worker threads, running decodes are finished in background and discarded
+        """
+        self.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+loader = AsyncImageLoader()
@@ -0,0 +1,335 @@
+# The module contains image pyramids of the camera images. Pyramid levels are generated once in background,
+# stored in the user cache directory and drawn instead of full resolution images while not painting
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from . import image_loader
+from . import __package__ as addon_pkg
+
+if "bpy" in locals():
+    import importlib
+    importlib.reload(image_loader)
+
+import bpy
+import bgl
+
+# Directory of the pyramid levels inside of the add-on user data directory
+CACHE_DIRECTORY_NAME = "pyramids"
+LEVEL_EXTENSION = ".npz"
+TMP_EXTENSION = ".tmp"
+# Temporary level files older than this are left by interrupted generation and are removed
+STALE_TMP_SECONDS = 3600
+# Coarsest level has no side larger than this
+MIN_LEVEL_SIZE = 256
+# Number of level textures simultaneously loaded into OpenGL
+MAX_LEVEL_TEXTURES = 4
+
+
+def get_levels_count(width: int, height: int):
+    """
+    Number of pyramid levels, excluding full resolution image (level 0)
+    @return: int
+    """
+    count = 0
+    size = max(width, height)
+    while size > MIN_LEVEL_SIZE:
+        size = (size + 1) // 2
+        count += 1
+    return count
+
+
+def downsample(pixels: np.ndarray):
+    """
+    Half resolution of the RGBA image by 2x2 box filter, last row and column are repeated for odd sizes
+    @return: numpy.ndarray (height, width, 4) of uint8
+    """
+    height, width = pixels.shape[0:2]
+    if height % 2 or width % 2:
+        pixels = np.pad(pixels, ((0, height % 2), (0, width % 2), (0, 0)), mode="edge")
+    pixels = pixels.astype(np.uint16)
+    pixels = pixels[0::2, 0::2] + pixels[1::2, 0::2] + pixels[0::2, 1::2] + pixels[1::2, 1::2]
+    return ((pixels + 2) // 4).astype(np.uint8)
+
+
+def get_cache_directory():
+    return bpy.utils.user_resource('DATAFILES', path=os.path.join(addon_pkg, CACHE_DIRECTORY_NAME), create=True)
+
+
+def get_pyramid_key(filepath: str, stat: os.stat_result, ignore_alpha: bool):
+    """
+    Name prefix of the pyramid level files, digest of the source file path, modification time, size
+    and alpha mode
+    @return: str
+    """
+    filepath = os.path.normcase(os.path.abspath(filepath))
+    return hashlib.sha1(
+        f"{filepath}:{stat.st_mtime_ns}:{stat.st_size}:{int(ignore_alpha)}".encode("utf-8")
+    ).hexdigest()
+
+
+def get_level_filepath(directory: str, key: str, level: int):
+    return os.path.join(directory, f"{key}.{level}{LEVEL_EXTENSION}")
+
+
+def get_stored_levels(filepath: str, ignore_alpha: bool, directory: str):
+    """
+    Paths of the stored pyramid levels starting from level 1, None if pyramid has not been generated.
+    Modification time of the level files is updated, so recently used pyramids are kept by trim_cache
+    @return: list of str or None
+    """
+    try:
+        stat = os.stat(filepath)
+    except OSError:
+        return None
+    key = get_pyramid_key(filepath, stat, ignore_alpha)
+    levels = []
+    level = 1
+    while True:
+        level_filepath = get_level_filepath(directory, key, level)
+        try:
+            os.utime(level_filepath)
+        except OSError:
+            break
+        levels.append(level_filepath)
+        level += 1
+    return levels or None
+
+
+def build_pyramid(filepath: str, ignore_alpha: bool, directory: str):
+    """
+    Decode the image file and store all pyramid levels in the cache directory, alpha of the levels is opaque
+    if ignored, as in the texture of the image
+    @return: list of str, paths of the levels starting from level 1
+    """
+    key = get_pyramid_key(filepath, os.stat(filepath), ignore_alpha)
+    pixels, width, height = image_loader.decode_image_file(filepath, ignore_alpha)
+
+    levels = []
+    for level in range(1, get_levels_count(width, height) + 1):
+        pixels = downsample(pixels)
+        level_filepath = get_level_filepath(directory, key, level)
+        # Written under temporary name, so incomplete files are never used
+        tmp_filepath = level_filepath + TMP_EXTENSION
+        try:
+            with open(tmp_filepath, "wb") as file:
+                np.savez_compressed(file, pixels=pixels)
+            os.replace(tmp_filepath, level_filepath)
+        except Exception:
+            try:
+                os.remove(tmp_filepath)
+            except OSError:
+                pass
+            raise
+        levels.append(level_filepath)
+    return levels
+
+
+def load_level(level_filepath: str):
+    """
+    @return: numpy.ndarray (height, width, 4) of uint8
+    """
+    with np.load(level_filepath) as data:
+        return data["pixels"]
+
+
+def trim_cache(directory: str, max_size: int, keep_levels=()):
+    """
+    Remove least recently used pyramids until total size of the level files fits the limit.
+    Pyramids are removed with all their levels, kept levels are never removed. Stale temporary files
+    are removed, the rest of temporary files (generation in progress) are counted to the total size
+    """
+    pyramids = {}  # key: [mtime, size, level file paths]
+    tmp_size = 0
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        return
+    stale_time_ns = time.time_ns() - STALE_TMP_SECONDS * 1000000000
+    for entry in entries:
+        try:
+            stat = entry.stat()
+        except OSError:
+            continue
+        if entry.name.endswith(TMP_EXTENSION):
+            if stat.st_mtime_ns < stale_time_ns:
+                try:
+                    os.remove(entry.path)
+                    continue
+                except OSError:
+                    pass
+            tmp_size += stat.st_size
+            continue
+        if not entry.name.endswith(LEVEL_EXTENSION):
+            continue
+        key = entry.name.split(".", 1)[0]
+        pyramid = pyramids.setdefault(key, [0, 0, []])
+        pyramid[0] = max(pyramid[0], stat.st_mtime_ns)
+        pyramid[1] += stat.st_size
+        pyramid[2].append(entry.path)
+
+    total_size = tmp_size + sum(pyramid[1] for pyramid in pyramids.values())
+    keep_levels = set(keep_levels)
+    for _, size, level_filepaths in sorted(pyramids.values(), key=lambda pyramid: pyramid[0]):
+        if total_size <= max_size:
+            break
+        if keep_levels.intersection(level_filepaths):
+            continue
+        for level_filepath in level_filepaths:
+            try:
+                os.remove(level_filepath)
+            except OSError:
+                pass
+        total_size -= size
+
+
+def select_level(texels: float, pixels: float, levels_count: int):
+    """
+    The coarsest level which still has at least one texel per screen pixel
+    @return: int, zero means full resolution
+    """
+    if pixels <= 0.0 or texels <= pixels:
+        return 0
+    return min(int(np.floor(np.log2(texels / pixels))), levels_count)
+
+
+class ImagePyramidCache:
+    """
+    Pyramids are generated in background thread, level textures are loaded from the level files.
+    Pyramids are keyed by source, tuple (str file path, bool ignore alpha)
+    """
+    __slots__ = (
+        "_executor",
+        "_lock",
+        "_futures",
+        "_finished",
+        "levels",
+        "textures",
+        "failed",
+    )
+
+    def __init__(self):
+        self._executor = None
+        self._lock = threading.Lock()
+        self._futures = {}
+        self._finished = []
+        self.levels = {}  # source: list of level file paths
+        self.textures = OrderedDict()  # (source, level): bindcode
+        self.failed = set()
+
+    def get_levels(self, source: tuple, max_cache_size: int):
+        """
+        Level file paths of the image pyramid, starting from level 1. Generation of the missing pyramid
+        is started in background, after that the cache directory is trimmed to the given size in bytes
+        @return: list of str or None if not available yet
+        """
+        levels = self.levels.get(source, None)
+        if levels is not None:
+            return levels
+        if source in self._futures or source in self.failed:
+            return None
+        filepath, ignore_alpha = source
+        if not image_loader.AsyncImageLoader.is_supported(filepath):
+            self.failed.add(source)
+            return None
+
+        directory = get_cache_directory()
+        levels = get_stored_levels(filepath, ignore_alpha, directory)
+        if levels:
+            self.levels[source] = levels
+            return levels
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cpp_image_pyramid")
+        self._futures[source] = self._executor.submit(self._build, source, directory, max_cache_size)
+        return None
+
+    def _build(self, source: tuple, directory: str, max_cache_size: int):
+        try:
+            levels = build_pyramid(*source, directory)
+            trim_cache(directory, max_cache_size, keep_levels=levels)
+        except Exception:
+            levels = None
+        with self._lock:
+            self._finished.append((source, levels))
+
+    def process(self):
+        """
+        Register generated pyramids. Called from the main thread
+        @return: bool, True if any pyramid has been generated, so viewports should be redrawn
+        """
+        with self._lock:
+            finished = self._finished
+            self._finished = []
+
+        for source, levels in finished:
+            self._futures.pop(source, None)
+            if levels:
+                self.levels[source] = levels
+            else:
+                self.failed.add(source)
+        return len(finished) != 0
+
+    def get_bindcode(self, source: tuple, level: int):
+        """
+        Texture of the pyramid level, level file is loaded at first call
+        @return: int
+        """
+        key = (source, level)
+        bindcode = self.textures.get(key, 0)
+        if bindcode:
+            self.textures.move_to_end(key)
+            return bindcode
+
+        try:
+            pixels = load_level(self.levels[source][level - 1])
+        except (OSError, ValueError, KeyError):
+            # Removed from the cache directory, pyramid is generated again
+            self.levels.pop(source, None)
+            return 0
+        height, width = pixels.shape[0:2]
+
+        id_buff = bgl.Buffer(bgl.GL_INT, 1)
+        bgl.glGenTextures(1, id_buff)
+        bindcode = id_buff.to_list()[0]
+
+        bgl.glBindTexture(bgl.GL_TEXTURE_2D, bindcode)
+        image_buffer = bgl.Buffer(bgl.GL_INT, width * height, np.ascontiguousarray(pixels).view(np.int32).ravel())
+        bgl.glTexImage2D(
+            bgl.GL_TEXTURE_2D, 0, bgl.GL_RGBA, width, height, 0, bgl.GL_RGBA, bgl.GL_UNSIGNED_BYTE, image_buffer
+        )
+
+        self.textures[key] = bindcode
+        while len(self.textures) > MAX_LEVEL_TEXTURES:
+            _, evicted_bindcode = self.textures.popitem(last=False)
+            bgl.glDeleteTextures(1, bgl.Buffer(bgl.GL_INT, 1, [evicted_bindcode]))
+        return bindcode
+
+    def clear(self):
+        for future in self._futures.values():
+            future.cancel()
+        self._futures.clear()
+        with self._lock:
+            self._finished.clear()
+        for bindcode in self.textures.values():
+            bgl.glDeleteTextures(1, bgl.Buffer(bgl.GL_INT, 1, [bindcode]))
+        self.textures.clear()
+        self.levels.clear()
+        self.failed.clear()
+
+    def shutdown(self):
+        """
+        Clear the cache and stop the worker thread, running generation is finished in background
+        """
+        self.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+pyramids = ImagePyramidCache()
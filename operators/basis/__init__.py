@@ -2,6 +2,10 @@ from . import draw
 from ... import poll
 from ... import extend_bpy_types
 from ... import engine
+from ... import warnings
+from ... import prefetch
+from ... import image_loader
+from ... import image_pyramid
 from ... import __package__ as addon_pkg
 
 if "bpy" in locals():
@@ -9,6 +13,10 @@ if "bpy" in locals():
     importlib.reload(draw)
     importlib.reload(poll)
     importlib.reload(extend_bpy_types)
+    importlib.reload(warnings)
+    importlib.reload(prefetch)
+    importlib.reload(image_loader)
+    importlib.reload(image_pyramid)
     for operator in modal_ops:
         try:
             operator.cancel(bpy.context)
@@ -21,7 +29,8 @@ if "bpy" in locals():
 import bpy
 
 modal_ops = []
-LISTEN_TIME_STEP = 1 / 4
+# Events which are too frequent to check the context at
+MOUSE_MOVE_EVENTS = {'MOUSEMOVE', 'INBETWEEN_MOUSEMOVE'}
 TIME_STEP = 1 / 60
 
 
@@ -43,34 +52,39 @@ class CPP_OT_listener(bpy.types.Operator):
     bl_label = "Listener"
     bl_options = {'INTERNAL'}
 
-    __slots__ = ("timer", )
+    __slots__ = ("check_poll", )
 
     def invoke(self, context, event):
         if self not in modal_ops:
             modal_ops.append(self)
 
-        engine.updateImageSeqStaticSize(bpy.data.images, False)
+        extend_bpy_types.image.ImageSizeTracker.tag_all()
+        extend_bpy_types.image.ImageSizeTracker.process()
+        self.check_poll = True
 
-        wm = context.window_manager
-        self.timer = wm.event_timer_add(time_step=LISTEN_TIME_STEP, window=context.window)
-        wm.modal_handler_add(self)
+        context.window_manager.modal_handler_add(self)
         return {'RUNNING_MODAL'}
 
     def cancel(self, context):
         if self in modal_ops:
             modal_ops.remove(self)
-        context.window_manager.event_timer_remove(self.timer)
 
     def modal(self, context, event):
         wm = context.window_manager
         if wm.cpp.running:
             self.cancel(context)
             return {'FINISHED'}
-        if event.type == 'TIMER' and (not wm.cpp.running) and (poll.full_poll(context)):
+
+        extend_bpy_types.image.ImageSizeTracker.process()
+
+        # No timer is used, the context is checked on user input. Modal handlers receive events before
+        # the interface applies them, so the event after a key or button event is checked too
+        check_poll = self.check_poll
+        self.check_poll = event.type not in MOUSE_MOVE_EVENTS
+        if (check_poll or self.check_poll) and poll.full_poll(context):
             wm.cpp.running = True
             wm.cpp.suspended = False
             bpy.ops.cpp.camera_projection_painter('INVOKE_DEFAULT')
-        engine.updateImageSeqStaticSize(bpy.data.images, skip_already_set=True)
         return {'PASS_THROUGH'}
 
 
@@ -92,6 +106,7 @@ class CPP_OT_camera_projection_painter(bpy.types.Operator):
         "draw_handler",
         "draw_handler_cameras",
         "mesh_batch",
+        "camera_instances",
         "axes_batch",
         "camera_batch",
         "image_rect_batch",
@@ -100,6 +115,7 @@ class CPP_OT_camera_projection_painter(bpy.types.Operator):
         "check_data_updated",
         "data_updated",
         "check_brush_curve_updated",
+        "check_camera_updated",
     )
 
     def set_properties_defaults(self):
@@ -117,6 +133,7 @@ class CPP_OT_camera_projection_painter(bpy.types.Operator):
         self.draw_handler = None
         self.draw_handler_cameras = None
         self.mesh_batch = None
+        self.camera_instances = None
         self.axes_batch = None
         self.camera_batch = None
         self.image_rect_batch = None
@@ -124,6 +141,7 @@ class CPP_OT_camera_projection_painter(bpy.types.Operator):
         self.check_data_updated = PropertyTracker()
         self.data_updated = PropertyTracker()
         self.check_brush_curve_updated = PropertyTracker()
+        self.check_camera_updated = PropertyTracker()
 
     @staticmethod
     def ensure_uv_layer(ob):
@@ -172,9 +190,10 @@ class CPP_OT_camera_projection_painter(bpy.types.Operator):
         # Create an environment for the current object
         self.environment = engine.Environment(ob, clone_uv_layer)
 
-        self.mesh_batch = draw.mesh_preview.get_object_batch(context, ob)
+        self.mesh_batch = draw.mesh_batch.ObjectBatch(context, ob)
         self.axes_batch = draw.cameras.get_axes_batch()
         self.camera_batch, self.image_rect_batch = draw.cameras.get_camera_batches()
+        self.camera_instances = draw.camera_batch.CameraInstances()
         draw.add_draw_handlers(self, context)
 
         wm = context.window_manager
@@ -199,8 +218,15 @@ class CPP_OT_camera_projection_painter(bpy.types.Operator):
             wm.event_timer_remove(self.timer)
 
         extend_bpy_types.image.ImageCache.clear()
+        warnings.MeshBVHCache.clear()
+        warnings.WarningStatusCache.clear()
 
         draw.remove_draw_handlers(self)
+        draw.mesh_preview.BrushTextureCache.clear()
+        draw.preview_atlas.PreviewAtlas.clear()
+        prefetch.prefetcher.stop()
+        image_loader.loader.clear()
+        image_pyramid.pyramids.clear()
         self.remove_uv_layer(ob)
 
         for ob in context.scene.cpp.camera_objects:
@@ -229,10 +255,19 @@ class CPP_OT_camera_projection_painter(bpy.types.Operator):
         image_paint = scene.tool_settings.image_paint
         clone_image = image_paint.clone_image
 
-        engine.updateImageSeqStaticSize(bpy.data.images, skip_already_set=True)
+        extend_bpy_types.image.ImageSizeTracker.process()
+
+        # Geometry of the painted object has been changed
+        if self.mesh_batch.is_dirty:
+            self.mesh_batch.update(context, context.image_paint_object, preferences.debug_info)
 
-        # update viewports on mouse movements
-        if event.type == 'MOUSEMOVE':
+        # update viewports on mouse movements, after mesh preview chunks upload and images decoded in background
+        mesh_batch_uploaded = self.mesh_batch.process(preferences.debug_info)
+        images_decoded = image_loader.loader.process()
+        if images_decoded:
+            extend_bpy_types.image.ImageCache.trim_staged(preferences.loaded_images_memory_limit * 1024 * 1024)
+        pyramids_generated = image_pyramid.pyramids.process()
+        if mesh_batch_uploaded or images_decoded or pyramids_generated or event.type == 'MOUSEMOVE':
             for area in context.screen.areas:
                 if area.type == 'VIEW_3D':
                     area.tag_redraw()
@@ -295,6 +330,10 @@ class CPP_OT_camera_projection_painter(bpy.types.Operator):
             camera.cpp.t2,
         )
 
+        # Images of the cameras which are likely to be used next are read in background
+        if self.check_camera_updated(camera_ob):
+            prefetch.prefetch_neighbor_images(scene, camera_ob)
+
         if self.check_data_updated(check_tuple):
             self.full_draw = True
 
@@ -309,6 +348,7 @@ class CPP_OT_camera_projection_painter(bpy.types.Operator):
         if event.type not in ('TIMER', 'TIMER_REPORT'):
             if self.data_updated(check_tuple):
                 self.environment.setProjector(camera_ob, preferences.debug_info)
+                self.mesh_batch.tag_visibility_update()
 
                 self.full_draw = False
 
@@ -1,10 +1,16 @@
+from . import camera_batch
 from . import cameras
+from . import mesh_batch
 from . import mesh_preview
+from . import preview_atlas
 
 if "bpy" in locals():
     import importlib
+    importlib.reload(camera_batch)
     importlib.reload(cameras)
+    importlib.reload(mesh_batch)
     importlib.reload(mesh_preview)
+    importlib.reload(preview_atlas)
 
 import bpy
 
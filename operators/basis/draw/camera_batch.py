@@ -0,0 +1,297 @@
+import time
+
+import numpy as np
+
+from . import preview_atlas
+from .... import extend_bpy_types
+
+if "bpy" in locals():
+    import importlib
+    importlib.reload(preview_atlas)
+
+import bpy
+import gpu
+
+# Cameras with images which previews are not available yet are added after this time
+PREVIEW_RETRY_TIME = 0.5
+
+# Camera frustum, apex is the camera origin
+WIRE_VERTICES = np.array((
+    (0.0, 0.0, 0.0),
+    (0.5, 0.5, -1.0),
+    (0.5, -0.5, -1.0),
+    (-0.5, -0.5, -1.0),
+    (-0.5, 0.5, -1.0)
+), dtype=np.float32)
+
+WIRE_INDICES = np.array((
+    (0, 1), (0, 2), (0, 3), (0, 4),
+    (1, 2), (2, 3), (3, 4), (1, 4)
+), dtype=np.int32)
+
+AXES_VERTICES = np.array((
+    (0.0, 0.0, 0.0),
+    (1.0, 0.0, 0.0),
+    (0.0, 1.0, 0.0),
+    (0.0, 0.0, 1.0)
+), dtype=np.float32)
+
+AXES_COLORS = np.array((
+    (0.5, 0.5, 0.5, 0.0),
+    (1.0, 0.0, 0.0, 0.6),
+    (0.0, 1.0, 0.0, 0.6),
+    (0.0, 0.0, 1.0, 0.6)
+), dtype=np.float32)
+
+AXES_INDICES = np.array(((0, 1), (0, 2), (0, 3)), dtype=np.int32)
+
+IMAGE_RECT_VERTICES = np.array((
+    (0.5, 0.5, -1.0),
+    (0.5, -0.5, -1.0),
+    (-0.5, -0.5, -1.0),
+    (-0.5, 0.5, -1.0)
+), dtype=np.float32)
+
+IMAGE_RECT_UV = np.array((
+    (0.5, 0.5), (0.5, -0.5), (-0.5, -0.5), (-0.5, 0.5),
+), dtype=np.float32)
+
+IMAGE_RECT_INDICES = np.array(((0, 1, 2), (0, 2, 3)), dtype=np.int32)
+
+LENS_MODELS = tuple(item[0] for item in extend_bpy_types.camera.camera_lens_model_items)
+
+
+def get_camera_shape(camera, image):
+    """
+    Scale of the camera frustum base, scale of the image preview coordinates and frustum depth
+    @return: tuple (aspect_scale, uv_aspect_scale, sensor_size)
+    """
+    aspect_scale = 1.0, 1.0
+    uv_aspect_scale = 1.0, 1.0
+
+    horizontal_fit = True
+    sensor_size = camera.lens / camera.sensor_width
+    if camera.sensor_fit == 'VERTICAL':
+        horizontal_fit = False
+        sensor_size = camera.lens / camera.sensor_height
+
+    if image and image.cpp.valid:
+        width, height = image.cpp.static_size
+
+        if camera.sensor_fit == 'AUTO':
+            horizontal_fit = width > height
+
+        if horizontal_fit:
+            aspect_scale = 1.0, height / width
+        else:
+            aspect_scale = width / height, 1.0
+
+        if width > height:
+            uv_aspect_scale = 1.0, height / width
+        else:
+            uv_aspect_scale = width / height, 1.0
+
+    return aspect_scale, uv_aspect_scale, sensor_size
+
+
+def get_calibration(camera, image):
+    """
+    Image size, lens, distortion model and its parameters packed the same way as "undistorted_uv" attributes
+    of the instanced image preview shader
+    @return: tuple of four tuples
+    """
+    width, height = image.cpp.static_size
+    cpp = camera.cpp
+    return (
+        (width, height, camera.lens, LENS_MODELS.index(cpp.camera_lens_model)),
+        (cpp.principal_point_x, cpp.principal_point_y, cpp.skew, cpp.aspect_ratio),
+        (cpp.k1, cpp.k2, cpp.k3, cpp.k4),
+        (cpp.t1, cpp.t2),
+    )
+
+
+def get_instanced_batch(buffer_type: str, vertices: np.ndarray, indices: np.ndarray, vertex_attributes: dict,
+                        instance_attributes: dict):
+    """
+    Single batch of all instances of the template geometry. Per-instance attributes are repeated
+    for every vertex of the instance, so the batch is drawn with one call
+    @return: gpu.types.GPUBatch or None if there are no instances
+    """
+    count = len(next(iter(instance_attributes.values())))
+    if not count:
+        return None
+
+    vertices_count = len(vertices)
+
+    attributes = {"pos": np.tile(vertices, (count, 1))}
+    for attr_id, data in vertex_attributes.items():
+        attributes[attr_id] = np.tile(data, (count, 1))
+    for attr_id, data in instance_attributes.items():
+        attributes[attr_id] = np.repeat(data, vertices_count, axis=0)
+
+    vert_format = gpu.types.GPUVertFormat()
+    for attr_id, data in attributes.items():
+        vert_format.attr_add(id=attr_id, comp_type='F32', len=data.shape[1], fetch_mode='FLOAT')
+    vbo = gpu.types.GPUVertBuf(len=count * vertices_count, format=vert_format)
+    for attr_id, data in attributes.items():
+        vbo.attr_fill(id=attr_id, data=data)
+
+    offsets = np.arange(count, dtype=np.int32) * vertices_count
+    instance_indices = (indices[None, :, :] + offsets[:, None, None]).reshape(-1, indices.shape[1])
+    ibo = gpu.types.GPUIndexBuf(type=buffer_type, seq=instance_indices)
+
+    return gpu.types.GPUBatch(type=buffer_type, buf=vbo, elem=ibo)
+
+
+class CameraInstances:
+    """
+    Wireframes, axes and image previews of all visible cameras except the active one, each kind of geometry
+    is drawn with a single call (image previews - with a single call per atlas page).
+    Buffers are rebuilt only after transforms or data of the cameras, their binded images
+    or drawing settings have been changed
+    """
+    __slots__ = (
+        "is_dirty",
+        "key",
+        "pointers",
+        "wire_batch",
+        "axes_batch",
+        "image_batches",
+        "has_pending_previews",
+        "update_time",
+    )
+
+    def __init__(self):
+        self.is_dirty = True
+        self.key = None
+        self.pointers = set()
+        self.wire_batch = None
+        self.axes_batch = None
+        self.image_batches = []
+        self.has_pending_previews = False
+        self.update_time = 0.0
+
+    def tag_update(self, updated_pointers):
+        if not self.pointers.isdisjoint(updated_pointers):
+            self.is_dirty = True
+
+    @staticmethod
+    def get_key(context, preferences):
+        scene = context.scene
+        return (
+            scene.camera,
+            len(scene.objects),
+            # Cameras which have been hidden or enabled again
+            frozenset(ob.as_pointer() for ob in scene.cpp.initial_visible_camera_objects),
+            # Wire color depends on whether the image data has been loaded, but not on the order of use
+            frozenset(extend_bpy_types.image.ImageCache.gl_load_order),
+            tuple(preferences.camera_color),
+            tuple(preferences.camera_color_loaded_data),
+        )
+
+    def ensure(self, context, preferences):
+        """
+        Update the buffers if required
+        """
+        key = self.get_key(context, preferences)
+        retry_previews = self.has_pending_previews and (time.time() - self.update_time) > PREVIEW_RETRY_TIME
+        if self.is_dirty or retry_previews or key != self.key:
+            self.update(context, preferences)
+            self.key = key
+
+    def update(self, context, preferences):
+        dt = time.time()
+
+        scene = context.scene
+        camera_objects = [ob for ob in scene.cpp.initial_visible_camera_objects if ob != scene.camera]
+        count = len(camera_objects)
+
+        preview_atlas.PreviewAtlas.free_removed()
+
+        model_matrices = np.empty((count, 4, 4), dtype=np.float32)
+        frustum_scales = np.empty((count, 3), dtype=np.float32)
+        wire_colors = np.empty((count, 4), dtype=np.float32)
+
+        camera_color = tuple(preferences.camera_color)
+        camera_color_loaded_data = tuple(preferences.camera_color_loaded_data)
+
+        # Image previews
+        image_instances = []
+        image_pages = []
+        image_attributes = []
+        has_pending_previews = False
+
+        pointers = set()
+        for i, camera_object in enumerate(camera_objects):
+            camera = camera_object.data
+            image = camera.cpp.image
+
+            aspect_scale, uv_aspect_scale, sensor_size = get_camera_shape(camera, image)
+
+            model_matrices[i] = camera_object.matrix_world
+            frustum_scales[i] = aspect_scale[0], aspect_scale[1], sensor_size
+            if image and image.cpp.valid and image.has_data:
+                wire_colors[i] = camera_color_loaded_data
+            else:
+                wire_colors[i] = camera_color
+
+            if image and image.cpp.valid:
+                atlas_item = preview_atlas.PreviewAtlas.get_rect(image)
+                if atlas_item is None:
+                    has_pending_previews = True
+                else:
+                    page_index, atlas_rect = atlas_item
+                    image_instances.append(i)
+                    image_pages.append(page_index)
+                    image_attributes.append((uv_aspect_scale, atlas_rect) + get_calibration(camera, image))
+
+            pointers.add(camera_object.as_pointer())
+            pointers.add(camera.as_pointer())
+            if image:
+                pointers.add(image.as_pointer())
+
+        # Model matrix is passed by columns
+        instance_matrices = {f"model_matrix_{i}": model_matrices[:, :, i] for i in range(4)}
+
+        self.wire_batch = get_instanced_batch(
+            'LINES', WIRE_VERTICES, WIRE_INDICES, {},
+            dict(instance_matrices, frustum_scale=frustum_scales, wire_color=wire_colors)
+        )
+        self.axes_batch = get_instanced_batch(
+            'LINES', AXES_VERTICES, AXES_INDICES, {"color": AXES_COLORS}, instance_matrices
+        )
+
+        self.image_batches = []
+        if image_instances:
+            image_instances = np.array(image_instances, dtype=np.int64)
+            image_pages = np.array(image_pages, dtype=np.int64)
+            image_attribute_ids = ("uv_aspect_scale", "atlas_rect",
+                                   "und_image", "und_principal_point", "und_k", "und_t")
+            image_attribute_arrays = [
+                np.array([attributes[j] for attributes in image_attributes], dtype=np.float32)
+                for j in range(len(image_attribute_ids))
+            ]
+
+            for page_index in np.unique(image_pages):
+                mask = image_pages == page_index
+                page_instances = image_instances[mask]
+
+                instance_attributes = {attr_id: data[page_instances] for attr_id, data in instance_matrices.items()}
+                instance_attributes["frustum_scale"] = frustum_scales[page_instances]
+                for attr_id, data in zip(image_attribute_ids, image_attribute_arrays):
+                    instance_attributes[attr_id] = data[mask]
+
+                batch = get_instanced_batch(
+                    'TRIS', IMAGE_RECT_VERTICES, IMAGE_RECT_INDICES, {"uv": IMAGE_RECT_UV}, instance_attributes
+                )
+                self.image_batches.append((preview_atlas.PreviewAtlas.pages[page_index], batch))
+
+        self.pointers = pointers
+        self.has_pending_previews = has_pending_previews
+        self.update_time = time.time()
+        self.is_dirty = False
+
+        if preferences.debug_info:
+            print(f"Camera Projection Painter: Camera instances updated in {time.time() - dt:.6f} sec:\n"
+                  f"\tCameras: {count}, image previews: {len(image_instances)}, "
+                  f"atlas pages: {len(self.image_batches)}, pending previews: {has_pending_previews}")
@@ -1,6 +1,13 @@
+from . import camera_batch
+from . import preview_atlas
 from .... import engine
 from .... import __package__ as addon_pkg
 
+if "bpy" in locals():
+    import importlib
+    importlib.reload(camera_batch)
+    importlib.reload(preview_atlas)
+
 import bpy
 import bgl
 from gpu_extras.batch import batch_for_shader
@@ -81,20 +88,34 @@ def draw_cameras(self, context):
     preferences = context.preferences.addons[addon_pkg].preferences
     scene = context.scene
     cameras_viewport_size = scene.cpp.cameras_viewport_size
+    camera_axes_size = scene.cpp.camera_axes_size
 
     image_paint = scene.tool_settings.image_paint
     clone_image = image_paint.clone_image
 
     # Shaders
     shader_camera = engine.shaders.getShader("camera")
+    shader_camera_instanced = engine.shaders.getShader("camera_instanced")
     shader_camera_image_preview = engine.shaders.getShader("camera_image_preview")
+    shader_camera_image_preview_instanced = engine.shaders.getShader("camera_image_preview_instanced")
     shader_axes = engine.shaders.getShader("axes")
+    shader_axes_instanced = engine.shaders.getShader("axes_instanced")
 
     # Batches
     axes_batch = self.axes_batch
     camera_wire_batch = self.camera_batch
     image_rect_batch = self.image_rect_batch
 
+    camera_instances = self.camera_instances
+    camera_instances.ensure(context, preferences)
+
+    active_camera_object = scene.camera
+    draw_active_camera = (
+            active_camera_object is not None
+            and active_camera_object.initial_visible
+            and context.region_data.view_perspective != 'CAMERA'
+    )
+
     # OpenGL setup
     bgl.glEnable(bgl.GL_DEPTH_TEST)
     bgl.glEnable(bgl.GL_BLEND)
@@ -103,96 +124,80 @@ def draw_cameras(self, context):
     bgl.glEnable(bgl.GL_LINE_SMOOTH)
     bgl.glDisable(bgl.GL_MULTISAMPLE)
 
-    for camera_object in scene.cpp.initial_visible_camera_objects:
-        camera = camera_object.data
-        model_matrix = camera_object.matrix_world
-        image = camera.cpp.image
-        image_has_data = False
-        line_width = preferences.camera_line_width
-
-        if camera_object == scene.camera:
-            if context.region_data.view_perspective == 'CAMERA':
-                continue
-            image = clone_image
-            line_width = preferences.active_camera_line_width
-
-        aspect_scale = 1.0, 1.0
-        sensor_size = camera.lens / camera.sensor_width
-
-        if camera.sensor_fit == 'HORIZONTAL':
-            horizontal_fit = True
-            sensor_size = camera.lens / camera.sensor_width
-        elif camera.sensor_fit == 'VERTICAL':
-            horizontal_fit = False
-            sensor_size = camera.lens / camera.sensor_height
-
-        if image and image.cpp.valid:
-            image_has_data = image.has_data
-
-            width, height = image.cpp.static_size
-
-            if camera.sensor_fit == 'AUTO':
-                horizontal_fit = width > height
-                sensor_size = camera.lens / camera.sensor_width
-
-            if horizontal_fit:
-                aspect_scale = 1.0, height / width
-            else:
-                aspect_scale = width / height, 1.0
-
-            if width > height:
-                uv_aspect_scale = 1.0, height / width
-            else:
-                uv_aspect_scale = width / height, 1.0
-
-            bindcode = image.cpp.preview_bindcode
-            if bindcode:
-                bgl.glActiveTexture(bgl.GL_TEXTURE0)
-                bgl.glBindTexture(bgl.GL_TEXTURE_2D, bindcode)
-
-                bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_WRAP_S, bgl.GL_CLAMP_TO_BORDER)
-                bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_WRAP_T, bgl.GL_CLAMP_TO_BORDER)
-
-                shader_camera_image_preview.bind()
-
-                shader_camera_image_preview.uniform_float("model_matrix", model_matrix)
-                shader_camera_image_preview.uniform_float("aspect_scale", aspect_scale)
-                shader_camera_image_preview.uniform_float("uv_aspect_scale", uv_aspect_scale)
-                shader_camera_image_preview.uniform_float("sensor_size", sensor_size)
-                shader_camera_image_preview.uniform_float("cameras_viewport_size", cameras_viewport_size)
-                shader_camera_image_preview.uniform_float("image_space_color", preferences.image_space_color)
-                shader_camera_image_preview.uniform_int("image", 0)
-
-                camera.cpp.set_shader_calibration(shader_camera_image_preview)
-
-                image_rect_batch.draw(shader_camera_image_preview)
-
-        bgl.glLineWidth(line_width)
-
+    # Image previews of all cameras except the active one, single draw call per atlas page
+    if camera_instances.image_batches:
+        shader_camera_image_preview_instanced.bind()
+        shader_camera_image_preview_instanced.uniform_float("cameras_viewport_size", cameras_viewport_size)
+        shader_camera_image_preview_instanced.uniform_float("image_space_color", preferences.image_space_color)
+        shader_camera_image_preview_instanced.uniform_float("atlas_size", preview_atlas.PAGE_SIZE)
+        shader_camera_image_preview_instanced.uniform_int("image", 0)
+
+        bgl.glActiveTexture(bgl.GL_TEXTURE0)
+        for bindcode, batch in camera_instances.image_batches:
+            bgl.glBindTexture(bgl.GL_TEXTURE_2D, bindcode)
+            batch.draw(shader_camera_image_preview_instanced)
+
+    if draw_active_camera and clone_image and clone_image.cpp.valid:
+        bindcode = clone_image.cpp.preview_bindcode
+        if bindcode:
+            camera = active_camera_object.data
+            aspect_scale, uv_aspect_scale, sensor_size = camera_batch.get_camera_shape(camera, clone_image)
+
+            bgl.glActiveTexture(bgl.GL_TEXTURE0)
+            bgl.glBindTexture(bgl.GL_TEXTURE_2D, bindcode)
+
+            bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_WRAP_S, bgl.GL_CLAMP_TO_BORDER)
+            bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_WRAP_T, bgl.GL_CLAMP_TO_BORDER)
+
+            shader_camera_image_preview.bind()
+
+            shader_camera_image_preview.uniform_float("model_matrix", active_camera_object.matrix_world)
+            shader_camera_image_preview.uniform_float("aspect_scale", aspect_scale)
+            shader_camera_image_preview.uniform_float("uv_aspect_scale", uv_aspect_scale)
+            shader_camera_image_preview.uniform_float("sensor_size", sensor_size)
+            shader_camera_image_preview.uniform_float("cameras_viewport_size", cameras_viewport_size)
+            shader_camera_image_preview.uniform_float("image_space_color", preferences.image_space_color)
+            shader_camera_image_preview.uniform_int("image", 0)
+
+            camera.cpp.set_shader_calibration(shader_camera_image_preview)
+
+            image_rect_batch.draw(shader_camera_image_preview)
+
+    # Wireframes of all cameras except the active one
+    if camera_instances.wire_batch:
+        bgl.glLineWidth(preferences.camera_line_width)
+        shader_camera_instanced.bind()
+        shader_camera_instanced.uniform_float("cameras_viewport_size", cameras_viewport_size)
+        camera_instances.wire_batch.draw(shader_camera_instanced)
+
+    if draw_active_camera:
+        camera = active_camera_object.data
+        aspect_scale, _, sensor_size = camera_batch.get_camera_shape(camera, clone_image)
+
+        bgl.glLineWidth(preferences.active_camera_line_width)
         shader_camera.bind()
-        if image_has_data:
-            wire_color = preferences.camera_color_loaded_data
-        else:
-            wire_color = preferences.camera_color
-        if camera_object == scene.camera:
-            wire_color = preferences.camera_color_highlight
-
-        shader_camera.uniform_float("model_matrix", model_matrix)
+
+        shader_camera.uniform_float("model_matrix", active_camera_object.matrix_world)
         shader_camera.uniform_float("aspect_scale", aspect_scale)
         shader_camera.uniform_float("sensor_size", sensor_size)
         shader_camera.uniform_float("cameras_viewport_size", cameras_viewport_size)
 
-        shader_camera.uniform_float("wire_color", wire_color)
+        shader_camera.uniform_float("wire_color", preferences.camera_color_highlight)
 
         camera_wire_batch.draw(shader_camera)
 
-        # Display the axes of the camera object
-        if scene.cpp.camera_axes_size:
-            camera_axes_size = scene.cpp.camera_axes_size
+    # Display the axes of the camera objects
+    if camera_axes_size:
+        bgl.glLineWidth(2.0)
+
+        if camera_instances.axes_batch:
+            shader_axes_instanced.bind()
+            shader_axes_instanced.uniform_float("camera_axes_size", camera_axes_size)
+            camera_instances.axes_batch.draw(shader_axes_instanced)
 
-            bgl.glLineWidth(2.0)
+        if draw_active_camera:
             shader_axes.bind()
-            shader_axes.uniform_float("modelMatrix", model_matrix)
+            shader_axes.uniform_float("modelMatrix", active_camera_object.matrix_world)
             shader_axes.uniform_float("camera_axes_size", camera_axes_size)
             axes_batch.draw(shader_axes)
 
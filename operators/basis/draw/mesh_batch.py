@@ -0,0 +1,326 @@
+import time
+import zlib
+
+import numpy as np
+
+from .... import warnings
+
+import gpu
+
+BUFFER_TYPE = 'TRIS'
+
+# Vertex attributes of the preview batch and mesh vertices attributes they are read from
+ATTRIBUTES = (
+    ("pos", "co"),
+    ("normal", "normal"),
+)
+
+# Number of triangles in a single chunk
+CHUNK_SIZE = 65536
+
+# Maximum time of chunks upload per modal operator tick
+UPLOAD_TIME_BUDGET = 0.01
+
+
+def _get_vert_buf(attr_id: str, data: np.ndarray):
+    vert_format = gpu.types.GPUVertFormat()
+    vert_format.attr_add(id=attr_id, comp_type='F32', len=3, fetch_mode='FLOAT')
+    vbo = gpu.types.GPUVertBuf(len=len(data), format=vert_format)
+    vbo.attr_fill(id=attr_id, data=data)
+    return vbo
+
+
+def _part1by2(value: np.ndarray):
+    # Spread lower 10 bits of the value so that there are two zero bits between each of them
+    value = value.astype(np.uint32) & 0x000003ff
+    value = (value ^ (value << 16)) & 0xff0000ff
+    value = (value ^ (value << 8)) & 0x0300f00f
+    value = (value ^ (value << 4)) & 0x030c30c3
+    value = (value ^ (value << 2)) & 0x09249249
+    return value
+
+
+def get_spatial_order(positions: np.ndarray, tris: np.ndarray):
+    """
+    Order of triangles along Morton (Z-order) curve of their centroids. Consecutive triangles in this order are
+    spatially close to each other, so chunks of consecutive triangles are compact clusters
+    @return: numpy.ndarray of triangle indices
+    """
+    if not len(tris):
+        return np.zeros(0, dtype=np.int64)
+    centroids = positions[tris].mean(axis=1)
+    bbox_min = centroids.min(axis=0)
+    bbox_size = centroids.max(axis=0) - bbox_min
+    bbox_size[bbox_size == 0.0] = 1.0
+    cells = ((centroids - bbox_min) / bbox_size * 1023.0).astype(np.uint32)
+    codes = _part1by2(cells[:, 0]) | (_part1by2(cells[:, 1]) << 1) | (_part1by2(cells[:, 2]) << 2)
+    return np.argsort(codes, kind="stable")
+
+
+def get_box_corners(bbox_min: np.ndarray, bbox_max: np.ndarray):
+    """
+    Corners of the bounding boxes
+    @return: numpy.ndarray (N, 8, 3)
+    """
+    count = len(bbox_min)
+    corners = np.empty((count, 8, 3), dtype=np.float64)
+    for i in range(8):
+        corners[:, i, 0] = bbox_max[:, 0] if i & 1 else bbox_min[:, 0]
+        corners[:, i, 1] = bbox_max[:, 1] if i & 2 else bbox_min[:, 1]
+        corners[:, i, 2] = bbox_max[:, 2] if i & 4 else bbox_min[:, 2]
+    return corners
+
+
+def get_visible_mask(bbox_min: np.ndarray, bbox_max: np.ndarray, mvp: np.ndarray, extent_x: float, extent_y: float):
+    """
+    Test of bounding boxes against projector frustum. Visible area of the projector is in range
+    [-extent, extent] of the normalized device coordinates, box is invisible if all its corners
+    are outside of the same clipping plane
+    @return: numpy.ndarray (N,) of bool
+    """
+    corners = get_box_corners(bbox_min, bbox_max)
+
+    x = corners @ mvp[0, 0:3] + mvp[0, 3]
+    y = corners @ mvp[1, 0:3] + mvp[1, 3]
+    w = corners @ mvp[3, 0:3] + mvp[3, 3]
+
+    outside = (
+        np.all(x > extent_x * w, axis=1)
+        | np.all(x < -extent_x * w, axis=1)
+        | np.all(y > extent_y * w, axis=1)
+        | np.all(y < -extent_y * w, axis=1)
+        | np.all(w <= 0.0, axis=1)
+    )
+    return ~outside
+
+
+class BatchChunk:
+    """
+    Part of the mesh preview batch with own vertex and index buffers. After upload only the mesh vertex indices
+    of the chunk and checksums of the uploaded attributes are kept, local triangle indices are freed
+    """
+    __slots__ = (
+        "vertex_indices",
+        "indices",
+        "checksums",
+        "ibo",
+        "vbos",
+        "batch",
+        "stale_attributes",
+    )
+
+    def __init__(self, tris: np.ndarray):
+        # Chunk uses only own vertices, indices are remapped to them
+        self.vertex_indices, inverse = np.unique(tris, return_inverse=True)
+        self.indices = inverse.reshape(tris.shape).astype(np.int32)
+        self.checksums = {}  # attr_id: checksum of the uploaded data
+        self.ibo = None
+        self.vbos = {}
+        self.batch = None
+        self.stale_attributes = set(attr_id for attr_id, _ in ATTRIBUTES)
+
+    def is_changed(self, attr_id: str, data: np.ndarray):
+        return zlib.crc32(np.ascontiguousarray(data[self.vertex_indices])) != self.checksums.get(attr_id, None)
+
+    def upload(self, attributes: dict):
+        if self.ibo is None:
+            self.ibo = gpu.types.GPUIndexBuf(type=BUFFER_TYPE, seq=self.indices)
+            self.indices = None
+
+        for attr_id in self.stale_attributes:
+            data = attributes[attr_id][self.vertex_indices]
+            self.checksums[attr_id] = zlib.crc32(data)
+            self.vbos[attr_id] = _get_vert_buf(attr_id, data)
+        self.stale_attributes.clear()
+
+        vbo_iter = iter(self.vbos[attr_id] for attr_id, _ in ATTRIBUTES)
+        batch = gpu.types.GPUBatch(type=BUFFER_TYPE, buf=next(vbo_iter), elem=self.ibo)
+        for vbo in vbo_iter:
+            batch.vertbuf_add(vbo)
+        self.batch = batch
+
+
+class ObjectBatch:
+    """
+    Mesh preview batch of the evaluated object, split into spatial clusters of fixed triangles count.
+    Chunks are uploaded to GPU over several modal operator ticks and only chunks inside projector frustum are drawn.
+    Visibility of the chunks is evaluated again only after projector, object transform or geometry changes.
+    After geometry updates which keep topology only changed attributes of changed chunks are uploaded again
+    and the index buffers are reused. Updates which don't change the geometry key (projected UV layer writes)
+    are skipped without reading the mesh. Vertex attributes are kept in memory only until pending chunks are uploaded,
+    changes are detected by checksums
+    """
+    __slots__ = (
+        "ob_pointer",
+        "is_dirty",
+        "geometry_key",
+        "topology_key",
+        "attribute_checksums",
+        "attributes",
+        "chunks",
+        "pending",
+        "bbox_min",
+        "bbox_max",
+        "upload_start_time",
+        "visible",
+        "visible_extent",
+    )
+
+    def __init__(self, context, ob):
+        self.ob_pointer = ob.as_pointer()
+        self.is_dirty = False
+        self.geometry_key = None
+        self.topology_key = None
+        self.attribute_checksums = {}
+        self.attributes = {}
+        self.chunks = []
+        self.pending = []
+        self.bbox_min = np.empty((0, 3), dtype=np.float64)
+        self.bbox_max = np.empty((0, 3), dtype=np.float64)
+        self.upload_start_time = 0.0
+        self.visible = None
+        self.visible_extent = None
+
+        self.update(context, ob)
+
+    @staticmethod
+    def get_evaluated_mesh(context, ob):
+        depsgraph = context.evaluated_depsgraph_get()
+        return depsgraph.id_eval_get(ob).data
+
+    def tag_update(self, updated_geometry_pointers, updated_transform_pointers):
+        if self.ob_pointer in updated_geometry_pointers:
+            self.is_dirty = True
+        if self.ob_pointer in updated_transform_pointers:
+            self.tag_visibility_update()
+
+    def tag_visibility_update(self):
+        self.visible = None
+
+    def _update_bounds(self, positions: np.ndarray):
+        self.bbox_min = np.array([positions[chunk.vertex_indices].min(axis=0) for chunk in self.chunks])
+        self.bbox_max = np.array([positions[chunk.vertex_indices].max(axis=0) for chunk in self.chunks])
+        self.tag_visibility_update()
+
+    def update(self, context, ob, debug_info=False):
+        """
+        Splits the mesh into chunks at first call or if topology has been changed,
+        otherwise marks only changed vertex attributes of the changed chunks to be uploaded again
+        """
+        dt = time.time()
+
+        mesh = self.get_evaluated_mesh(context, ob)
+
+        geometry_key = warnings.get_geometry_key(mesh)
+        if self.chunks and geometry_key == self.geometry_key:
+            self.is_dirty = False
+            if debug_info:
+                print(f"Camera Projection Painter: Mesh preview batch update skipped, geometry is not changed, "
+                      f"checked in {time.time() - dt:.6f} sec")
+            return
+        self.geometry_key = geometry_key
+        mesh.calc_loop_triangles()
+
+        vertices_count = len(mesh.vertices)
+        loop_tris_count = len(mesh.loop_triangles)
+
+        # 'foreach_get' is the fastest method
+        indices = np.empty((loop_tris_count, 3), dtype=np.int32)
+        mesh.loop_triangles.foreach_get("vertices", np.reshape(indices, loop_tris_count * 3))
+
+        topology_key = (loop_tris_count, zlib.crc32(indices))
+        topology_changed = (not self.chunks) or topology_key != self.topology_key
+
+        attributes = {}
+        for attr_id, mesh_attr in ATTRIBUTES:
+            data = np.empty((vertices_count, 3), dtype=np.float32)
+            mesh.vertices.foreach_get(mesh_attr, np.reshape(data, vertices_count * 3))
+            attributes[attr_id] = data
+
+        attribute_checksums = {attr_id: zlib.crc32(data) for attr_id, data in attributes.items()}
+
+        updated_attributes = set()
+        if topology_changed:
+            self.topology_key = topology_key
+            clustered_indices = indices[get_spatial_order(attributes["pos"], indices)]
+            self.chunks = [
+                BatchChunk(clustered_indices[i:i + CHUNK_SIZE]) for i in range(0, loop_tris_count, CHUNK_SIZE)
+            ]
+            self.pending = list(self.chunks)
+            updated_attributes.update(attributes.keys())
+        else:
+            for attr_id, data in attributes.items():
+                if attribute_checksums[attr_id] == self.attribute_checksums.get(attr_id, None):
+                    continue
+                updated_attributes.add(attr_id)
+                for chunk in self.chunks:
+                    # Not yet uploaded attributes are uploaded from the new data anyway
+                    if attr_id in chunk.stale_attributes or chunk.is_changed(attr_id, data):
+                        chunk.stale_attributes.add(attr_id)
+                        if chunk not in self.pending:
+                            self.pending.append(chunk)
+
+        self.attribute_checksums = attribute_checksums
+        if "pos" in updated_attributes:
+            self._update_bounds(attributes["pos"])
+        # Attributes are needed only by the chunks waiting for upload
+        self.attributes = attributes if self.pending else {}
+
+        self.is_dirty = False
+        self.upload_start_time = time.time()
+
+        if debug_info:
+            if topology_changed:
+                stage = f"Full rebuild, chunks: {len(self.chunks)}"
+            else:
+                stage = f"Updated attributes ({', '.join(sorted(updated_attributes)) or 'none'}), " \
+                    f"chunks: {len(self.pending)}"
+            print(f"Camera Projection Painter: Mesh preview batch updated in {time.time() - dt:.6f} sec:\n"
+                  f"\t{stage}, vertices: {vertices_count}, triangles: {loop_tris_count}")
+
+    def process(self, debug_info=False):
+        """
+        Uploads pending chunks until time budget is exceeded
+        @return: bool, True if any chunk was uploaded
+        """
+        if not self.pending:
+            return False
+
+        dt = time.time()
+        while self.pending and (time.time() - dt) < UPLOAD_TIME_BUDGET:
+            chunk = self.pending.pop(0)
+            chunk.upload(self.attributes)
+        if not self.pending:
+            self.attributes = {}
+
+        if debug_info and not self.pending:
+            print(f"Camera Projection Painter: Mesh preview batch uploaded in "
+                  f"{time.time() - self.upload_start_time:.6f} sec, chunks: {len(self.chunks)}")
+        return True
+
+    def _ensure_visible(self, mvp: np.ndarray, extent_x: float, extent_y: float):
+        extent = (extent_x, extent_y)
+        if self.visible is None or self.visible_extent != extent:
+            self.visible = get_visible_mask(self.bbox_min, self.bbox_max, mvp, extent_x, extent_y)
+            self.visible_extent = extent
+
+    def get_visible_corners(self, mvp: np.ndarray, extent_x: float, extent_y: float):
+        """
+        Corners of the bounding boxes of chunks inside projector frustum, in object space
+        @return: numpy.ndarray (N, 3)
+        """
+        if not self.chunks:
+            return np.empty((0, 3), dtype=np.float64)
+        self._ensure_visible(mvp, extent_x, extent_y)
+        return get_box_corners(self.bbox_min[self.visible], self.bbox_max[self.visible]).reshape(-1, 3)
+
+    def draw(self, shader, mvp: np.ndarray, extent_x: float, extent_y: float):
+        """
+        Draw uploaded chunks inside projector frustum. Matrix should include model matrix of the object
+        """
+        if not self.chunks:
+            return
+        self._ensure_visible(mvp, extent_x, extent_y)
+        for chunk, is_visible in zip(self.chunks, self.visible):
+            if is_visible and chunk.batch is not None:
+                chunk.batch.draw(shader)
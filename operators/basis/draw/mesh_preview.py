@@ -1,27 +1,25 @@
+from collections import OrderedDict
+
 import numpy as np
 
 from .... import engine
 from .... import warnings
+from .... import brush_curve
+from .... import image_pyramid
+from .... import extend_bpy_types
 from .... import __package__ as addon_pkg
 
 if "bpy" in locals():
     import importlib
     importlib.reload(warnings)
+    importlib.reload(brush_curve)
+    importlib.reload(image_pyramid)
 
 import bpy
 import bgl
-import gpu
 from mathutils import Vector, Matrix
 
 
-def f_clamp(value: float, min_value: float, max_value: float):
-    return max(min(value, max_value), min_value)
-
-
-def f_lerp(value0: float, value1: float, factor: float):
-    return (value0 * (1.0 - factor)) + (value1 * factor)
-
-
 def get_hovered_region_3d(context, mouse_position):
     mouse_x, mouse_y = mouse_position
     for area in context.screen.areas:
@@ -48,111 +46,121 @@ def get_hovered_region_3d(context, mouse_position):
                     pass
 
 
-def iter_curve_values(curve_mapping, steps: int):
-    curve_mapping.initialize()
-    curve = list(curve_mapping.curves)[0]
+class BrushTextureCache:
+    """
+    Brush falloff textures keyed by lookup table values. Number of textures is limited,
+    least recently used textures are deleted from GPU memory
+    """
+    __slots__ = ()
 
-    clip_min_x = curve_mapping.clip_min_x
-    clip_min_y = curve_mapping.clip_min_y
-    clip_max_x = curve_mapping.clip_max_x
-    clip_max_y = curve_mapping.clip_max_y
+    max_items = 8
+    cache = OrderedDict()
 
-    for i in range(steps):
-        fac = i / steps
-        pos = f_lerp(clip_min_x, clip_max_x, fac)
-
-        value = curve_mapping.evaluate(curve, pos)
-
-        yield f_clamp(value, clip_min_y, clip_max_y)
-
-
-def update_brush_texture_bindcode(self, context):
-    scene = context.scene
-    image_paint = scene.tool_settings.image_paint
-    brush = image_paint.brush
-    pixel_width = scene.tool_settings.unified_paint_settings.size
-
-    # Check curve values for every 10% to check any updates. Its biased, but fast.
-    check_steps = 10
-    check_tuple = tuple((n for n in iter_curve_values(
-        brush.curve, check_steps))) + (pixel_width,)
-
-    if self.check_brush_curve_updated(check_tuple):
-        pixels = [int(n * 255)
-                  for n in iter_curve_values(brush.curve, pixel_width)]
+    @classmethod
+    def get_bindcode(cls, lut: np.ndarray):
+        key = lut.tobytes()
+        bindcode = cls.cache.get(key, None)
+        if bindcode is not None:
+            cls.cache.move_to_end(key)
+            return bindcode
 
         id_buff = bgl.Buffer(bgl.GL_INT, 1)
         bgl.glGenTextures(1, id_buff)
-
         bindcode = id_buff.to_list()[0]
 
         bgl.glBindTexture(bgl.GL_TEXTURE_2D, bindcode)
-        image_buffer = bgl.Buffer(bgl.GL_INT, len(pixels), pixels)
-        bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_MAG_FILTER
-                            | bgl.GL_TEXTURE_MIN_FILTER, bgl.GL_LINEAR)
+        # Every int32 value is unpacked as RGBA bytes, so red channel contains the value
+        image_buffer = bgl.Buffer(bgl.GL_INT, len(lut), lut.tolist())
+        bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_MIN_FILTER, bgl.GL_LINEAR)
+        bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_MAG_FILTER, bgl.GL_LINEAR)
         bgl.glTexImage2D(bgl.GL_TEXTURE_2D, 0, bgl.GL_RED,
-                         pixel_width, 1, 0, bgl.GL_RGBA, bgl.GL_UNSIGNED_BYTE, image_buffer)
-
-        self.brush_texture_bindcode = bindcode
-
-
-def get_object_batch(context, ob):
-    """Returns object batch from evaluated depsgraph"""
+                         len(lut), 1, 0, bgl.GL_RGBA, bgl.GL_UNSIGNED_BYTE, image_buffer)
 
-    depsgraph = context.evaluated_depsgraph_get()
+        cls.cache[key] = bindcode
+        while len(cls.cache) > cls.max_items:
+            _, evicted_bindcode = cls.cache.popitem(last=False)
+            cls._delete_texture(evicted_bindcode)
+        return bindcode
 
-    # Get the modified version of the mesh from the depsgraph
-    mesh = depsgraph.id_eval_get(ob).data
-    mesh.calc_loop_triangles()
+    @staticmethod
+    def _delete_texture(bindcode: int):
+        bgl.glDeleteTextures(1, bgl.Buffer(bgl.GL_INT, 1, [bindcode]))
 
-    vertices_count = len(mesh.vertices)
-    loop_tris_count = len(mesh.loop_triangles)
+    @classmethod
+    def clear(cls):
+        for bindcode in cls.cache.values():
+            cls._delete_texture(bindcode)
+        cls.cache.clear()
 
-    vertices_shape = (vertices_count, 3)
-    loop_tris_shape = (loop_tris_count, 3)
 
-    # Required attributes
-    vertices_positions = np.empty(vertices_shape, dtype=np.float32)
-    vertices_normals = np.empty(vertices_shape, dtype=np.float32)
-    indices = np.empty(loop_tris_shape, dtype=np.int32)
-
-    vertices_newshape = vertices_count * 3
-    loop_tris_newshape = loop_tris_count * 3
-
-    # 'foreach_get' is the fastest method
-    mesh.vertices.foreach_get(
-        "co", np.reshape(vertices_positions, vertices_newshape))
-    mesh.vertices.foreach_get(
-        "normal", np.reshape(vertices_normals, vertices_newshape))
-    mesh.loop_triangles.foreach_get(
-        "vertices", np.reshape(indices, loop_tris_newshape))
-
-    # Batch generation
-    buffer_type = 'TRIS'
-
-    format_attributes = (
-        ("pos", vertices_positions),
-        ("normal", vertices_normals)
-    )
-
-    # Structure of a vertex buffer
-    vert_format = gpu.types.GPUVertFormat()
-    for format_attr in format_attributes:
-        vert_format.attr_add(
-            id=format_attr[0], comp_type='F32', len=3, fetch_mode='FLOAT')
-
-    # Index buffer
-    ibo = gpu.types.GPUIndexBuf(type=buffer_type, seq=indices)
-
-    # Vertex buffer
-    vbo = gpu.types.GPUVertBuf(len=vertices_count, format=vert_format)
-    for attr_id, attr in format_attributes:
-        vbo.attr_fill(id=attr_id, data=attr)
-
-    # Batch
-    batch = gpu.types.GPUBatch(type=buffer_type, buf=vbo, elem=ibo)
+def update_brush_texture_bindcode(self, context):
+    scene = context.scene
+    image_paint = scene.tool_settings.image_paint
+    brush = image_paint.brush
 
-    return batch
+    if self.check_brush_curve_updated(brush_curve.get_brush_curve_hash(brush.curve)):
+        self.brush_texture_bindcode = BrushTextureCache.get_bindcode(brush_curve.get_brush_curve_lut(brush.curve))
+
+
+def get_screen_coverage(context, ob, corners: np.ndarray, mvp: np.ndarray, image_size):
+    """
+    Number of image texels and screen pixels along the larger side of the visible part of the projected image.
+    Both are estimated from the corners of bounding boxes of the visible mesh parts
+    @return: tuple (float texels, float pixels)
+    """
+    if not len(corners):
+        return 0.0, 0.0
+
+    # Projector space
+    x = corners @ mvp[0, 0:3] + mvp[0, 3]
+    y = corners @ mvp[1, 0:3] + mvp[1, 3]
+    w = corners @ mvp[3, 0:3] + mvp[3, 3]
+    front = w > 0.0
+    if not np.any(front):
+        return 0.0, 0.0
+    u = np.clip(x[front] / w[front] + 0.5, 0.0, 1.0)
+    v = np.clip(y[front] / w[front] + 0.5, 0.0, 1.0)
+    texels = max((u.max() - u.min()) * image_size[0], (v.max() - v.min()) * image_size[1])
+
+    # Viewport space
+    region = context.region
+    view_mvp = np.array(context.region_data.perspective_matrix, dtype=np.float64) @ np.array(
+        ob.matrix_world, dtype=np.float64)
+    x = corners @ view_mvp[0, 0:3] + view_mvp[0, 3]
+    y = corners @ view_mvp[1, 0:3] + view_mvp[1, 3]
+    w = corners @ view_mvp[3, 0:3] + view_mvp[3, 3]
+    front = w > 0.0
+    if not np.any(front):
+        return texels, 0.0
+    sx = np.clip(x[front] / w[front], -1.0, 1.0) * (region.width * 0.5)
+    sy = np.clip(y[front] / w[front], -1.0, 1.0) * (region.height * 0.5)
+    pixels = max(sx.max() - sx.min(), sy.max() - sy.min())
+
+    return texels, pixels
+
+
+def get_pyramid_bindcode(context, image, ob, corners: np.ndarray, mvp: np.ndarray):
+    """
+    Texture of the coarsest image pyramid level sufficient for the current screen coverage
+    of the image. The finest pyramid level is used instead of full resolution image. Pyramids are not used
+    for the images which texture is color managed by Blender, so levels look the same as the image
+    @return: int, zero if pyramid is not available
+    """
+    preferences = context.preferences.addons[addon_pkg].preferences
+    if not preferences.use_image_pyramids:
+        return 0
+    if not extend_bpy_types.image.is_byte_texture(image):
+        return 0
+    filepath = extend_bpy_types.image.get_source_filepath(image)
+    if not filepath:
+        return 0
+    source = (filepath, image.alpha_mode == 'NONE')
+    levels = image_pyramid.pyramids.get_levels(source, preferences.image_pyramids_disk_limit * 1024 * 1024)
+    if not levels:
+        return 0
+    texels, pixels = get_screen_coverage(context, ob, corners, mvp, image.cpp.static_size)
+    level = max(1, image_pyramid.select_level(texels, pixels, len(levels)))
+    return image_pyramid.pyramids.get_bindcode(source, level)
 
 
 def draw_projection_preview(self, context):
@@ -175,24 +183,47 @@ def draw_projection_preview(self, context):
     camera = scene.camera.data
 
     image = image_paint.clone_image
-    if not(image and image.cpp.valid and (not image.cpp.gl_load(context))):
+    if not(image and image.cpp.valid):
         return
 
-    batch = self.mesh_batch
-    if batch is None:
+    mesh_batch = self.mesh_batch
+    if mesh_batch is None:
         return
 
     preferences = context.preferences.addons[addon_pkg].preferences
 
+    # Projector frustum including outline drawn outside camera image rectangle
+    outline_type = {'NO_OUTLINE': 0, 'FILL': 1, 'CHECKER': 2, 'LINES': 3}[preferences.outline_type]
+    width, height = image.cpp.static_size
+    outline_extent_x = outline_extent_y = 0.0
+    if outline_type:
+        outline_extent_x = outline_extent_y = preferences.outline_width * 0.1
+        if width > height:
+            outline_extent_y *= width / height
+        elif height > width:
+            outline_extent_x *= height / width
+    extent_x, extent_y = 0.5 + outline_extent_x, 0.5 + outline_extent_y
+    mvp = np.array(self.environment.projector_MVP, dtype=np.float64) @ np.array(ob.matrix_world, dtype=np.float64)
+
+    # Full resolution image is used only while painting
+    bindcode = 0
+    if not wm.cpp.is_image_paint:
+        corners = mesh_batch.get_visible_corners(mvp, extent_x, extent_y)
+        bindcode = get_pyramid_bindcode(context, image, ob, corners, mvp)
+    if not bindcode:
+        if image.cpp.gl_load(context):
+            return
+        bindcode = image.cpp.gl_bindcode
+
     # openGL setup
     bgl.glEnable(bgl.GL_BLEND)
     bgl.glBlendFunc(bgl.GL_SRC_ALPHA, bgl.GL_ONE_MINUS_SRC_ALPHA)
     bgl.glEnable(bgl.GL_DEPTH_TEST)
 
     bgl.glActiveTexture(bgl.GL_TEXTURE0)
-    bgl.glBindTexture(bgl.GL_TEXTURE_2D, image.bindcode)
+    bgl.glBindTexture(bgl.GL_TEXTURE_2D, bindcode)
 
-    bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_MIN_FILTER, bgl.GL_NEAREST)
+    bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_MIN_FILTER, bgl.GL_LINEAR)
     bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_MAG_FILTER, bgl.GL_LINEAR)
     bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_WRAP_S, bgl.GL_CLAMP_TO_BORDER)
     bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_WRAP_T, bgl.GL_CLAMP_TO_BORDER)
@@ -229,7 +260,6 @@ def draw_projection_preview(self, context):
     shader.uniform_float("normal_highlight_color", preferences.normal_highlight_color)
 
     # Outline and Highlight
-    outline_type = {'NO_OUTLINE': 0, 'FILL': 1, 'CHECKER': 2, 'LINES': 3}[preferences.outline_type]
     if outline_type:
         outline_color = preferences.outline_color
         shader.uniform_float("outline_color", outline_color)
@@ -249,9 +279,10 @@ def draw_projection_preview(self, context):
     shader.uniform_float("brush_strength", image_paint.brush.strength)
 
     camera.cpp.set_shader_calibration(shader)
+
     # Draw
 
-    batch.draw(shader)
+    mesh_batch.draw(shader, mvp, extent_x, extent_y)
 
     # ////////////////////////////////////////////////////////////////////////////////////////////////////////////////
     # scene = context.scene
@@ -0,0 +1,117 @@
+import zlib
+
+import numpy as np
+
+import bpy
+import bgl
+
+# Width and height of the atlas page texture
+PAGE_SIZE = 2048
+
+
+class PreviewAtlas:
+    """
+    Image previews packed into cells of large atlas textures (pages). All previews of the same page
+    are drawn with a single texture bind. Cell size is the size of the image preview.
+    Cells are keyed by image and checksum of the preview pixels, so regenerated previews are uploaded again
+    into the same cell. Cells of the removed images are reused
+    """
+    __slots__ = ()
+
+    cell_size = 0
+    pages = []  # bindcodes
+    free_cells = []  # (page index, cell index)
+    # image pointer: (preview checksum, page index, cell index, (u, v, width, height) in texture coordinates)
+    items = {}
+
+    pixels = np.zeros(0, dtype=np.int32)
+
+    @classmethod
+    def _add_page(cls):
+        id_buff = bgl.Buffer(bgl.GL_INT, 1)
+        bgl.glGenTextures(1, id_buff)
+        bindcode = id_buff.to_list()[0]
+
+        bgl.glBindTexture(bgl.GL_TEXTURE_2D, bindcode)
+        bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_MIN_FILTER, bgl.GL_LINEAR)
+        bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_MAG_FILTER, bgl.GL_LINEAR)
+        bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_WRAP_S, bgl.GL_CLAMP_TO_EDGE)
+        bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_WRAP_T, bgl.GL_CLAMP_TO_EDGE)
+        # Buffer is zero-initialized, so empty cells are transparent
+        bgl.glTexImage2D(
+            bgl.GL_TEXTURE_2D, 0, bgl.GL_RGBA, PAGE_SIZE, PAGE_SIZE,
+            0, bgl.GL_RGBA, bgl.GL_UNSIGNED_BYTE, bgl.Buffer(bgl.GL_INT, PAGE_SIZE * PAGE_SIZE)
+        )
+
+        page_index = len(cls.pages)
+        cls.pages.append(bindcode)
+
+        cells_per_row = PAGE_SIZE // cls.cell_size
+        cls.free_cells.extend((page_index, i) for i in reversed(range(cells_per_row * cells_per_row)))
+
+    @classmethod
+    def get_rect(cls, image):
+        """
+        Page and texture coordinates rectangle of the image preview. Preview is uploaded at first request
+        @return: tuple (int page index, tuple (u, v, width, height)) or None if preview has not been generated yet
+        """
+        preview = image.preview
+        width, height = preview.image_size
+        if not (width and height):
+            return None
+
+        if not cls.cell_size:
+            cls.cell_size = bpy.app.render_preview_size
+        if width > cls.cell_size or height > cls.cell_size:
+            return None
+
+        cls.pixels = np.resize(cls.pixels, width * height)
+        preview.image_pixels.foreach_get(cls.pixels)
+        if not np.any(cls.pixels):
+            return None
+
+        checksum = zlib.crc32(cls.pixels)
+        pointer = image.as_pointer()
+        item = cls.items.get(pointer, None)
+        if item is not None:
+            if item[0] == checksum:
+                return item[1], item[3]
+            # Preview has been regenerated
+            page_index, cell_index = item[1], item[2]
+        else:
+            if not cls.free_cells:
+                cls._add_page()
+            page_index, cell_index = cls.free_cells.pop()
+
+        cells_per_row = PAGE_SIZE // cls.cell_size
+        x = (cell_index % cells_per_row) * cls.cell_size
+        y = (cell_index // cells_per_row) * cls.cell_size
+
+        bgl.glBindTexture(bgl.GL_TEXTURE_2D, cls.pages[page_index])
+        bgl.glTexSubImage2D(
+            bgl.GL_TEXTURE_2D, 0, x, y, width, height,
+            bgl.GL_RGBA, bgl.GL_UNSIGNED_BYTE, bgl.Buffer(bgl.GL_INT, len(cls.pixels), cls.pixels)
+        )
+
+        rect = (x / PAGE_SIZE, y / PAGE_SIZE, width / PAGE_SIZE, height / PAGE_SIZE)
+        cls.items[pointer] = checksum, page_index, cell_index, rect
+        return page_index, rect
+
+    @classmethod
+    def free_removed(cls):
+        """
+        Free cells of the images which no longer exist in bpy.data.images
+        """
+        pointers = set(image.as_pointer() for image in bpy.data.images)
+        for pointer in [_ for _ in cls.items if _ not in pointers]:
+            _checksum, page_index, cell_index, _rect = cls.items.pop(pointer)
+            cls.free_cells.append((page_index, cell_index))
+
+    @classmethod
+    def clear(cls):
+        for bindcode in cls.pages:
+            bgl.glDeleteTextures(1, bgl.Buffer(bgl.GL_INT, 1, [bindcode]))
+        cls.pages.clear()
+        cls.free_cells.clear()
+        cls.items.clear()
+        cls.cell_size = 0
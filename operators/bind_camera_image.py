@@ -1,3 +1,5 @@
+import time
+
 import bpy
 
 from .. import engine
@@ -32,6 +34,13 @@ class CPP_OT_bind_camera_image(bpy.types.Operator):
         description="Set camera and image name to filename on disk"
     )
 
+    recursive: bpy.props.BoolProperty(
+        name="Search Subdirectories",
+        default=True,
+        description="Search image files in subdirectories of the source directory too.\n"
+                    "Available only with NumPy engine backend, compiled backend searches the source directory only"
+    )
+
     refresh_image_previews: bpy.props.BoolProperty(
         name="Refresh Image Preview",
         default=False)
@@ -39,6 +48,9 @@ class CPP_OT_bind_camera_image(bpy.types.Operator):
     def draw(self, context):
         layout = self.layout
         layout.prop(self, "search_blend")
+        row = layout.row()
+        row.enabled = engine.BACKEND == 'NUMPY'
+        row.prop(self, "recursive")
         layout.prop(self, "rename")
         layout.prop(self, "refresh_image_previews")
 
@@ -88,7 +100,14 @@ class CPP_OT_bind_camera_image(bpy.types.Operator):
         scene = context.scene
         camera_seq = list([_ for _ in self.iter_processed_cameras(context)])
 
-        binded = engine.bindCameraImages(camera_seq, scene.cpp.source_dir, self.search_blend, self.rename)
+        dt = time.time()
+        if engine.BACKEND == 'NUMPY':
+            binded = engine.bindCameraImages(
+                camera_seq, scene.cpp.source_dir, self.search_blend, self.rename, recursive=self.recursive
+            )
+        else:
+            binded = engine.bindCameraImages(camera_seq, scene.cpp.source_dir, self.search_blend, self.rename)
+        t = round(time.time() - dt, 3)
 
         cam_txt = "cameras"
         mtp = 'INFO'
@@ -97,7 +116,19 @@ class CPP_OT_bind_camera_image(bpy.types.Operator):
         elif binded == 1:
             cam_txt = "camera"
 
-        self.report(type={mtp}, message=f"Binded {binded} {cam_txt}")
+        # Match statistics are available only with NumPy engine backend
+        stats_txt = ""
+        get_bind_statistics = getattr(engine, "getBindStatistics", None)
+        if get_bind_statistics is not None:
+            stats = get_bind_statistics()
+            ambiguous_txt = ""
+            if stats["ambiguous"]:
+                ambiguous_txt = f", ambiguous file names {stats['ambiguous']} (see console)"
+            stats_txt = (f" (by name {stats['found_by_name']}, by file path {stats['found_by_filepath']}, "
+                         f"from source directory {stats['found_in_source_dir']}, not found {stats['not_found']}"
+                         f"{ambiguous_txt})")
+
+        self.report(type={mtp}, message=f"Binded {binded} {cam_txt} in {t} sec{stats_txt}")
 
         engine.updateImageSeqStaticSize(bpy.data.images, skip_already_set=True)
         if self.refresh_image_previews:
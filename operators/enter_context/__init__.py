@@ -1,4 +1,7 @@
 from ... import poll
+from ... import calibration_csv
+from ... import camera_builder
+from .. import import_cameras_csv
 from . import io_fbx
 from . import ui_io_fbx
 from ... import __package__ as addon_pkg
@@ -6,6 +9,9 @@ from ... import __package__ as addon_pkg
 if "bpy" in locals():
     import importlib
     importlib.reload(poll)
+    importlib.reload(calibration_csv)
+    importlib.reload(camera_builder)
+    importlib.reload(import_cameras_csv)
     importlib.reload(io_fbx)
 
 import bpy
@@ -88,6 +94,58 @@ def stage_mesh_check(self, context, event):
     return {'RUNNING_MODAL'}
 
 
+def get_calibration_poses(scene):
+    """
+    Calibration table and camera poses of the scene calibration file, angles are interpreted
+    by the scene calibration orientation
+    @return: tuple (calibration_csv.CalibrationTable, poses) or None if file is missing or has no poses
+    """
+    fp = import_cameras_csv.get_csv_file_filepath(scene.cpp.calibration_source_file)
+    if not fp:
+        return None
+    table = calibration_csv.read_calibration_file(fp)
+    if table is None:
+        return None
+    poses = calibration_csv.get_poses(table, scene.cpp.calibration_orientation)
+    if poses is None:
+        return None
+    return table, poses
+
+
+def stage_build_cameras(self, context, event):
+    wm = context.window_manager
+    scene = context.scene
+
+    # Cameras are created from the calibration file if there are no cameras in the scene,
+    # a batch of cameras per timer event
+    if self.camera_builder is None:
+        calibration = None
+        if not scene.cpp.has_camera_objects:
+            calibration = get_calibration_poses(scene)
+        if calibration is None:
+            wm.cpp.progress_stage_complete()
+            return {'RUNNING_MODAL'}
+        table, poses = calibration
+        self.camera_builder = camera_builder.CameraBuilder(
+            scene, table, poses, create_cameras=True, use_georeference_offset=scene.cpp.use_georeference_offset
+        )
+        return {'RUNNING_MODAL'}
+
+    builder = self.camera_builder
+    if builder.step():
+        builder.finish()
+        self.report(
+            type={'INFO'},
+            message=f"Created {builder.created} cameras from calibration file in {builder.create_time:.3f} sec "
+                    f"({builder.throughput:.0f} cameras per sec)"
+        )
+        self.camera_builder = None
+        wm.cpp.progress_stage_complete()
+    else:
+        wm.cpp.progress_stage_update(builder.progress)
+    return {'RUNNING_MODAL'}
+
+
 def stage_bind_images(self, context, event):
     wm = context.window_manager
 
@@ -155,7 +213,7 @@ class CPP_OT_enter_context(bpy.types.Operator):
     bl_label = "Setup Context"
     bl_options = {'INTERNAL'}
 
-    __slots__ = ("timer", "is_import", "func_stages")
+    __slots__ = ("timer", "is_import", "func_stages", "camera_builder")
 
     @classmethod
     def poll(cls, context):
@@ -230,7 +288,10 @@ class CPP_OT_enter_context(bpy.types.Operator):
                 if image and image.cpp.valid and (image != image_paint.clone_image):
                     result += f"""\u2022 Image Paint "Clone Image" will be set to "{image.name}".\n"""
             elif not scene.cpp.has_camera_objects:
-                result += "\u203c Scene missing camera objects.\n"
+                if scene.cpp.calibration_source_file:
+                    result += "\u2022 Cameras will be created from calibration file.\n"
+                else:
+                    result += "\u203c Scene missing camera objects.\n"
 
         # Scene/Tool settings check
         if (workspace_tool.idname != "builtin_brush.Clone") or\
@@ -248,7 +309,9 @@ class CPP_OT_enter_context(bpy.types.Operator):
     def invoke(self, context, event):
         wm = context.window_manager
 
+        self.camera_builder = None
         self.func_stages = [
+            stage_build_cameras,
             stage_bind_images,
             stage_mesh_check,
             stage_tool_settings,
@@ -1,130 +1,115 @@
-
 import os
 import time
-import csv
 
-import bpy
+import numpy as np
 
-# Full calibration parameters list is:
-#     ['#name', 'x', 'y', 'alt', 'heading', 'pitch', 'roll', 'f', 'px', 'py', 'k1', 'k2', 'k3', 'k4', 't1', 't2']
-# but we are interested only in next:
-CALIB_PARAMS = dict.fromkeys(["#name", "f", "px", "py", "k1", "k2", "k3", "k4", "t1", "t2"])
+from .. import calibration_csv
+from .. import camera_builder
+
+if "bpy" in locals():
+    import importlib
+    importlib.reload(calibration_csv)
+    importlib.reload(camera_builder)
+
+import bpy
 
 
 def get_csv_file_filepath(filepath):
     fp = bpy.path.abspath(filepath)
     if os.path.isfile(fp):
         ext = os.path.splitext(fp)[-1]
-        if ext.lower() == ".csv":
+        if ext.lower() in calibration_csv.SUPPORTED_EXTENSIONS:
             return fp
 
 
+def import_calibration_file(scene, import_poses=False, create_cameras=False):
+    """
+    Apply the scene calibration file to the cameras matched by name. Used by the operator and by the update
+    of the calibration file path, where no undo step should be pushed
+    @return: tuple (str report type, str message), report type is 'ERROR' if the file is not supported.
+        None if the file is missing
+    """
+    fp = get_csv_file_filepath(scene.cpp.calibration_source_file)
+    if not fp:
+        return None
+
+    filename = os.path.basename(fp)
+
+    dt = time.time()
+
+    table = calibration_csv.read_calibration_file(fp)
+    if table is None:
+        rejected = calibration_csv.find_rejected_header(fp)
+        if rejected:
+            return 'ERROR', (f"Geographic coordinates ({', '.join(rejected)}) are not supported, export camera "
+                             f"locations in a projected coordinate system: {filename}")
+    has_intrinsics = table is not None and table.has(*calibration_csv.INTRINSIC_FIELDS)
+    poses = None
+    if table is not None and import_poses:
+        poses = calibration_csv.get_poses(table, scene.cpp.calibration_orientation)
+    if not (has_intrinsics or poses is not None):
+        return 'ERROR', f"Unsupported calibration file: {filename}"
+
+    builder = camera_builder.CameraBuilder(
+        scene, table, poses, create_cameras=create_cameras,
+        use_georeference_offset=scene.cpp.use_georeference_offset
+    )
+    success_rows, skipped_rows = builder.finish()
+    created = builder.created
+
+    offset_txt = ""
+    if np.any(builder.offset):
+        offset_txt = f", offset {tuple(builder.offset.tolist())}"
+
+    cam_txt = "cameras"
+    if success_rows == 1:
+        cam_txt = "camera"
+    mtp = 'INFO'
+    if success_rows == 0:
+        mtp = 'WARNING'
+    params_txt = "calibration parameters"
+    if poses is not None:
+        params_txt = "poses" if not has_intrinsics else "calibration parameters and poses"
+    created_txt = f" (created {created})" if created else ""
+    t = round(time.time() - dt, 3)
+    return mtp, (f"Imported {params_txt} for {success_rows} {cam_txt}{created_txt}, skipped {skipped_rows} "
+                 f"in {t} sec{offset_txt}")
+
+
 class CPP_OT_import_cameras_csv(bpy.types.Operator):
     bl_idname = "cpp.import_cameras_csv"
     bl_label = "Import CSV"
-    bl_options = {'INTERNAL'}
+    bl_options = {'REGISTER', 'UNDO', 'INTERNAL'}
 
-    @staticmethod
-    def iter_name_variations(name: str):
-        splext = os.path.splitext(name)
-        if len(splext) > 1:
-            yield splext[0] + splext[-1].lower()
-        yield splext[0]
+    import_poses: bpy.props.BoolProperty(
+        name="Import Poses",
+        default=False,
+        description="Set camera locations and rotations from the file"
+    )
 
-    def execute(self, context):
+    create_cameras: bpy.props.BoolProperty(
+        name="Create Missing Cameras",
+        default=False,
+        description="Create camera objects for the rows which have no matching camera in the scene"
+    )
+
+    def draw(self, context):
         scene = context.scene
+        layout = self.layout
+        layout.prop(self, "import_poses")
+        col = layout.column()
+        col.enabled = self.import_poses
+        col.prop(self, "create_cameras")
+        col.prop(scene.cpp, "calibration_orientation")
+        col.prop(scene.cpp, "use_georeference_offset")
 
-        fp = get_csv_file_filepath(scene.cpp.calibration_source_file)
-        if not fp:
+    def execute(self, context):
+        result = import_calibration_file(context.scene, self.import_poses, self.create_cameras)
+        if result is None:
             return {'CANCELLED'}
-
-        filename = os.path.basename(fp)
-
-        dt = time.time()
-        success_rows = 0
-        skipped_rows = 0
-
-        with open(fp, "r") as file:
-            reader = csv.reader(file)
-            first_row_length = 0
-            for i, row in enumerate(reader):
-                if i == 0:
-                    first_row_length = len(row)
-                    # In Reality Capture exported *.csv first line always starts with commented line camera #name
-                    is_supported_file = False
-
-                    if first_row_length and row[0] == "#name":
-                        params_found = 0
-                        for i, item in enumerate(row):
-                            if item in CALIB_PARAMS:
-                                CALIB_PARAMS[item] = i
-                                params_found += 1
-                        if params_found == len(CALIB_PARAMS):
-                            is_supported_file = True
-                            continue
-
-                    if is_supported_file is False:
-                        self.report(type={'WARNING'}, message=f"Unsupported calibration file: {filename}")
-                        return {'CANCELLED'}
-
-                if len(row) != first_row_length:
-                    skipped_rows += 1
-                    continue
-
-                item_name = str(row[CALIB_PARAMS["#name"]])
-                camera_object = None
-                for ob in scene.cpp.camera_objects:
-                    for name in self.iter_name_variations(ob.name):
-                        for iname in self.iter_name_variations(item_name):
-                            if name == iname:
-                                camera_object = ob
-
-                if camera_object is None:
-                    skipped_rows += 1
-                    continue
-                camera = camera_object.data
-
-                camera.lens = float(row[CALIB_PARAMS["f"]])
-                camera.cpp.principal_point_x = float(row[CALIB_PARAMS["px"]])
-                camera.cpp.principal_point_y = float(row[CALIB_PARAMS["py"]])
-
-                camera.cpp.k1 = float(row[CALIB_PARAMS["k1"]])
-
-                k2 = float(row[CALIB_PARAMS["k2"]])
-                camera.cpp.k2 = k2
-
-                k3 = float(row[CALIB_PARAMS["k3"]])
-                camera.cpp.k3 = k3
-
-                k4 = float(row[CALIB_PARAMS["k4"]])
-                camera.cpp.k4 = k4
-
-                t1 = float(row[CALIB_PARAMS["t1"]])
-                camera.cpp.t1 = t1
-
-                t2 = float(row[CALIB_PARAMS["t2"]])
-                camera.cpp.t2 = t2
-
-                if (k2 or k3):
-                    camera.cpp.camera_lens_model = 'brown3'
-                    if k4:
-                        camera.cpp.camera_lens_model = 'brown4'
-                    if (t1 or t2):
-                        camera.cpp.camera_lens_model = 'brown3t2'
-                        if k4:
-                            camera.cpp.camera_lens_model = 'brown4t2'
-                success_rows += 1
-
-        cam_txt = "cameras"
-        if success_rows == 1:
-            cam_txt = "camera"
-        mtp = 'INFO'
-        if success_rows == 0:
-            mtp = 'WARNING'
-        t = round(time.time() - dt, 3)
-        self.report(
-            type={mtp},
-            message=f"Imported calibration parameters for {success_rows} {cam_txt}, skipped {skipped_rows} in {t} sec"
-        )
-
+        mtp, message = result
+        if mtp == 'ERROR':
+            self.report(type={'WARNING'}, message=message)
+            return {'CANCELLED'}
+        self.report(type={mtp}, message=message)
         return {'FINISHED'}
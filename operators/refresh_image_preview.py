@@ -1,4 +1,10 @@
-from .. import engine
+from . import basis
+from .. import thumbnail_cache
+
+if "bpy" in locals():
+    import importlib
+    importlib.reload(thumbnail_cache)
+
 import bpy
 
 
@@ -10,5 +16,10 @@ class CPP_OT_refresh_image_preview(bpy.types.Operator):
     skip_already_set: bpy.props.BoolProperty(default=True)
 
     def execute(self, context):
-        engine.updateImageSeqPreviews(list(bpy.data.images), self.skip_already_set, False)
+        thumbnail_cache.update_previews(list(bpy.data.images), self.skip_already_set)
+        # Regenerated previews are uploaded to the atlas at next redraw
+        for op in basis.modal_ops:
+            camera_instances = getattr(op, "camera_instances", None)
+            if camera_instances is not None:
+                camera_instances.is_dirty = True
         return {'FINISHED'}
@@ -17,7 +17,7 @@ from bpy.props import (
 
 import sys
 
-SUPPORTED_PLATFORMS = ("win32",)
+SUPPORTED_PLATFORMS = ("win32", "linux")
 SUPPORTED_BLENDER_VERSION = (2, 83)
 
 
@@ -176,6 +176,29 @@ class CppPreferences(bpy.types.AddonPreferences):
         subtype='PIXEL',
         description="Border Empty Space")
 
+    # Memory
+    loaded_images_memory_limit: IntProperty(
+        name="Loaded Images Memory",
+        default=4096,
+        min=256,
+        soft_max=32768,
+        description="Memory limit (in megabytes) for images simultaneously loaded into memory.\n"
+                    "If this limit is exceeded, the least recently used images are freed from memory")
+
+    use_image_pyramids: BoolProperty(
+        name="Image Pyramids",
+        default=True,
+        description="Draw reduced copies of the camera images in the projection preview.\n"
+                    "Reduced copies are generated in background and stored in the add-on user data directory")
+
+    image_pyramids_disk_limit: IntProperty(
+        name="Image Pyramids Disk Space",
+        default=2048,
+        min=64,
+        soft_max=65536,
+        description="Disk space limit (in megabytes) for stored reduced copies of the camera images.\n"
+                    "If this limit is exceeded, the least recently used copies are removed")
+
     # Defaults
     new_texture_size: IntVectorProperty(
         name="New Texture Size",
@@ -207,10 +230,8 @@ class CppPreferences(bpy.types.AddonPreferences):
             env_platform = readable_platforms[sys.platform]
             layout.label(text=f"OS {env_platform} currently is unsupported", icon="ERROR")
 
-            str_supported_os = ""
-            for i in SUPPORTED_PLATFORMS:
-                str_supported_os += readable_platforms[i]
-            layout.label(text=f"Supported operating system is {str_supported_os}", icon='INFO')
+            str_supported_os = ", ".join(readable_platforms[i] for i in SUPPORTED_PLATFORMS)
+            layout.label(text=f"Supported operating systems: {str_supported_os}", icon='INFO')
 
         if not is_valid_env:
             return
@@ -270,6 +291,15 @@ class CppPreferences(bpy.types.AddonPreferences):
         col.prop(self, "camera_color_loaded_data")
         col.separator()
 
+        # Memory
+        col.label(text="Memory", icon='MEMORY')
+        col.prop(self, "loaded_images_memory_limit")
+        col.prop(self, "use_image_pyramids")
+        scol = col.column(align=True)
+        scol.enabled = self.use_image_pyramids
+        scol.prop(self, "image_pyramids_disk_limit")
+        col.separator()
+
         # Defaults
         col.label(text="Defaults", icon='FILE_BLANK')
         col.prop(self, "new_texture_size")
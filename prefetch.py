@@ -0,0 +1,187 @@
+# The module contains prediction of the next used cameras and background prefetch of their image files
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from . import image_loader
+from . import extend_bpy_types
+
+if "bpy" in locals():
+    import importlib
+    importlib.reload(image_loader)
+
+import bpy
+
+# Number of predicted cameras which images are prefetched
+PREFETCH_COUNT = 4
+# Size of a single file read by the prefetch thread
+READ_CHUNK_SIZE = 4 * 1024 * 1024
+# Number of remembered prefetched files, these are not read again until modified
+MAX_PREFETCHED_FILES = 64
+
+
+def get_radial_angles(matrices: np.ndarray):
+    """
+    Angles of the camera view directions in XY plane, the same as used for 'RADIAL' order of the cameras list
+    @return: numpy.ndarray (N,)
+    """
+    return np.arctan2(-matrices[:, 0, 2], -matrices[:, 1, 2])
+
+
+def predict_neighbors(current_index: int, locations: np.ndarray, angles: np.ndarray, count: int = PREFETCH_COUNT):
+    """
+    Indices of the cameras which are likely to be used next. Next and previous cameras in radial order
+    alternate with the nearest cameras in space, most likely first
+    @return: list of int
+    """
+    cameras_count = len(locations)
+    if cameras_count < 2:
+        return []
+
+    radial_order = np.argsort(angles, kind="stable")
+    radial_position = int(np.nonzero(radial_order == current_index)[0][0])
+
+    distances = np.linalg.norm(locations - locations[current_index], axis=1)
+    distances[current_index] = np.inf
+    nearest = np.argsort(distances, kind="stable")[:count]
+
+    ret = []
+    for step in range(1, count + 1):
+        candidates = (
+            radial_order[(radial_position + step) % cameras_count],
+            radial_order[(radial_position - step) % cameras_count],
+            nearest[step - 1] if step <= len(nearest) else current_index,
+        )
+        for index in candidates:
+            index = int(index)
+            if index != current_index and index not in ret:
+                ret.append(index)
+    return ret[:count]
+
+
+class ImagePrefetcher:
+    """
+    Reads image files in a background thread, so the following image loading on the main thread
+    doesn't wait for the disk (or network storage). Only the latest request is processed,
+    pending files of previous requests are dropped
+    """
+    __slots__ = (
+        "_lock",
+        "_condition",
+        "_thread",
+        "_running",
+        "_pending",
+        "_prefetched",
+        "files_count",
+        "files_size",
+        "files_time",
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._condition = threading.Condition(self._lock)
+        self._thread = None
+        self._running = False
+        self._pending = []
+        # (filepath, modification time, size) of the prefetched files
+        self._prefetched = OrderedDict()
+
+        self.files_count = 0
+        self.files_size = 0
+        self.files_time = 0.0
+
+    def request(self, filepaths):
+        with self._condition:
+            self._pending = list(filepaths)
+            if not self._running:
+                self._running = True
+                self._thread = threading.Thread(target=self._run, name="cpp_image_prefetch", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def stop(self):
+        with self._condition:
+            self._running = False
+            self._pending = []
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._running and not self._pending:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                filepath = self._pending.pop(0)
+            self._prefetch_file(filepath)
+
+    def _prefetch_file(self, filepath: str):
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            return
+        key = (filepath, stat.st_mtime, stat.st_size)
+        if key in self._prefetched:
+            self._prefetched.move_to_end(key)
+            return
+
+        dt = time.time()
+        try:
+            with open(filepath, "rb") as file:
+                while file.read(READ_CHUNK_SIZE):
+                    with self._lock:
+                        if not self._running:
+                            return
+        except OSError:
+            return
+
+        self._prefetched[key] = None
+        while len(self._prefetched) > MAX_PREFETCHED_FILES:
+            self._prefetched.popitem(last=False)
+
+        self.files_count += 1
+        self.files_size += stat.st_size
+        self.files_time += time.time() - dt
+
+
+prefetcher = ImagePrefetcher()
+
+
+def _get_image_filepath(image):
+    if image and image.cpp.valid and image.source == 'FILE' and not image.packed_file and not image.has_data:
+        return bpy.path.abspath(image.filepath)
+
+
+def prefetch_neighbor_images(scene, camera_object):
+    """
+    Start prefetch of the images of cameras which are likely to be used after the given camera
+    """
+    camera_objects = list(scene.cpp.camera_objects)
+    if camera_object not in camera_objects:
+        return
+    current_index = camera_objects.index(camera_object)
+
+    matrices = np.array([ob.matrix_world for ob in camera_objects], dtype=np.float64)
+    locations = matrices[:, 0:3, 3]
+    angles = get_radial_angles(matrices)
+
+    filepaths = []
+    for index in predict_neighbors(current_index, locations, angles):
+        image = camera_objects[index].data.cpp.image
+        filepath = _get_image_filepath(image)
+        if not filepath:
+            continue
+        # Decoded images are staged until the camera is used
+        if extend_bpy_types.image.get_async_filepath(image):
+            extend_bpy_types.image.request_async_decode(image, filepath)
+        else:
+            filepaths.append(filepath)
+
+    if filepaths:
+        prefetcher.request(filepaths)
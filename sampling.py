@@ -0,0 +1,101 @@
+# The module contains adaptive sampling of the brush footprint used for warnings
+import numpy as np
+
+# Polar grid of the full pattern, the same as used for a fixed check pattern
+RAYS_ROWS = 16  # angles
+RAYS_COLS = 8  # radii, first one is a center
+
+# Relative spread of the distance samples (standard deviation / mean) until which samples are considered to agree
+DEFAULT_TOLERANCE = 0.05
+
+
+def _get_polar_points(angle_indices, radius_indices):
+    angles = np.radians(360.0 / RAYS_ROWS * np.asarray(angle_indices, dtype=np.float64))
+    radii = np.asarray(radius_indices, dtype=np.float64) / RAYS_COLS
+    angles, radii = np.meshgrid(angles, radii, indexing="ij")
+    return np.stack((np.cos(angles) * radii, np.sin(angles) * radii), axis=-1).reshape(-1, 2)
+
+
+def get_hierarchical_levels():
+    """
+    Hierarchical rings of the polar grid, each next level contains only points missing in the previous ones.
+    All levels together are unique points of the full 16x8 pattern
+    @return: list of numpy.ndarray (N, 2)
+    """
+    all_radii = list(range(1, RAYS_COLS))
+
+    level_0 = np.concatenate((
+        np.zeros((1, 2), dtype=np.float64),
+        _get_polar_points(range(0, RAYS_ROWS, 4), (2, 4, 6))
+    ))
+
+    level_1 = np.concatenate((
+        _get_polar_points(range(0, RAYS_ROWS, 4), (1, 3, 5, 7)),
+        _get_polar_points(range(2, RAYS_ROWS, 4), all_radii)
+    ))
+
+    level_2 = _get_polar_points(range(1, RAYS_ROWS, 2), all_radii)
+
+    return [level_0, level_1, level_2]
+
+
+def get_level_weights(levels):
+    """
+    Weights of the level points. The fixed check pattern contained the center point once per angle and once more,
+    so the center is weighted the same way and the weighted mean of all levels equals the mean of the fixed pattern
+    @return: list of numpy.ndarray (N,)
+    """
+    weights = [np.ones(len(level), dtype=np.float64) for level in levels]
+    weights[0][0] = RAYS_ROWS + 1
+    return weights
+
+
+LEVELS = get_hierarchical_levels()  # constant, do it at stage of import
+WEIGHTS = np.concatenate(get_level_weights(LEVELS))
+
+
+def samples_agree(distances: np.ndarray, tolerance: float) -> bool:
+    """
+    True if all samples hit the surface and their spread is inside tolerance
+    @return: bool
+    """
+    hit = distances != -1.0
+    if not np.all(hit):
+        return False
+    hit_distances = distances[hit]
+    mean = np.mean(hit_distances)
+    if mean == 0.0:
+        return True
+    return (np.std(hit_distances) / mean) <= tolerance
+
+
+def sample_adaptive(eval_func, tolerance: float = DEFAULT_TOLERANCE, levels=LEVELS):
+    """
+    Evaluate distances starting from the coarsest level, refine while samples disagree beyond tolerance.
+    Thin surface may pass between the points of a coarse level, so a level where all samples missed
+    is refined once more and sampling stops only if the next level misses too.
+    eval_func takes numpy.ndarray (N, 2) of points in unit disk and returns numpy.ndarray (N,)
+    of distances, -1.0 for missed samples
+    @return: numpy.ndarray of distances of all evaluated samples, in order of levels
+    """
+    distances = np.zeros(0, dtype=np.float64)
+    for i, level in enumerate(levels):
+        distances = np.concatenate((distances, eval_func(level)))
+        if np.all(distances == -1.0):
+            if i:
+                break
+        elif samples_agree(distances, tolerance):
+            break
+    return distances
+
+
+def get_mean_distance(distances: np.ndarray, weights: np.ndarray = WEIGHTS) -> float:
+    """
+    Weighted mean of the hit distances returned by sample_adaptive
+    @return: float, 0.0 if all samples missed
+    """
+    weights = weights[0:len(distances)]
+    hit = distances != -1.0
+    if not np.any(hit):
+        return 0.0
+    return float(np.average(distances[hit], weights=weights[hit]))
@@ -0,0 +1,67 @@
+# Before/after comparison of the brush curve check on every modal operator tick. Before, the curve was evaluated
+# at 10 positions and values were compared with the previous tick. After, hash of the control points is compared
+# and the lookup table is rebuilt and looked up in the texture cache only when the curve has changed. Rebuild
+# cost is reported for reference. The curve mapping stub evaluates the curve in Python, Blender does it in C,
+# so evaluations count per tick is reported together with the time. Run from outside of the repository
+# directory:
+#     python <repository>/tests/benchmark_brush_curve.py
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import conftest  # noqa: E402
+import test_brush_curve  # noqa: E402
+
+REPEATS = 2000
+# Number of the curve control points, brush presets have 2-8
+POINTS_COUNTS = (2, 4, 8, 16)
+# Number of the curve evaluations of the check before
+CHECK_STEPS = 10
+
+
+def measure(func):
+    dt = time.perf_counter()
+    for _ in range(REPEATS):
+        func()
+    return (time.perf_counter() - dt) / REPEATS
+
+
+def main():
+    brush_curve = conftest.load_module("brush_curve.py")
+    texture_cache = {}
+    previous = {}
+
+    def check_before(curve_mapping):
+        value = tuple(brush_curve.iter_curve_values(curve_mapping, CHECK_STEPS))
+        return previous.setdefault("before", value) != value
+
+    def check_after(curve_mapping):
+        value = brush_curve.get_brush_curve_hash(curve_mapping)
+        return previous.setdefault("after", value) != value
+
+    def rebuild(curve_mapping):
+        key = brush_curve.get_brush_curve_lut(curve_mapping).tobytes()
+        return texture_cache.setdefault(key, len(texture_cache))
+
+    print(f"{'points':<8}{'evals before':>13}{'evals after':>12}{'usec before':>13}{'usec after':>12}"
+          f"{'usec rebuild':>14}")
+    for points_count in POINTS_COUNTS:
+        points = [(i / (points_count - 1), 1.0 - (i / (points_count - 1)) ** 2) for i in range(points_count)]
+        curve_mapping = test_brush_curve.CurveMapping(points)
+        previous.clear()
+
+        time_before = measure(lambda: check_before(curve_mapping))
+        evals_before = curve_mapping.evaluations / REPEATS
+        curve_mapping.evaluations = 0
+        time_after = measure(lambda: check_after(curve_mapping))
+        evals_after = curve_mapping.evaluations / REPEATS
+        time_rebuild = measure(lambda: rebuild(curve_mapping))
+
+        print(f"{points_count:<8}{evals_before:>13.0f}{evals_after:>12.0f}{time_before * 1e6:>13.1f}"
+              f"{time_after * 1e6:>12.1f}{time_rebuild * 1e6:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# Before/after comparison of the calibration file parsing on synthetic RealityCapture exports: csv.reader loop
+# converting the values row by row against NumPy columns parsed by chunks (calibration_csv). Run from outside
+# of the repository directory:
+#     python <repository>/tests/benchmark_calibration_csv.py
+import csv
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import conftest  # noqa: E402
+import test_calibration_csv  # noqa: E402
+
+ROWS = (1000, 10000, 50000)
+REPEATS = 3
+
+
+def measure(func):
+    dt = time.perf_counter()
+    for _ in range(REPEATS):
+        func()
+    return (time.perf_counter() - dt) / REPEATS
+
+
+def read_rows(filepath: str, fields: tuple):
+    # Parsing before calibration_csv: header lookup and float conversion of each value of each row
+    names = []
+    values = []
+    with open(filepath, "r") as file:
+        reader = csv.reader(file)
+        header = next(reader)
+        indices = [header.index(field) for field in ("#name",) + fields]
+        for row in reader:
+            if len(row) != len(header):
+                continue
+            names.append(row[indices[0]])
+            values.append([float(row[i]) for i in indices[1:]])
+    return names, values
+
+
+def main():
+    calibration_csv = conftest.load_module("calibration_csv.py")
+    fields = ("x", "y", "alt", "heading", "pitch", "roll") + calibration_csv.INTRINSIC_FIELDS
+
+    print(f"{'rows':>8}{'msec before':>13}{'msec after':>12}{'speedup':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for count in ROWS:
+            filepath = os.path.join(directory, f"cameras_{count}.csv")
+            with open(filepath, "w", encoding="utf-8") as file:
+                file.write(test_calibration_csv.REALITY_CAPTURE_HEADER)
+                file.writelines(map(test_calibration_csv.get_reality_capture_row, range(count)))
+
+            names, values = read_rows(filepath, fields)
+            table = calibration_csv.read_calibration_file(filepath)
+            assert table.names == names
+            np.testing.assert_array_equal(np.stack([table.columns[field] for field in fields], axis=1), values)
+
+            time_before = measure(lambda: read_rows(filepath, fields))
+            time_after = measure(lambda: calibration_csv.read_calibration_file(filepath))
+            print(f"{count:>8}{time_before * 1e3:>13.1f}{time_after * 1e3:>12.1f}{time_before / time_after:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
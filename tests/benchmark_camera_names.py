@@ -0,0 +1,53 @@
+# Before/after comparison of matching calibration file rows to camera objects by name: nested loop over all
+# name variations of all cameras for each row against the name index built once (camera_builder). Nested loop
+# is quadratic, it's measured up to MAX_NESTED_ROWS rows and extrapolated for larger files (marked with "~").
+# Run from outside of the repository directory:
+#     python <repository>/tests/benchmark_camera_names.py
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import conftest  # noqa: E402
+import test_camera_builder  # noqa: E402
+
+ROWS = (1000, 2000, 10000)
+MAX_NESTED_ROWS = 2000
+
+
+def main():
+    camera_builder = conftest.load_package_module("camera_builder.py")
+
+    print(f"{'rows':>8}{'msec before':>14}{'msec after':>12}{'speedup':>10}")
+    measured = None
+    for count in ROWS:
+        camera_objects = test_camera_builder.get_camera_objects(count)
+        item_names = test_camera_builder.get_item_names(count)
+
+        dt = time.perf_counter()
+        name_index = camera_builder.get_camera_name_index(camera_objects)
+        found_after = [camera_builder.find_camera_object(name_index, item_name) for item_name in item_names]
+        time_after = time.perf_counter() - dt
+
+        if count <= MAX_NESTED_ROWS:
+            dt = time.perf_counter()
+            found_before = [
+                test_camera_builder.find_camera_object_nested(
+                    camera_objects, item_name, camera_builder.iter_name_variations
+                )
+                for item_name in item_names
+            ]
+            time_before = time.perf_counter() - dt
+            assert all(a is b for a, b in zip(found_before, found_after))
+            measured = (count, time_before)
+            before_txt = f"{time_before * 1e3:.1f}"
+        else:
+            time_before = measured[1] * (count / measured[0]) ** 2
+            before_txt = f"~{time_before * 1e3:.0f}"
+
+        print(f"{count:>8}{before_txt:>14}{time_after * 1e3:>12.1f}{time_before / time_after:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
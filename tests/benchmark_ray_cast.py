@@ -0,0 +1,148 @@
+# Before/after comparison of the brush footprint ray casting used by warnings, over several densities of the polar
+# check pattern. Before, the view ray of every pattern point was built by view3d_utils and cast by Object.ray_cast
+# one by one. After, rays are built as arrays and cast against the cached BVH tree of the evaluated mesh
+# by warnings.ray_cast_batch. Object.ray_cast and BVHTree are available only in Blender, so the benchmark is run
+# by Blender, with the add-on installed:
+#     blender --background --factory-startup --python tests/benchmark_ray_cast.py -- <add-on module>
+# Add-on module name defaults to "camera_projection_painter"
+import importlib
+import math
+import sys
+import time
+from types import SimpleNamespace
+
+import addon_utils
+import bpy
+from bpy_extras import view3d_utils
+from mathutils import Matrix, Vector
+import numpy as np
+
+# Grid subdivisions of the test meshes, the largest one is about 2M triangles
+MESH_SUBDIVISIONS = (100, 1000)
+# Polar check pattern (angles, radii), the warning pattern is 16x8
+PATTERN_DENSITIES = ((8, 4), (16, 8), (32, 16), (64, 32))
+REGION_WIDTH = 1920
+REGION_HEIGHT = 1080
+BRUSH_RADIUS = 50.0
+MIN_MEASURE_TIME = 0.5  # seconds
+
+
+def get_pattern(rays_rows: int, rays_cols: int):
+    angles = np.radians(360.0 / rays_rows * np.arange(rays_rows, dtype=np.float64))
+    radii = np.arange(rays_cols, dtype=np.float64) / rays_cols
+    angles, radii = np.meshgrid(angles, radii, indexing="ij")
+    pattern = np.stack((np.cos(angles) * radii, np.sin(angles) * radii), axis=-1).reshape(-1, 2)
+    return np.concatenate((pattern, np.zeros((1, 2), dtype=np.float64)))
+
+
+def get_view(distance: float):
+    """
+    Region and 3D view region data looking down at the mesh, only attributes used by view3d_utils
+    and warnings.get_view_rays
+    @return: tuple (region, region data)
+    """
+    near, far = 0.1, 100.0
+    aspect = REGION_WIDTH / REGION_HEIGHT
+    f = 1.0 / math.tan(math.radians(50.0) * 0.5)
+    projection_matrix = Matrix((
+        (f / aspect, 0.0, 0.0, 0.0),
+        (0.0, f, 0.0, 0.0),
+        (0.0, 0.0, (far + near) / (near - far), 2.0 * far * near / (near - far)),
+        (0.0, 0.0, -1.0, 0.0),
+    ))
+    view_matrix = Matrix.Translation((0.0, 0.0, distance)).inverted()
+    region = SimpleNamespace(width=REGION_WIDTH, height=REGION_HEIGHT)
+    rv3d = SimpleNamespace(
+        is_perspective=True,
+        view_matrix=view_matrix,
+        perspective_matrix=projection_matrix @ view_matrix,
+    )
+    return region, rv3d
+
+
+def add_mesh_object(subdivisions: int):
+    bpy.ops.mesh.primitive_grid_add(x_subdivisions=subdivisions, y_subdivisions=subdivisions, size=4.0)
+    ob = bpy.context.active_object
+    mesh = ob.data
+    co = np.empty(len(mesh.vertices) * 3, dtype=np.float64)
+    mesh.vertices.foreach_get("co", co)
+    co = co.reshape(-1, 3)
+    co[:, 2] = 0.2 * np.sin(co[:, 0] * 3.0) * np.cos(co[:, 1] * 3.0)
+    mesh.vertices.foreach_set("co", co.ravel())
+    mesh.update()
+    mesh.calc_loop_triangles()
+    bpy.context.view_layer.update()
+    return ob
+
+
+def ray_cast_per_ray(ob, region, rv3d, mpos):
+    # Ray cast of a single pattern point before batching
+    view_vector = view3d_utils.region_2d_to_vector_3d(region, rv3d, mpos)
+    ray_origin = view3d_utils.region_2d_to_origin_3d(region, rv3d, mpos)
+    ray_target = ray_origin + view_vector
+
+    matrix_inv = ob.matrix_world.inverted()
+    ray_origin_obj = matrix_inv @ ray_origin
+    ray_target_obj = matrix_inv @ ray_target
+    ray_direction_obj = ray_target_obj - ray_origin_obj
+
+    success, location, normal, face_index = ob.ray_cast(ray_origin_obj, ray_direction_obj)
+    if success:
+        location = ob.matrix_world @ location
+        return (ray_origin - location).length
+    return -1.0
+
+
+def measure(func):
+    count = 0
+    dt = time.perf_counter()
+    while True:
+        ret = func()
+        count += 1
+        elapsed = time.perf_counter() - dt
+        if elapsed >= MIN_MEASURE_TIME:
+            return elapsed / count, ret
+
+
+def main():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    module_name = argv[0] if argv else "camera_projection_painter"
+    addon_utils.enable(module_name, default_set=True)
+    warnings = importlib.import_module(module_name).warnings
+
+    region, rv3d = get_view(distance=5.0)
+    center = np.array((REGION_WIDTH * 0.5, REGION_HEIGHT * 0.5), dtype=np.float64)
+
+    print(f"{'triangles':>10}{'rays':>7}{'msec before':>13}{'msec after':>12}{'speedup':>9}{'max difference':>16}")
+    for subdivisions in MESH_SUBDIVISIONS:
+        ob = add_mesh_object(subdivisions)
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+        warnings.MeshBVHCache.clear()
+        dt = time.perf_counter()
+        warnings.MeshBVHCache.get(ob, depsgraph)
+        bvh_time = time.perf_counter() - dt
+
+        for rays_rows, rays_cols in PATTERN_DENSITIES:
+            coords = get_pattern(rays_rows, rays_cols) * BRUSH_RADIUS + center
+            mpos_list = [Vector(coord) for coord in coords.tolist()]
+
+            def cast_before():
+                return np.array([ray_cast_per_ray(ob, region, rv3d, mpos) for mpos in mpos_list], dtype=np.float64)
+
+            def cast_after():
+                origins, directions = warnings.get_view_rays(region, rv3d, coords)
+                return warnings.ray_cast_batch(ob, depsgraph, origins, directions)
+
+            time_before, distances_before = measure(cast_before)
+            time_after, distances_after = measure(cast_after)
+            difference = float(np.max(np.abs(distances_before - distances_after)))
+
+            print(f"{len(ob.data.loop_triangles):>10}{len(coords):>7}{time_before * 1e3:>13.3f}"
+                  f"{time_after * 1e3:>12.3f}{time_before / time_after:>9.1f}{difference:>16.2e}")
+        print(f"BVH tree build of {len(ob.data.loop_triangles)} triangles, once per geometry change: "
+              f"{bvh_time * 1e3:.1f} msec")
+
+        bpy.data.objects.remove(ob)
+
+
+main()
@@ -0,0 +1,44 @@
+# Before/after comparison of the distance warning sampling: fixed 129 points check pattern against adaptive
+# hierarchical levels. Cost of the warning evaluation is dominated by the ray casts (one BVHTree.ray_cast call
+# per ray), so rays count is reported together with the time of the sampling itself. Run from outside of the
+# repository directory:
+#     python <repository>/tests/benchmark_sampling.py
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import conftest  # noqa: E402
+import test_sampling  # noqa: E402
+
+REPEATS = 2000
+
+
+def measure(func):
+    dt = time.perf_counter()
+    for _ in range(REPEATS):
+        func()
+    return (time.perf_counter() - dt) / REPEATS
+
+
+def main():
+    sampling = conftest.load_module("sampling.py")
+
+    print(f"{'scene':<16}{'rays before':>12}{'rays after':>12}{'usec before':>13}{'usec after':>12}"
+          f"{'distance before':>17}{'distance after':>16}")
+    for scene in test_sampling.SCENES:
+        fixed_eval = test_sampling.CountingEval(scene)
+        distance_before = test_sampling.fixed_pattern_distance(fixed_eval)
+        adaptive_eval = test_sampling.CountingEval(scene)
+        distance_after = sampling.get_mean_distance(sampling.sample_adaptive(adaptive_eval))
+
+        time_before = measure(lambda: test_sampling.fixed_pattern_distance(scene))
+        time_after = measure(lambda: sampling.get_mean_distance(sampling.sample_adaptive(scene)))
+
+        print(f"{scene.__name__:<16}{fixed_eval.rays:>12}{adaptive_eval.rays:>12}{time_before * 1e6:>13.1f}"
+              f"{time_after * 1e6:>12.1f}{distance_before:>17.4f}{distance_after:>16.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# Tests of the add-on modules which do not depend on bpy. The add-on package itself can't be imported outside
+# of Blender, so the tested modules are loaded by file path. The add-on "warnings" module shadows the standard
+# library one, so tests are run from outside of the repository directory:
+#     python -m pytest -q <repository>/tests
+import importlib.util
+import json
+import os
+import sys
+import types
+
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPOSITORY_DIR = os.path.dirname(TESTS_DIR)
+FIXTURES_DIR = os.path.join(TESTS_DIR, "fixtures")
+# Written by fixtures/generate_native_reference.py, in Blender, with the compiled engine
+NATIVE_REFERENCE_FILEPATH = os.path.join(FIXTURES_DIR, "native_reference.json")
+
+
+def load_module(relpath: str):
+    name = "cpp_test_" + os.path.splitext(relpath)[0].replace("/", "_")
+    spec = importlib.util.spec_from_file_location(name, os.path.join(REPOSITORY_DIR, *relpath.split("/")))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_package_module(relpath: str, blender_modules=("bpy", "mathutils")):
+    """
+    Load the module with relative imports of the other add-on modules. Blender modules are replaced
+    by placeholder modules while the module is executed, so only its functions which do not use them can be tested
+    """
+    package_name = "cpp_test_package"
+    if package_name not in sys.modules:
+        package = types.ModuleType(package_name)
+        package.__path__ = [REPOSITORY_DIR]
+        sys.modules[package_name] = package
+    saved = {name: sys.modules.get(name, None) for name in blender_modules}
+    for name in blender_modules:
+        placeholder = sys.modules[name] = types.ModuleType(name)
+        # Names imported from Blender modules are None
+        placeholder.__getattr__ = lambda attr: None
+    try:
+        name = package_name + "." + os.path.splitext(relpath)[0].replace("/", ".")
+        spec = importlib.util.spec_from_file_location(name, os.path.join(REPOSITORY_DIR, *relpath.split("/")))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    finally:
+        for name, saved_module in saved.items():
+            if saved_module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = saved_module
+    return module
+
+
+def load_json(filepath: str):
+    with open(filepath, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+@pytest.fixture(scope="session")
+def environment():
+    return load_module("engine/_pyengine/environment.py")
+
+
+@pytest.fixture(scope="session")
+def image_header():
+    return load_module("engine/_pyengine/image_header.py")
+
+
+@pytest.fixture(scope="session")
+def sampling():
+    return load_module("sampling.py")
+
+
+@pytest.fixture(scope="session")
+def brush_curve():
+    return load_module("brush_curve.py")
+
+
+@pytest.fixture(scope="session")
+def calibration_csv():
+    return load_module("calibration_csv.py")
+
+
+@pytest.fixture(scope="session")
+def camera_builder():
+    return load_package_module("camera_builder.py")
+
+
+@pytest.fixture(scope="session")
+def image_pyramid():
+    return load_package_module("image_pyramid.py", blender_modules=("bpy", "bgl"))
+
+
+@pytest.fixture(scope="session")
+def fixture_images(tmp_path_factory):
+    images = load_module("tests/fixtures/images.py")
+    return images.write_fixture_images(str(tmp_path_factory.mktemp("images")))
+
+
+@pytest.fixture(scope="session")
+def projection_cases():
+    return load_json(os.path.join(FIXTURES_DIR, "projection_cases.json"))
+
+
+@pytest.fixture(scope="session")
+def native_reference():
+    if not os.path.isfile(NATIVE_REFERENCE_FILEPATH):
+        pytest.skip("No reference outputs of the compiled engine, run fixtures/generate_native_reference.py")
+    return load_json(NATIVE_REFERENCE_FILEPATH)
@@ -0,0 +1,106 @@
+# Writes "native_reference.json", reference outputs of the compiled engine used by the parity tests of the
+# Python/NumPy backend. Run on Windows, with the add-on installed and the native backend selected:
+#     set CPP_ENGINE_BACKEND=NATIVE
+#     blender --background --factory-startup --python tests/fixtures/generate_native_reference.py -- <add-on module>
+# Add-on module name defaults to "camera_projection_painter"
+import importlib
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+
+import addon_utils
+import bpy
+from mathutils import Matrix
+
+FIXTURES_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_images_module():
+    spec = importlib.util.spec_from_file_location("cpp_fixture_images", os.path.join(FIXTURES_DIR, "images.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_image(engine, filepath: str):
+    image = bpy.data.images.load(filepath, check_existing=False)
+    engine.updateImageSeqStaticSize([image], False)
+    return image
+
+
+def get_image_sizes(engine, images, directory: str):
+    ret = {}
+    for filepath in images.write_fixture_images(directory):
+        image = load_image(engine, filepath)
+        ret[os.path.basename(filepath)] = list(image.cpp.static_size)
+    return ret
+
+
+def get_projection(engine, images, mesh_data: dict, case: dict, directory: str):
+    image_filepath = os.path.join(directory, f"{case['name']}.png")
+    images.write_png(image_filepath, case["width"], case["height"])
+
+    camera = bpy.data.cameras.new(case["name"])
+    camera.lens = case["lens"]
+    camera.clip_start = case["clip_start"]
+    camera.clip_end = case["clip_end"]
+    camera.cpp.image = load_image(engine, image_filepath)
+    camera.cpp.camera_lens_model = case["camera_lens_model"]
+    for field in ("principal_point_x", "principal_point_y", "skew", "aspect_ratio",
+                  "k1", "k2", "k3", "k4", "t1", "t2"):
+        setattr(camera.cpp, field, case[field])
+    camera_object = bpy.data.objects.new(case["name"], camera)
+    camera_object.matrix_world = Matrix(case["matrix_world"])
+
+    mesh = bpy.data.meshes.new(case["name"])
+    mesh.from_pydata(mesh_data["vertices"], [], mesh_data["faces"])
+    ob = bpy.data.objects.new(case["name"] + "_mesh", mesh)
+    scene = bpy.context.scene
+    scene.collection.objects.link(camera_object)
+    scene.collection.objects.link(ob)
+    bpy.context.view_layer.objects.active = ob
+    bpy.context.view_layer.update()
+
+    uv_layer = mesh.uv_layers.new(name=engine.TEMP_DATA_NAME, do_init=False)
+    bpy.ops.object.mode_set(mode='TEXTURE_PAINT')
+    environment = engine.Environment(ob, uv_layer)
+    environment.setProjector(camera_object)
+    bpy.ops.object.mode_set(mode='OBJECT')
+
+    uv = [0.0] * (len(mesh.loops) * 2)
+    uv_layer.data.foreach_get("uv", uv)
+    loop_vertex_index = [0] * len(mesh.loops)
+    mesh.loops.foreach_get("vertex_index", loop_vertex_index)
+    return {"name": case["name"], "loop_vertex_index": loop_vertex_index, "uv": uv}
+
+
+def main():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    module_name = argv[0] if argv else "camera_projection_painter"
+    addon_utils.enable(module_name, default_set=True)
+    engine = importlib.import_module(module_name).engine
+    if engine.BACKEND != 'NATIVE':
+        raise RuntimeError("Reference outputs must be written by the compiled engine, set CPP_ENGINE_BACKEND=NATIVE")
+
+    images = load_images_module()
+    with open(os.path.join(FIXTURES_DIR, "projection_cases.json"), "r", encoding="utf-8") as file:
+        projection_cases = json.load(file)
+
+    with tempfile.TemporaryDirectory() as directory:
+        data = {
+            "backend": engine.BACKEND,
+            "blender": bpy.app.version_string,
+            "image_sizes": get_image_sizes(engine, images, directory),
+            "projection": [get_projection(engine, images, projection_cases["mesh"], case, directory)
+                           for case in projection_cases["cases"]],
+        }
+
+    with open(os.path.join(FIXTURES_DIR, "native_reference.json"), "w", encoding="utf-8") as file:
+        json.dump(data, file, indent=1)
+    print(f"Camera Projection Painter: Reference outputs of {len(data['projection'])} projection cases and "
+          f"{len(data['image_sizes'])} images written")
+
+
+main()
@@ -0,0 +1,152 @@
+# Writers of the minimal valid image files used as fixtures of the image header tests. Images are uniform
+# grayscale, only the file structure matters. The module does not depend on bpy, so it is used by the tests
+# and by the native reference generator
+import os
+import struct
+import zlib
+
+
+def write_png(filepath: str, width: int, height: int):
+    def chunk(chunk_type: bytes, data: bytes):
+        return (struct.pack(">I", len(data)) + chunk_type + data
+                + struct.pack(">I", zlib.crc32(chunk_type + data) & 0xffffffff))
+
+    # Each row starts with filter type byte
+    raw = (b"\x00" + b"\x80" * width) * height
+    with open(filepath, "wb") as file:
+        file.write(b"\x89PNG\r\n\x1a\n")
+        file.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 0, 0, 0, 0)))
+        file.write(chunk(b"IDAT", zlib.compress(raw)))
+        file.write(chunk(b"IEND", b""))
+
+
+def write_bmp(filepath: str, width: int, height: int, top_down=False):
+    row_size = (width * 3 + 3) & ~3
+    data = b"\x80" * (row_size * height)
+    header_size = 14 + 40
+    with open(filepath, "wb") as file:
+        file.write(struct.pack("<2sIHHI", b"BM", header_size + len(data), 0, 0, header_size))
+        file.write(struct.pack("<IiiHHIIiiII", 40, width, -height if top_down else height, 1, 24, 0, len(data),
+                               2835, 2835, 0, 0))
+        file.write(data)
+
+
+def write_tga(filepath: str, width: int, height: int):
+    with open(filepath, "wb") as file:
+        # Uncompressed true-color image, 24 bits per pixel
+        file.write(struct.pack("<BBBHHBHHHHBB", 0, 0, 2, 0, 0, 0, 0, 0, width, height, 24, 0))
+        file.write(b"\x80" * (width * height * 3))
+
+
+def write_tiff(filepath: str, width: int, height: int, big_endian=False):
+    endian = ">" if big_endian else "<"
+    entries = (
+        # Tag, type, count, value. Width is LONG and height is SHORT, both are allowed
+        (256, 4, 1, width),
+        (257, 3, 1, height),
+        (258, 3, 1, 8),  # BitsPerSample
+        (259, 3, 1, 1),  # Compression: none
+        (262, 3, 1, 1),  # PhotometricInterpretation: black is zero
+        (273, 4, 1, 0),  # StripOffsets, set below
+        (277, 3, 1, 1),  # SamplesPerPixel
+        (278, 3, 1, height),  # RowsPerStrip
+        (279, 4, 1, width * height),  # StripByteCounts
+    )
+    ifd_offset = 8
+    data_offset = ifd_offset + 2 + len(entries) * 12 + 4
+
+    ifd = struct.pack(endian + "H", len(entries))
+    for tag, field_type, count, value in entries:
+        if tag == 273:
+            value = data_offset
+        if field_type == 3:
+            ifd += struct.pack(endian + "HHIHH", tag, field_type, count, value, 0)
+        else:
+            ifd += struct.pack(endian + "HHII", tag, field_type, count, value)
+    ifd += struct.pack(endian + "I", 0)
+
+    with open(filepath, "wb") as file:
+        file.write((b"MM" if big_endian else b"II") + struct.pack(endian + "HI", 42, ifd_offset))
+        file.write(ifd)
+        file.write(b"\x80" * (width * height))
+
+
+def write_exr(filepath: str, width: int, height: int):
+    def attribute(name: str, attribute_type: str, value: bytes):
+        return (name.encode() + b"\x00" + attribute_type.encode() + b"\x00"
+                + struct.pack("<i", len(value)) + value)
+
+    # Single half float channel "Y"
+    channels = b"Y\x00" + struct.pack("<iB3xii", 1, 0, 1, 1) + b"\x00"
+    window = struct.pack("<iiii", 0, 0, width - 1, height - 1)
+    header = b"\x76\x2f\x31\x01" + struct.pack("<I", 2)
+    header += attribute("channels", "chlist", channels)
+    header += attribute("compression", "compression", b"\x00")
+    header += attribute("dataWindow", "box2i", window)
+    header += attribute("displayWindow", "box2i", window)
+    header += attribute("lineOrder", "lineOrder", b"\x00")
+    header += attribute("pixelAspectRatio", "float", struct.pack("<f", 1.0))
+    header += attribute("screenWindowCenter", "v2f", struct.pack("<ff", 0.0, 0.0))
+    header += attribute("screenWindowWidth", "float", struct.pack("<f", 1.0))
+    header += b"\x00"
+
+    # Uncompressed file stores one scanline per chunk: int32 y, int32 size, pixels. Half float 0.5 is 0x3800
+    line_data = struct.pack("<H", 0x3800) * width
+    chunk_size = 8 + len(line_data)
+    first_chunk = len(header) + 8 * height
+    offsets = b"".join(struct.pack("<Q", first_chunk + y * chunk_size) for y in range(height))
+    with open(filepath, "wb") as file:
+        file.write(header)
+        file.write(offsets)
+        for y in range(height):
+            file.write(struct.pack("<ii", y, len(line_data)) + line_data)
+
+
+def write_jpeg(filepath: str, width: int, height: int):
+    def segment(marker: int, data: bytes):
+        return struct.pack(">BBH", 0xff, marker, len(data) + 2) + data
+
+    # Baseline grayscale image where every 8x8 block has zero DC difference and no AC coefficients. Huffman
+    # tables contain a single 1 bit code, so each block is encoded with two zero bits
+    blocks = ((width + 7) // 8) * ((height + 7) // 8)
+    bits = "00" * blocks
+    bits += "1" * (-len(bits) % 8)
+    scan = bytes(int(bits[i:i + 8], 2) for i in range(0, len(bits), 8))
+
+    huffman_table = bytes([1] + [0] * 15) + b"\x00"
+    with open(filepath, "wb") as file:
+        file.write(b"\xff\xd8")
+        file.write(segment(0xe0, b"JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00"))
+        file.write(segment(0xdb, b"\x00" + b"\x01" * 64))
+        file.write(segment(0xc0, struct.pack(">BHHBBBB", 8, height, width, 1, 1, 0x11, 0)))
+        file.write(segment(0xc4, b"\x00" + huffman_table))
+        file.write(segment(0xc4, b"\x10" + huffman_table))
+        file.write(segment(0xda, b"\x01\x01\x00\x00\x3f\x00"))
+        file.write(scan)
+        file.write(b"\xff\xd9")
+
+
+# File name: (writer, width, height, keyword arguments)
+FIXTURE_IMAGES = {
+    "gray.png": (write_png, 7, 5, {}),
+    "gray.bmp": (write_bmp, 6, 3, {}),
+    "gray_top_down.bmp": (write_bmp, 4, 2, {"top_down": True}),
+    "gray.tga": (write_tga, 5, 4, {}),
+    "gray_le.tif": (write_tiff, 9, 6, {}),
+    "gray_be.tif": (write_tiff, 3, 8, {"big_endian": True}),
+    "gray.exr": (write_exr, 5, 3, {}),
+    "gray.jpg": (write_jpeg, 20, 12, {}),
+}
+
+
+def write_fixture_images(directory: str):
+    """
+    Write all fixture images into the directory
+    @return: dict {file path: (width, height)}
+    """
+    ret = {}
+    for name, (writer, width, height, kwargs) in FIXTURE_IMAGES.items():
+        filepath = os.path.join(directory, name)
+        writer(filepath, width, height, **kwargs)
+        ret[filepath] = (width, height)
+    return ret
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+
+class CurvePoint:
+    __slots__ = ("location", "handle_type")
+
+    def __init__(self, location, handle_type='AUTO'):
+        self.location = location
+        self.handle_type = handle_type
+
+
+class CurvePoints(list):
+    def foreach_get(self, attr, seq):
+        seq[:] = np.array([getattr(point, attr) for point in self], dtype=np.float32).ravel()
+
+
+class Curve:
+    __slots__ = ("points",)
+
+    def __init__(self, points):
+        self.points = CurvePoints(CurvePoint(location) for location in points)
+
+
+class CurveMapping:
+    """
+    Curve mapping of the brush falloff with the API used by the add-on. Curve is evaluated as polyline,
+    number of evaluations is counted
+    """
+
+    def __init__(self, points=((0.0, 1.0), (1.0, 0.0))):
+        self.curves = [Curve(points)]
+        self.clip_min_x = 0.0
+        self.clip_min_y = 0.0
+        self.clip_max_x = 1.0
+        self.clip_max_y = 1.0
+        self.evaluations = 0
+
+    def initialize(self):
+        pass
+
+    def evaluate(self, curve, position):
+        self.evaluations += 1
+        locations = [point.location for point in curve.points]
+        return float(np.interp(position, [x for x, _ in locations], [y for _, y in locations]))
+
+
+def test_lut_linear(brush_curve):
+    lut = brush_curve.get_brush_curve_lut(CurveMapping())
+    assert lut.dtype == np.int32
+    assert len(lut) == brush_curve.BRUSH_LUT_WIDTH
+    assert lut[0] == 255
+    assert np.all(np.diff(lut) <= 0)
+    assert lut[brush_curve.BRUSH_LUT_WIDTH // 2] == pytest.approx(127, abs=1)
+
+
+def test_lut_clipped(brush_curve):
+    curve_mapping = CurveMapping(((0.0, 2.0), (1.0, -1.0)))
+    lut = brush_curve.get_brush_curve_lut(curve_mapping)
+    assert lut.min() >= 0 and lut.max() <= 255
+    assert lut[0] == 255
+
+
+def test_hash_tracks_curve_shape(brush_curve):
+    curve_mapping = CurveMapping()
+    curve_hash = brush_curve.get_brush_curve_hash(curve_mapping)
+    assert brush_curve.get_brush_curve_hash(CurveMapping()) == curve_hash
+    assert curve_mapping.evaluations == 0
+
+    curve_mapping.curves[0].points[1].location = (1.0, 0.5)
+    moved_hash = brush_curve.get_brush_curve_hash(curve_mapping)
+    assert moved_hash != curve_hash
+
+    curve_mapping.curves[0].points[1].handle_type = 'VECTOR'
+    assert brush_curve.get_brush_curve_hash(curve_mapping) != moved_hash
+
+    curve_mapping = CurveMapping()
+    curve_mapping.clip_max_y = 0.5
+    assert brush_curve.get_brush_curve_hash(curve_mapping) != curve_hash
@@ -0,0 +1,127 @@
+import numpy as np
+import pytest
+
+REALITY_CAPTURE_HEADER = "#name,x,y,alt,heading,pitch,roll,f,px,py,k1,k2,k3,k4,t1,t2\n"
+
+COLMAP_IMAGES = (
+    "# Image list with two lines of data per image:\n"
+    "#   IMAGE_ID, QW, QX, QY, QZ, TX, TY, TZ, CAMERA_ID, NAME\n"
+    "#   POINTS2D[] as (X, Y, POINT3D_ID)\n"
+    "# Number of images: 2, mean observations per image: 1.0\n"
+    "1 1 0 0 0 1 2 3 1 a.jpg\n"
+    "100.5 200.5 -1 300.5 400.5 5\n"
+    "2 0.7071 0.7071 0 0 4 5 6 1 b.jpg\n"
+    "\n"
+)
+
+METASHAPE_PROJECTED = (
+    "# Cameras (3)\n"
+    "#Label,X/Easting,Y/Northing,Z/Altitude,Yaw,Pitch,Roll,X_est,Y_est,Z_est,Yaw_est,Pitch_est,Roll_est\n"
+    "a.jpg,500000,6500000,100,0,0,0,500010,6500020,101,10,1,2\n"
+    "b.jpg,500100,6500100,100,0,0,0,500110,6500120,102,20,3,4\n"
+)
+
+METASHAPE_GEOGRAPHIC = (
+    "# Cameras (2)\n"
+    "#Label,X/Longitude,Y/Latitude,Z/Altitude,Yaw,Pitch,Roll,X_est,Y_est,Z_est,Yaw_est,Pitch_est,Roll_est\n"
+    "a.jpg,24.1,56.9,100,0,0,0,24.1001,56.9001,101,10,1,2\n"
+)
+
+
+def write(tmp_path, name, text):
+    filepath = tmp_path / name
+    filepath.write_text(text, encoding="utf-8")
+    return str(filepath)
+
+
+def get_reality_capture_row(i: int):
+    return f"IMG_{i:05d}.jpg,{i},{i * 2},100,{i % 360},0,0,35,0.01,-0.02,0.1,0.01,0.001,0,0.0001,0\n"
+
+
+def test_reality_capture(calibration_csv, tmp_path):
+    filepath = write(tmp_path, "cameras.csv", REALITY_CAPTURE_HEADER + "".join(map(get_reality_capture_row, range(3))))
+    table = calibration_csv.read_calibration_file(filepath)
+    assert table.schema.name == 'REALITY_CAPTURE'
+    assert table.names == ["IMG_00000.jpg", "IMG_00001.jpg", "IMG_00002.jpg"]
+    assert table.has(*calibration_csv.INTRINSIC_FIELDS)
+    assert table.has(*calibration_csv.POSE_FIELDS)
+    np.testing.assert_array_equal(table.columns["y"], [0.0, 2.0, 4.0])
+    np.testing.assert_array_equal(table.columns["f"], [35.0, 35.0, 35.0])
+    assert table.skipped_rows == 0
+
+
+def test_colmap(calibration_csv, tmp_path):
+    filepath = write(tmp_path, "images.txt", COLMAP_IMAGES)
+    table = calibration_csv.read_calibration_file(filepath)
+    assert table.schema.name == 'COLMAP'
+    # Lines of 2D points are not camera rows and are not counted as skipped
+    assert table.names == ["a.jpg", "b.jpg"]
+    assert table.skipped_rows == 0
+    np.testing.assert_array_equal(table.columns["tx"], [1.0, 4.0])
+
+    locations, rotations = calibration_csv.get_poses(table)
+    # Identity rotation, camera center is -t
+    np.testing.assert_allclose(locations[0], [-1.0, -2.0, -3.0])
+    np.testing.assert_allclose(rotations[0], np.diag([1.0, -1.0, -1.0]))
+
+
+def test_unknown_schema(calibration_csv, tmp_path):
+    filepath = write(tmp_path, "notes.csv", "a,b,c\n1,2,3\n")
+    assert calibration_csv.read_calibration_file(filepath) is None
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 3, 7, 10, 64])
+def test_chunks(calibration_csv, tmp_path, chunk_rows):
+    rows = list(map(get_reality_capture_row, range(10)))
+    # Invalid rows on both sides of the chunk boundaries
+    rows.insert(4, "short,row\n")
+    rows.insert(8, get_reality_capture_row(99).replace(",35,", ",nan,"))
+    filepath = write(tmp_path, "cameras.csv", REALITY_CAPTURE_HEADER + "".join(rows))
+
+    table = calibration_csv.read_calibration_file(filepath, chunk_rows=chunk_rows)
+    expected = calibration_csv.read_calibration_file(filepath, chunk_rows=calibration_csv.CHUNK_ROWS)
+    assert table.names == expected.names == [f"IMG_{i:05d}.jpg" for i in range(10)]
+    assert table.skipped_rows == expected.skipped_rows == 2
+    for field, column in expected.columns.items():
+        np.testing.assert_array_equal(table.columns[field], column, err_msg=field)
+
+
+def test_invalid_values(calibration_csv, tmp_path):
+    rows = [
+        get_reality_capture_row(0),
+        get_reality_capture_row(1).replace(",35,", ",abc,"),
+        get_reality_capture_row(2).replace(",35,", ",,"),
+        get_reality_capture_row(3)[0:-1] + ",extra\n",
+        get_reality_capture_row(4),
+    ]
+    filepath = write(tmp_path, "cameras.csv", REALITY_CAPTURE_HEADER + "".join(rows))
+    table = calibration_csv.read_calibration_file(filepath)
+    assert table.names == ["IMG_00000.jpg", "IMG_00004.jpg"]
+    assert table.skipped_rows == 3
+    assert np.all(np.isfinite(table.columns["f"]))
+
+
+def test_metashape_projected(calibration_csv, tmp_path):
+    filepath = write(tmp_path, "reference.csv", METASHAPE_PROJECTED)
+    table = calibration_csv.read_calibration_file(filepath)
+    assert table.schema.name == 'METASHAPE'
+    assert table.names == ["a.jpg", "b.jpg"]
+    # Estimated values are preferred
+    np.testing.assert_array_equal(table.columns["x"], [500010.0, 500110.0])
+    assert calibration_csv.find_rejected_header(filepath) == []
+
+
+def test_metashape_geographic_is_rejected(calibration_csv, tmp_path):
+    filepath = write(tmp_path, "reference.csv", METASHAPE_GEOGRAPHIC)
+    assert calibration_csv.read_calibration_file(filepath) is None
+    assert calibration_csv.find_rejected_header(filepath) == ["x/longitude", "y/latitude"]
+
+
+def test_georeference_offset(calibration_csv):
+    local = np.array([[1.0, 2.0, 3.0], [-4.0, 5.0, 6.0]])
+    np.testing.assert_array_equal(calibration_csv.get_georeference_offset(local), [0.0, 0.0, 0.0])
+
+    georeferenced = np.array([[500010.0, 6500020.0, 101.0], [500110.0, 6500121.0, 102.0]])
+    np.testing.assert_array_equal(
+        calibration_csv.get_georeference_offset(georeferenced), [500060.0, 6500070.0, 0.0]
+    )
@@ -0,0 +1,48 @@
+import random
+from types import SimpleNamespace
+
+
+def find_camera_object_nested(camera_objects, item_name: str, iter_name_variations):
+    # Lookup before the name index: every name variation of every camera is compared, the last match is used
+    camera_object = None
+    for ob in camera_objects:
+        for name in iter_name_variations(ob.name):
+            for iname in iter_name_variations(item_name):
+                if name == iname:
+                    camera_object = ob
+    return camera_object
+
+
+def get_camera_objects(count: int, seed: int = 0):
+    rnd = random.Random(seed)
+    stems = [f"IMG_{i:04d}" for i in range(count)]
+    extensions = ("", ".jpg", ".JPG", ".Jpg", ".tif", ".jpg.001")
+    names = [rnd.choice(stems) + rnd.choice(extensions) for _ in range(count)]
+    return [SimpleNamespace(name=name) for name in names]
+
+
+def get_item_names(count: int, seed: int = 1):
+    rnd = random.Random(seed)
+    extensions = ("", ".jpg", ".JPG", ".png", ".jpg.001")
+    return [f"IMG_{rnd.randrange(count + count // 4):04d}{rnd.choice(extensions)}" for _ in range(count)]
+
+
+def test_name_index_equals_nested_loop(camera_builder):
+    camera_objects = get_camera_objects(300)
+    name_index = camera_builder.get_camera_name_index(camera_objects)
+    item_names = get_item_names(300) + [ob.name for ob in camera_objects] + ["", ".jpg", "IMG_0001."]
+    found = 0
+    for item_name in item_names:
+        expected = find_camera_object_nested(camera_objects, item_name, camera_builder.iter_name_variations)
+        assert camera_builder.find_camera_object(name_index, item_name) is expected, item_name
+        found += expected is not None
+    # Both found and missing cameras are compared
+    assert 0 < found < len(item_names)
+
+
+def test_duplicate_names_use_last_camera(camera_builder):
+    camera_objects = [SimpleNamespace(name=name) for name in ("a.JPG", "a", "a.jpg", "b.jpg")]
+    name_index = camera_builder.get_camera_name_index(camera_objects)
+    for item_name, index in (("a.jpg", 2), ("a.JPG", 2), ("a", 2), ("b", 3), ("b.JPG", 3)):
+        assert camera_builder.find_camera_object(name_index, item_name) is camera_objects[index], item_name
+    assert camera_builder.find_camera_object(name_index, "c.jpg") is None
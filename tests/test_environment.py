@@ -0,0 +1,156 @@
+import math
+
+import numpy as np
+import pytest
+
+LENS_MODELS = ("perspective", "division", "brown3", "brown4", "brown3t2", "brown4t2")
+CALIBRATION_FIELDS = ("principal_point_x", "principal_point_y", "skew", "aspect_ratio",
+                      "k1", "k2", "k3", "k4", "t1", "t2")
+
+
+def get_calibration(case: dict):
+    calibration = {
+        "width": case["width"],
+        "height": case["height"],
+        "lens": case["lens"],
+        "model": LENS_MODELS.index(case["camera_lens_model"]),
+    }
+    for field in CALIBRATION_FIELDS:
+        calibration[field] = case[field]
+    return calibration
+
+
+def shader_undistorted_uv(u, v, width, height, lens, model, principal_point_x, principal_point_y, skew,
+                          aspect_ratio, k1, k2, k3, k4, t1, t2):
+    # Line by line port of the "undistort" shader library function (undistort_lib.glsl), evaluated in single precision
+    f = np.float32
+    image_width, image_height, lens = f(width), f(height), f(lens)
+    u, v = f(u), f(v)
+    _k1 = _k2 = _k3 = _k4 = _t1 = _t2 = f(0.0)
+    if model != 0:
+        _k1 = f(k1)
+    if model > 1:
+        _k2, _k3 = f(k2), f(k3)
+        if model in (3, 5):
+            _k4 = f(k4)
+        if model in (4, 5):
+            _t1, _t2 = f(t1), f(t2)
+    scale_to_pixel = max(image_width, image_height)
+    focal_length = lens * scale_to_pixel / f(36.0)
+    principal_point_u = f(principal_point_x) * scale_to_pixel + image_width / f(2)
+    principal_point_v = f(principal_point_y) * scale_to_pixel + image_height / f(2)
+    camera_skew = f(skew) * scale_to_pixel
+    cx = u * image_width / focal_length
+    cy = -v * image_height / focal_length
+    if model == 0:
+        dcx, dcy = cx, cy
+    elif model == 1:
+        kr2 = f(1.0) + _k1 * (cx * cx + cy * cy)
+        dcx, dcy = cx / kr2, cy / kr2
+    else:
+        x2, y2, xy2 = cx * cx, cy * cy, f(2) * cx * cy
+        r2 = x2 + y2
+        ln = f(1.0) + (((_k4 * r2 + _k3) * r2 + _k2) * r2 + _k1) * r2
+        tx = _t1 * (r2 + f(2.0) * x2) + _t2 * xy2
+        ty = _t2 * (r2 + f(2.0) * y2) + _t1 * xy2
+        dcx, dcy = cx * ln + tx, cy * ln + ty
+    u_ptr = (focal_length * dcx + camera_skew * dcy + principal_point_u) / image_width
+    v_ptr = f(1.0) - ((focal_length * f(aspect_ratio) * dcy + principal_point_v) / image_height)
+    return float(u_ptr), float(v_ptr)
+
+
+def pinhole_project(case: dict, world_co: np.ndarray):
+    # Independent of the projection matrix: camera space coordinates divided by depth, scaled by focal length
+    scale_to_pixel = max(case["width"], case["height"])
+    focal_length = case["lens"] * scale_to_pixel / 36.0
+    camera_co = (world_co - np.array(case["matrix_world"])[0:3, 3]) @ np.array(case["matrix_world"])[0:3, 0:3]
+    depth = -camera_co[:, 2]
+    return np.stack((camera_co[:, 0] / depth * focal_length / case["width"],
+                     camera_co[:, 1] / depth * focal_length / case["height"]), axis=-1)
+
+
+@pytest.mark.parametrize("lens, width, height", [(35.0, 6000, 4000), (24.0, 3000, 4000), (50.0, 1024, 1024)])
+def test_projection_matrix_maps_frame_edges(environment, lens, width, height):
+    mat = environment.get_projection_matrix(lens, width, height, 0.1, 100.0)
+    focal_length = lens * max(width, height) / 36.0
+    depth = 7.0
+    # Right and top edges of the image frame at the given depth
+    points = np.array([
+        [0.0, 0.0, -depth],
+        [depth * width / 2.0 / focal_length, 0.0, -depth],
+        [0.0, depth * height / 2.0 / focal_length, -depth],
+    ])
+    np.testing.assert_allclose(environment.project_points(mat, points), [[0.0, 0.0], [0.5, 0.0], [0.0, 0.5]],
+                               atol=1e-12)
+
+
+def test_projection_matrix_depth_range(environment):
+    mat = environment.get_projection_matrix(35.0, 6000, 4000, 0.5, 250.0)
+    ndc_z = [(mat @ [0.0, 0.0, -depth, 1.0])[2] / (mat @ [0.0, 0.0, -depth, 1.0])[3] for depth in (0.5, 250.0)]
+    np.testing.assert_allclose(ndc_z, [-1.0, 1.0], atol=1e-12)
+
+
+def test_projector_mvp_inverts_camera_matrix(environment, projection_cases):
+    for case in projection_cases["cases"]:
+        matrix_world = np.array(case["matrix_world"])
+        mvp = environment.get_projector_mvp(matrix_world, case["lens"], case["width"], case["height"],
+                                            case["clip_start"], case["clip_end"])
+        # Point on the optical axis of the camera projects to the image center
+        on_axis = matrix_world[0:3, 3] - matrix_world[0:3, 2] * 3.0
+        np.testing.assert_allclose(environment.project_points(mvp, on_axis[None, :]), [[0.0, 0.0]], atol=1e-12)
+
+        world_co = np.array(projection_cases["mesh"]["vertices"], dtype=np.float64)
+        # Rotation of the fixtures is rounded, so inverse and transpose differ slightly
+        np.testing.assert_allclose(environment.project_points(mvp, world_co), pinhole_project(case, world_co),
+                                   atol=1e-8)
+
+
+@pytest.mark.parametrize("model", range(len(LENS_MODELS)))
+def test_undistorted_uv_matches_shader(environment, projection_cases, model):
+    uv = np.stack(np.meshgrid(np.linspace(-0.6, 0.6, 9), np.linspace(-0.6, 0.6, 9)), axis=-1).reshape(-1, 2)
+    for case in projection_cases["cases"]:
+        calibration = get_calibration(case)
+        calibration["model"] = model
+        expected = [shader_undistorted_uv(u, v, **calibration) for u, v in uv]
+        np.testing.assert_allclose(environment.undistorted_uv(uv, **calibration), expected, atol=1e-5)
+
+
+def test_undistorted_uv_keeps_dtype(environment):
+    uv = np.zeros((4, 2), dtype=np.float32)
+    res = environment.undistorted_uv(uv, 100, 50, 35.0, 0)
+    assert res.dtype == np.float32
+    np.testing.assert_allclose(res, 0.5)
+
+
+def test_project_uv_matches_shader(environment, projection_cases):
+    world_co = np.array(projection_cases["mesh"]["vertices"], dtype=np.float64)
+    for case in projection_cases["cases"]:
+        calibration = get_calibration(case)
+        mvp, uv = environment.project_uv(world_co, case["matrix_world"], case["clip_start"], case["clip_end"],
+                                         calibration)
+        assert mvp.shape == (4, 4)
+        expected = [shader_undistorted_uv(u, v, **calibration) for u, v in pinhole_project(case, world_co)]
+        np.testing.assert_allclose(uv, expected, atol=1e-5, err_msg=case["name"])
+
+
+def test_project_uv_matches_native(environment, projection_cases, native_reference):
+    world_co = np.array(projection_cases["mesh"]["vertices"], dtype=np.float64)
+    reference = {item["name"]: item for item in native_reference["projection"]}
+    for case in projection_cases["cases"]:
+        item = reference[case["name"]]
+        _mvp, uv = environment.project_uv(world_co, case["matrix_world"], case["clip_start"], case["clip_end"],
+                                          get_calibration(case))
+        loop_uv = uv[np.array(item["loop_vertex_index"])]
+        # Native engine writes single precision UV layer
+        np.testing.assert_allclose(loop_uv, np.array(item["uv"]).reshape(-1, 2), atol=1e-5, err_msg=case["name"])
+
+
+def test_projection_cases_are_visible(environment, projection_cases):
+    # Fixtures are only useful if the mesh is in front of every camera and partially inside of the frame
+    world_co = np.array(projection_cases["mesh"]["vertices"], dtype=np.float64)
+    for case in projection_cases["cases"]:
+        _mvp, uv = environment.project_uv(world_co, case["matrix_world"], case["clip_start"], case["clip_end"],
+                                          get_calibration(case))
+        inside = np.all((uv > 0.0) & (uv < 1.0), axis=1)
+        assert 0 < np.count_nonzero(inside) < len(uv), case["name"]
+        assert not math.isnan(float(np.sum(uv)))
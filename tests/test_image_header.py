@@ -0,0 +1,58 @@
+import os
+
+import pytest
+
+
+def test_read_image_size(image_header, fixture_images):
+    for filepath, size in fixture_images.items():
+        assert image_header.read_image_size(filepath) == size, os.path.basename(filepath)
+
+
+def test_read_image_size_unknown_format(image_header, tmp_path):
+    filepath = tmp_path / "notes.txt"
+    filepath.write_bytes(b"not an image")
+    assert image_header.read_image_size(str(filepath)) is None
+    assert image_header.read_image_size(str(tmp_path / "missing.png")) is None
+
+
+@pytest.mark.parametrize("name", ["gray.png", "gray.jpg", "gray_le.tif", "gray.exr", "gray.bmp"])
+def test_read_image_size_truncated(image_header, fixture_images, tmp_path, name):
+    source = next(fp for fp in fixture_images if os.path.basename(fp) == name)
+    with open(source, "rb") as file:
+        data = file.read()
+    filepath = tmp_path / name
+    # Header is cut in the middle of the size fields
+    filepath.write_bytes(data[0:20])
+    assert image_header.read_image_size(str(filepath)) is None
+
+
+def test_read_image_size_jpeg_zero_length_segment(image_header, tmp_path):
+    filepath = tmp_path / "broken.jpg"
+    filepath.write_bytes(b"\xff\xd8\xff\xe0\x00\x00" + b"\x00" * 32)
+    assert image_header.read_image_size(str(filepath)) is None
+
+
+def test_image_size_cache(image_header, fixture_images):
+    cache = image_header.ImageSizeCache
+    cache.clear()
+    filepath, size = next(iter(fixture_images.items()))
+    assert cache.get(filepath) == size
+    assert cache.get(filepath) == size
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Modified file is read again
+    stat = os.stat(filepath)
+    os.utime(filepath, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+    assert cache.get(filepath) == size
+    assert cache.misses == 2
+    cache.clear()
+
+
+def test_read_image_size_matches_native(image_header, fixture_images, native_reference):
+    reference = native_reference["image_sizes"]
+    for filepath in fixture_images:
+        name = os.path.basename(filepath)
+        # Formats not supported by the compiled engine have zero size
+        if reference.get(name, [0, 0]) == [0, 0]:
+            continue
+        assert list(image_header.read_image_size(filepath)) == reference[name], name
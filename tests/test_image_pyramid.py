@@ -0,0 +1,45 @@
+import os
+import time
+
+import numpy as np
+
+
+def write_file(directory, name: str, size: int, age: float = 0.0):
+    filepath = os.path.join(directory, name)
+    with open(filepath, "wb") as file:
+        file.write(b"\0" * size)
+    mtime = time.time() - age
+    os.utime(filepath, (mtime, mtime))
+    return filepath
+
+
+def test_levels_count(image_pyramid):
+    assert image_pyramid.get_levels_count(256, 100) == 0
+    assert image_pyramid.get_levels_count(257, 100) == 1
+    assert image_pyramid.get_levels_count(4000, 3000) == 4
+
+
+def test_downsample_odd_size(image_pyramid):
+    pixels = np.arange(3 * 5 * 4, dtype=np.uint8).reshape((3, 5, 4))
+    half = image_pyramid.downsample(pixels)
+    assert half.shape == (2, 3, 4)
+    # Last row and column are repeated
+    np.testing.assert_array_equal(half[1, 2], pixels[2, 4])
+
+
+def test_trim_cache(image_pyramid, tmp_path):
+    directory = str(tmp_path)
+    old = [write_file(directory, f"old.{level}.npz", 100, age=300.0) for level in (1, 2)]
+    recent = [write_file(directory, f"recent.{level}.npz", 100, age=100.0) for level in (1, 2)]
+    kept = write_file(directory, "kept.1.npz", 100, age=500.0)
+    stale_tmp = write_file(directory, "interrupted.1.npz.tmp", 1000, age=image_pyramid.STALE_TMP_SECONDS + 60)
+    fresh_tmp = write_file(directory, "building.1.npz.tmp", 150)
+
+    image_pyramid.trim_cache(directory, 500, keep_levels=[kept])
+
+    # Stale temporary file is removed, the fresh one is counted: 150 + 100 kept + 200 recent fit the limit
+    assert not os.path.exists(stale_tmp)
+    assert os.path.exists(fresh_tmp)
+    assert not any(os.path.exists(fp) for fp in old)
+    assert all(os.path.exists(fp) for fp in recent)
+    assert os.path.exists(kept)
@@ -0,0 +1,115 @@
+import math
+
+import numpy as np
+import pytest
+
+
+def get_fixed_pattern():
+    # Check pattern used before adaptive sampling: 16 angles by 8 radii, first radius is zero, center appended
+    pattern = []
+    for i in range(16):
+        angle = math.radians(360.0 / 16 * i)
+        for j in range(8):
+            pattern.append((math.cos(angle) * j / 8, math.sin(angle) * j / 8))
+    pattern.append((0.0, 0.0))
+    return np.array(pattern, dtype=np.float64)
+
+
+def fixed_pattern_distance(eval_func):
+    distances = eval_func(get_fixed_pattern())
+    distances = distances[distances != -1.0]
+    if len(distances):
+        return float(np.mean(distances))
+    return 0.0
+
+
+def plane(points):
+    return np.full(len(points), 10.0)
+
+
+def tilted_plane(points):
+    return 10.0 + 3.0 * points[:, 0]
+
+
+def curved_surface(points):
+    return 10.0 + 0.5 * np.sum(points * points, axis=1)
+
+
+def step_edge(points):
+    return np.where(points[:, 0] < 0.3, 5.0, 20.0)
+
+
+def mesh_border(points):
+    return np.where(points[:, 0] < 0.5, 10.0 + points[:, 1], -1.0)
+
+
+def thin_strip(points):
+    # Strip between the points of the coarsest level
+    return np.where(np.abs(points[:, 1] - 0.3) < 0.04, 10.0, -1.0)
+
+
+def empty(points):
+    return np.full(len(points), -1.0)
+
+
+SCENES = (plane, tilted_plane, curved_surface, step_edge, mesh_border, thin_strip, empty)
+
+
+class CountingEval:
+    def __init__(self, func):
+        self.func = func
+        self.rays = 0
+
+    def __call__(self, points):
+        self.rays += len(points)
+        return self.func(points)
+
+
+def test_levels_are_fixed_pattern_points(sampling):
+    levels = np.concatenate(sampling.LEVELS)
+    fixed = np.unique(np.round(get_fixed_pattern(), 9), axis=0)
+    assert len(levels) == len(fixed) == 113
+    np.testing.assert_allclose(np.unique(np.round(levels, 9), axis=0), fixed, atol=1e-9)
+
+
+@pytest.mark.parametrize("scene", SCENES, ids=lambda scene: scene.__name__)
+def test_full_refinement_equals_fixed_pattern(sampling, scene):
+    # Weighted mean of all levels is the mean of the fixed pattern
+    distances = np.concatenate([scene(level) for level in sampling.LEVELS])
+    assert sampling.get_mean_distance(distances) == pytest.approx(fixed_pattern_distance(scene), rel=1e-12)
+
+
+@pytest.mark.parametrize("scene", SCENES, ids=lambda scene: scene.__name__)
+def test_decision_equivalence(sampling, scene):
+    expected = fixed_pattern_distance(scene)
+    distance = sampling.get_mean_distance(sampling.sample_adaptive(scene))
+    # Sampling stops early only if samples agree within tolerance, so warning decision is the same
+    # for every threshold outside of the tolerance band around the distance
+    tolerance = sampling.DEFAULT_TOLERANCE
+    for threshold in np.linspace(0.0, 30.0, 301):
+        if abs(threshold - expected) <= tolerance * expected:
+            continue
+        assert (distance > threshold) == (expected > threshold), threshold
+
+
+def test_thin_surface_is_refined(sampling):
+    eval_func = CountingEval(thin_strip)
+    distances = sampling.sample_adaptive(eval_func)
+    assert np.any(distances != -1.0)
+    assert eval_func.rays > len(sampling.LEVELS[0])
+
+
+def test_empty_is_confirmed_by_next_level(sampling):
+    eval_func = CountingEval(empty)
+    distances = sampling.sample_adaptive(eval_func)
+    assert np.all(distances == -1.0)
+    assert eval_func.rays == len(sampling.LEVELS[0]) + len(sampling.LEVELS[1])
+    assert sampling.get_mean_distance(distances) == 0.0
+
+
+@pytest.mark.parametrize("scene, max_rays", [(plane, 13), (tilted_plane, 113), (curved_surface, 13)],
+                         ids=lambda value: getattr(value, "__name__", str(value)))
+def test_ray_count(sampling, scene, max_rays):
+    eval_func = CountingEval(scene)
+    sampling.sample_adaptive(eval_func)
+    assert eval_func.rays <= max_rays
@@ -0,0 +1,286 @@
+# The module contains persistent cache of the image previews and icons. Thumbnails are stored as fixed size
+# records of a single memory mapped file, keyed by source file path, modification time and size
+import contextlib
+import hashlib
+import os
+import sys
+import time
+
+import numpy as np
+
+from . import engine
+from . import extend_bpy_types
+from . import __package__ as addon_pkg
+
+import bpy
+
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
+
+CACHE_DIRECTORY_NAME = "thumbnails"
+# Incremented when record layout changes, so files of other versions are not read
+CACHE_FILE_VERSION = 1
+# Cache file is rewritten without outdated records when there are at least this many of them
+# and they are at least half of the file
+COMPACT_MIN_DEAD_RECORDS = 64
+
+
+def get_thumbnail_key(filepath: str):
+    """
+    Key of the thumbnail record, file path, modification time and size digest
+    @return: bytes or None if file does not exist
+    """
+    filepath = os.path.normcase(os.path.abspath(filepath))
+    try:
+        stat = os.stat(filepath)
+    except OSError:
+        return None
+    return hashlib.sha1(f"{filepath}:{stat.st_mtime_ns}:{stat.st_size}".encode("utf-8")).digest()
+
+
+def get_path_key(filepath: str):
+    """
+    Digest of the source file path only, the latest record of the path outdates previous ones
+    @return: bytes
+    """
+    filepath = os.path.normcase(os.path.abspath(filepath))
+    return hashlib.sha1(filepath.encode("utf-8")).digest()
+
+
+@contextlib.contextmanager
+def file_lock(filepath: str):
+    """
+    Advisory lock of the cache file between Blender instances, held by the lock file beside it.
+    Raises OSError if the lock can't be acquired
+    """
+    with open(filepath + ".lock", "a+b") as file:
+        if sys.platform == "win32":
+            file.seek(0)
+            # Retries for about 10 seconds before OSError
+            msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+
+def get_record_dtype(preview_size: int, icon_size: int):
+    """
+    Single thumbnail record, pixels are packed RGBA as in ImagePreview.image_pixels
+    @return: numpy.dtype
+    """
+    return np.dtype([
+        ("key", "S20"),
+        ("path_key", "S20"),
+        ("preview_size", "<u2", (2,)),
+        ("icon_size", "<u2", (2,)),
+        ("preview", "<i4", (preview_size * preview_size,)),
+        ("icon", "<i4", (icon_size * icon_size,)),
+    ])
+
+
+class ThumbnailCache:
+    """
+    Records are appended to the end of the cache file and never modified. Outdated records (previous
+    records of the same path and duplicates appended by other Blender instances) are not used anymore,
+    they are removed by compaction of the file once there are enough of them. Writes are serialized
+    between Blender instances by the lock file
+    """
+    __slots__ = (
+        "filepath",
+        "dtype",
+        "records",
+        "index",
+        "live",
+        "pending",
+    )
+
+    def __init__(self, directory: str, preview_size: int, icon_size: int):
+        # Preview and icon sizes are part of the name, so changed preferences use another file
+        self.filepath = os.path.join(
+            directory, f"thumbnails_v{CACHE_FILE_VERSION}_{preview_size}_{icon_size}.bin"
+        )
+        self.dtype = get_record_dtype(preview_size, icon_size)
+        self.records = None
+        self.index = {}  # key: record index
+        self.live = {}  # path key: index of the latest record
+        self.pending = []  # records not yet written
+        self._map()
+
+    @property
+    def dead_count(self):
+        """
+        Number of outdated records in the file
+        @return: int
+        """
+        if self.records is None:
+            return 0
+        return len(self.records) - len(self.live)
+
+    def _map(self):
+        self.records = None
+        self.index.clear()
+        self.live.clear()
+        try:
+            file_size = os.path.getsize(self.filepath)
+        except OSError:
+            return
+        # Incomplete record at the end of file (interrupted write) is ignored
+        count = file_size // self.dtype.itemsize
+        if not count:
+            return
+        self.records = np.memmap(self.filepath, dtype=self.dtype, mode="r", shape=(count,))
+        self.live = {bytes(path_key): i for i, path_key in enumerate(self.records["path_key"])}
+        keys = self.records["key"]
+        self.index = {bytes(keys[i]): i for i in self.live.values()}
+
+    def get(self, key: bytes):
+        """
+        Cached thumbnail record
+        @return: numpy.void record or None
+        """
+        i = self.index.get(key, None)
+        if i is None:
+            return None
+        return self.records[i]
+
+    def add(self, key: bytes, path_key: bytes, preview_pixels: np.ndarray, preview_size: tuple,
+            icon_pixels: np.ndarray, icon_size: tuple):
+        record = np.zeros(1, dtype=self.dtype)
+        record["key"] = key
+        record["path_key"] = path_key
+        record["preview_size"] = preview_size
+        record["icon_size"] = icon_size
+        record["preview"][0, 0:len(preview_pixels)] = preview_pixels
+        record["icon"][0, 0:len(icon_pixels)] = icon_pixels
+        self.pending.append(record)
+
+    def flush(self):
+        """
+        Append pending records to the cache file, the file is compacted if too many records are outdated
+        """
+        if not self.pending:
+            return
+        pending = np.concatenate(self.pending)
+        self.pending.clear()
+        self.records = None
+        try:
+            os.makedirs(os.path.dirname(self.filepath), exist_ok=True)
+            with file_lock(self.filepath):
+                with open(self.filepath, "ab") as file:
+                    # Incomplete record of interrupted write is overwritten
+                    tail = file.tell() % self.dtype.itemsize
+                    if tail:
+                        file.truncate(file.tell() - tail)
+                    file.write(pending.tobytes())
+                self._map()
+                dead_count = self.dead_count
+                if dead_count >= COMPACT_MIN_DEAD_RECORDS and dead_count * 2 >= len(self.records):
+                    self._compact()
+        except OSError:
+            pass
+        self._map()
+
+    def _compact(self):
+        """
+        Rewrite the cache file with the latest record of each path only. Called with the file lock held
+        """
+        live_records = np.array(self.records[sorted(self.live.values())])
+        self.records = None
+        tmp_filepath = self.filepath + ".tmp"
+        try:
+            with open(tmp_filepath, "wb") as file:
+                file.write(live_records.tobytes())
+            # Fails on Windows while the file is mapped by another Blender instance, compacted next time
+            os.replace(tmp_filepath, self.filepath)
+        except OSError:
+            try:
+                os.remove(tmp_filepath)
+            except OSError:
+                pass
+
+
+def get_cache_directory():
+    return bpy.utils.user_resource('DATAFILES', path=os.path.join(addon_pkg, CACHE_DIRECTORY_NAME), create=True)
+
+
+def _has_preview(image):
+    preview = image.preview
+    if not len(preview.image_pixels):
+        return False
+    check_arr = np.empty(len(preview.image_pixels), dtype=np.int32)
+    preview.image_pixels.foreach_get(check_arr)
+    return bool(np.any(check_arr))
+
+
+def _set_preview(image, record):
+    preview = image.preview
+    preview_width, preview_height = (int(_) for _ in record["preview_size"])
+    icon_width, icon_height = (int(_) for _ in record["icon_size"])
+
+    preview.image_size = preview_width, preview_height
+    preview.image_pixels.foreach_set(np.array(record["preview"][0:preview_width * preview_height]))
+    preview.icon_size = icon_width, icon_height
+    preview.icon_pixels.foreach_set(np.array(record["icon"][0:icon_width * icon_height]))
+
+
+def _get_preview(image):
+    preview = image.preview
+    preview_pixels = np.empty(len(preview.image_pixels), dtype=np.int32)
+    preview.image_pixels.foreach_get(preview_pixels)
+    icon_pixels = np.empty(len(preview.icon_pixels), dtype=np.int32)
+    preview.icon_pixels.foreach_get(icon_pixels)
+    return preview_pixels, tuple(preview.image_size), icon_pixels, tuple(preview.icon_size)
+
+
+def update_previews(image_seq, skip_already_set=True):
+    """
+    Update icon and preview for each image in sequence. Thumbnails of unchanged image files are read from
+    the cache, the rest are generated by engine.updateImageSeqPreviews and stored in the cache
+    """
+    dt = time.time()
+
+    cache = ThumbnailCache(get_cache_directory(), bpy.app.render_preview_size, bpy.app.render_icon_size)
+
+    used_cache = 0
+    missed = []
+    for image in image_seq:
+        if not image.cpp.valid:
+            continue
+        if skip_already_set and _has_preview(image):
+            continue
+
+        filepath = extend_bpy_types.image.get_source_filepath(image)
+        key = get_thumbnail_key(filepath) if filepath else None
+        record = cache.get(key) if key else None
+        if record is None:
+            missed.append((image, filepath, key))
+            continue
+        _set_preview(image, record)
+        used_cache += 1
+
+    if used_cache:
+        print(f"Camera Projection Painter: Icons and previews of {used_cache} images read from thumbnail cache "
+              f"in {time.time() - dt:.6f} sec")
+
+    if not missed:
+        return
+
+    engine.updateImageSeqPreviews([image for image, _, _ in missed], False, False)
+
+    for image, filepath, key in missed:
+        if key is None:
+            continue
+        preview_pixels, preview_size, icon_pixels, icon_size = _get_preview(image)
+        if np.any(preview_pixels):
+            cache.add(key, get_path_key(filepath), preview_pixels, preview_size, icon_pixels, icon_size)
+    cache.flush()
@@ -1,5 +1,8 @@
 from . import operators
 from . import poll
+from . import extend_bpy_types
+from . import prefetch
+from . import __package__ as addon_pkg
 
 if "bpy" in locals():
     import importlib
@@ -350,6 +353,11 @@ class CPP_PT_dataset(bpy.types.Panel, CameraPainterPanelBase):
             text="",
             icon='IMPORT'
         )
+        col.prop(scene.cpp, "calibration_orientation")
+        col.prop(scene.cpp, "use_georeference_offset")
+        scol = col.column(align=True)
+        scol.enabled = scene.cpp.use_georeference_offset
+        scol.prop(scene.cpp, "georeference_offset", text="")
 
 
 class CPP_PT_canvas_texture(bpy.types.Panel, CameraPainterPanelBase):
@@ -569,6 +577,45 @@ class CPP_PT_cameras_viewport(bpy.types.Panel, CameraPainterPanelBase):
         col.prop(context.scene.cpp, "camera_axes_size")
 
 
+class CPP_PT_image_cache(bpy.types.Panel, CameraPainterPanelBase):
+    bl_label = "Loaded Images"
+    bl_parent_id = "CPP_PT_view"
+
+    @classmethod
+    def poll(cls, context):
+        return poll.tool_setup_poll(context)
+
+    def draw(self, context):
+        col = self.get_col()
+        col.prop(context.scene.cpp, "max_loaded_images")
+
+        preferences = context.preferences.addons[addon_pkg].preferences
+        image_cache = extend_bpy_types.image.ImageCache
+        megabyte = 1024 * 1024
+
+        loaded_size = image_cache.loaded_size / megabyte
+        memory_limit = preferences.loaded_images_memory_limit
+        col.label(text=f"Memory: {loaded_size:.1f} / {memory_limit} MB ({loaded_size / memory_limit:.0%})")
+        col.label(text=f"Hits: {image_cache.hits}, Misses: {image_cache.misses}")
+        col.label(text=f"Evictions: {image_cache.evictions}")
+
+        prefetcher = prefetch.prefetcher
+        col.label(text=f"Prefetched: {prefetcher.files_count} ({prefetcher.files_size / megabyte:.1f} MB)")
+
+        if image_cache.gl_load_order:
+            col.separator()
+            col.label(text=f"Loaded: {len(image_cache.gl_load_order)}")
+            # Most recently used first
+            for image, size in reversed(list(image_cache.gl_load_order.items())):
+                try:
+                    name = image.name
+                except ReferenceError:
+                    continue
+                row = col.row()
+                row.label(text=name, icon='IMAGE_DATA')
+                row.label(text=f"{size / megabyte:.1f} MB")
+
+
 class CPP_PT_brush_preview(bpy.types.Panel, CameraPainterPanelBase):
     bl_label = "Brush Preview"
     bl_parent_id = "CPP_PT_view"
@@ -660,6 +707,7 @@ _classes = [
     CPP_PT_view,  # View
     CPP_PT_texture_preview,
     CPP_PT_cameras_viewport,
+    CPP_PT_image_cache,
     CPP_PT_brush_preview,
     CPP_PT_warnings
 ]
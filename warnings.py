@@ -1,56 +1,181 @@
-from math import radians
+import zlib
 
-from bpy_extras import view3d_utils
-from mathutils import Vector, Matrix
-
-
-def ray_cast(context, mpos):
-    ob = context.active_object
-    region = context.region
-    rv3d = context.region_data
-
-    # get the ray from the viewport and mouse
-    view_vector = view3d_utils.region_2d_to_vector_3d(region, rv3d, mpos)
-    ray_origin = view3d_utils.region_2d_to_origin_3d(region, rv3d, mpos)
-
-    ray_target = ray_origin + view_vector
-
-    # get the ray relative to the object
-    matrix_inv = ob.matrix_world.inverted()
-    ray_origin_obj = matrix_inv @ ray_origin
-    ray_target_obj = matrix_inv @ ray_target
-    ray_direction_obj = ray_target_obj - ray_origin_obj
+import numpy as np
 
-    # cast the ray
-    success, location, normal, face_index = ob.ray_cast(
-        ray_origin_obj, ray_direction_obj)
+from . import sampling
 
-    if success:
-        location = ob.matrix_world @ location
-        distance = (ray_origin - location).length
-        return distance
-    return -1
+if "bpy" in locals():
+    import importlib
+    importlib.reload(sampling)
 
-
-def _get_check_pattern():
-    pattern = []
-    rays_rows = 16  # 128 rays
-    rays_cols = 8
-    for i in range(rays_rows):
-        angle = radians(360.0 / rays_rows * i)
-        for j in range(rays_cols):
-            mat_rotation = Matrix.Rotation(angle, 3, 'Z')
-            p1 = Vector((1.0, 0.0, 0.0))
-            p1.rotate(mat_rotation)
-            pattern.append(p1.to_2d() * (1.0 / rays_cols * j))
-    pattern.append(Vector((0.0, 0.0)))
-    return pattern
+import bpy
+from bpy_extras import view3d_utils
+from mathutils import Vector
+from mathutils.bvhtree import BVHTree
+
+
+def get_geometry_key(mesh):
+    """
+    Vertices, polygons and loops count and checksums of the vertex positions and loop vertex indices.
+    UV layers are not included, so writing the projected UV layer (which is also reported as geometry update)
+    doesn't change the key
+    @return: tuple
+    """
+    vertices_count = len(mesh.vertices)
+    co = np.empty(vertices_count * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", co)
+    loops_count = len(mesh.loops)
+    loop_vertex_index = np.empty(loops_count, dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loop_vertex_index)
+    return vertices_count, len(mesh.polygons), loops_count, zlib.crc32(co), zlib.crc32(loop_vertex_index)
+
+
+class MeshBVHCache:
+    """
+    BVH tree of the evaluated mesh in object space, built once and reused until the object geometry is changed.
+    After geometry updates the tree is rebuilt only if the evaluated mesh key has been changed
+    """
+    __slots__ = ()
+
+    ob_pointer = 0
+    bvh = None
+    geometry_key = None
+    is_dirty = False
+
+    @classmethod
+    def tag_update(cls, updated_geometry_pointers: set):
+        if cls.ob_pointer in updated_geometry_pointers:
+            cls.is_dirty = True
+
+    @classmethod
+    def get(cls, ob, depsgraph):
+        ob_pointer = ob.as_pointer()
+        if cls.bvh is None or cls.ob_pointer != ob_pointer:
+            cls.geometry_key = get_geometry_key(ob.evaluated_get(depsgraph).data)
+            cls.bvh = BVHTree.FromObject(ob, depsgraph)
+            cls.ob_pointer = ob_pointer
+        elif cls.is_dirty:
+            geometry_key = get_geometry_key(ob.evaluated_get(depsgraph).data)
+            if geometry_key != cls.geometry_key:
+                cls.geometry_key = geometry_key
+                cls.bvh = BVHTree.FromObject(ob, depsgraph)
+        cls.is_dirty = False
+        return cls.bvh
+
+    @classmethod
+    def clear(cls):
+        cls.ob_pointer = 0
+        cls.bvh = None
+        cls.geometry_key = None
+        cls.is_dirty = False
+
+
+def get_view_rays(region, rv3d, coords: np.ndarray):
+    """
+    Vectorized version of view3d_utils.region_2d_to_origin_3d and view3d_utils.region_2d_to_vector_3d
+    @return: tuple (numpy.ndarray (N, 3) origins, numpy.ndarray (N, 3) normalized directions)
+    """
+    persinv = np.linalg.inv(np.array(rv3d.perspective_matrix, dtype=np.float64))
+    viewinv = np.linalg.inv(np.array(rv3d.view_matrix, dtype=np.float64))
+
+    dx = (2.0 * coords[:, 0] / region.width) - 1.0
+    dy = (2.0 * coords[:, 1] / region.height) - 1.0
+
+    count = len(coords)
+    if rv3d.is_perspective:
+        out = np.empty((count, 3), dtype=np.float64)
+        out[:, 0] = dx
+        out[:, 1] = dy
+        out[:, 2] = -0.5
+        w = out @ persinv[3, 0:3] + persinv[3, 3]
+        directions = ((out @ persinv[0:3, 0:3].T + persinv[0:3, 3]) / w[:, None]) - viewinv[0:3, 3]
+        origins = np.broadcast_to(viewinv[0:3, 3], (count, 3)).copy()
+    else:
+        directions = np.broadcast_to(-viewinv[0:3, 2], (count, 3)).copy()
+        origins = (np.outer(dx, persinv[0:3, 0]) + np.outer(dy, persinv[0:3, 1]) + persinv[0:3, 3])
+
+    directions /= np.linalg.norm(directions, axis=1)[:, None]
+    return origins, directions
+
+
+def ray_cast_batch(ob, depsgraph, origins: np.ndarray, directions: np.ndarray):
+    """
+    Cast world space rays against the evaluated object mesh.
+    @return: numpy.ndarray (N,) hit distances in world space, -1.0 for missed rays
+    """
+    model_matrix = np.array(ob.matrix_world, dtype=np.float64)
+    matrix_inv = np.linalg.inv(model_matrix)
+
+    # Rays relative to the object
+    origins_obj = origins @ matrix_inv[0:3, 0:3].T + matrix_inv[0:3, 3]
+    directions_obj = directions @ matrix_inv[0:3, 0:3].T
+
+    bvh = MeshBVHCache.get(ob, depsgraph)
+    bvh_ray_cast = bvh.ray_cast
+
+    count = len(origins)
+    hit = np.zeros(count, dtype=bool)
+    locations = np.empty((count, 3), dtype=np.float64)
+    for i, (origin, direction) in enumerate(zip(origins_obj.tolist(), directions_obj.tolist())):
+        location = bvh_ray_cast(origin, direction)[0]
+        if location is not None:
+            hit[i] = True
+            locations[i] = location
+
+    distances = np.full(count, -1.0, dtype=np.float64)
+    if np.any(hit):
+        locations_world = locations[hit] @ model_matrix[0:3, 0:3].T + model_matrix[0:3, 3]
+        distances[hit] = np.linalg.norm(origins[hit] - locations_world, axis=1)
+    return distances
+
+
+class WarningStatusCache:
+    """
+    Results of the warning evaluation. Draw callbacks of every viewport and the paint operator request the status
+    with the same arguments, so it's evaluated once until the view, brush or object changes
+    """
+    __slots__ = ()
+
+    max_items = 8
+    mouse_quantize = 2  # pixels
+
+    cache = {}
+
+    @classmethod
+    def get_key(cls, context, mpos):
+        rv3d = context.region_data
+        mx, my = mpos
+        return (
+            context.active_object.as_pointer(),
+            int(mx) // cls.mouse_quantize,
+            int(my) // cls.mouse_quantize,
+            context.scene.tool_settings.unified_paint_settings.size,
+            context.scene.cpp.distance_warning,
+            context.space_data.lens,
+            context.region.width,
+            context.region.height,
+            # Includes view projection, so lens and orthographic scale changes are also taken into account
+            tuple(tuple(row) for row in rv3d.perspective_matrix),
+            tuple(tuple(row) for row in context.active_object.matrix_world),
+        )
+
+    @classmethod
+    def clear(cls):
+        cls.cache.clear()
 
 
-CHECK_PATTERN = _get_check_pattern()  # do it at stage of import, it's constant
+def get_warning_status(context, mpos) -> bool:
+    key = WarningStatusCache.get_key(context, mpos)
+    status = WarningStatusCache.cache.get(key, None)
+    if status is None:
+        if len(WarningStatusCache.cache) >= WarningStatusCache.max_items:
+            WarningStatusCache.clear()
+        status = _eval_warning_status(context, mpos)
+        WarningStatusCache.cache[key] = status
+    return status
 
 
-def get_warning_status(context, mpos) -> bool:
+def _eval_warning_status(context, mpos) -> bool:
     mpos = Vector(mpos)
     brush_radius = context.scene.tool_settings.unified_paint_settings.size
 
@@ -59,16 +184,16 @@ def get_warning_status(context, mpos) -> bool:
     scr_radius = (p0 - p1).length
     lens = context.space_data.lens * 0.01
 
-    distances = []
-    for p in CHECK_PATTERN:
-        ppos = mpos + (p * context.scene.tool_settings.unified_paint_settings.size)
-        dist = ray_cast(context, ppos)
-        if dist != -1:
-            distances.append(dist)
+    ob = context.active_object
+    depsgraph = context.evaluated_depsgraph_get()
+    center = np.array(mpos, dtype=np.float64)
+
+    def _eval_distances(points):
+        coords = points * brush_radius + center
+        origins, directions = get_view_rays(context.region, context.region_data, coords)
+        return ray_cast_batch(ob, depsgraph, origins, directions)
 
-    distance = 0.0
-    if distances:
-        distance = sum(distances) / len(distances)
+    distance = sampling.get_mean_distance(sampling.sample_adaptive(_eval_distances))
 
     if (distance != -1) and ((scr_radius / lens * distance) > context.scene.cpp.distance_warning):
         return True